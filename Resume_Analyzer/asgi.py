@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Resume_Analyzer.settings')
 
 application = get_asgi_application()
+
+# Same as wsgi.py: load the embedding model once per process when configured.
+from analyzer.model_registry import preload_if_configured  # noqa: E402
+
+preload_if_configured()
@@ -38,12 +38,141 @@ ALLOWED_HOSTS = []
 # This is where Django will temporarily save the resume
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+RESUME_UPLOAD_MAX_BYTES = 10 * 1024 * 1024  # uploads are streamed to disk and cut off past this
 
 # --- Custom Settings for Your Script ---
 GEMINI_API_KEY = "API_Key" # Use environment variables in production!
+HISTORY_PAGE_SIZE = 20  # submissions per history page
 
 # Add paths for your external tools
 
+# --- Gemini HTTP client (analyzer.http_client) ---
+GEMINI_HTTP_POOL_SIZE = 10           # keep-alive connections per host
+GEMINI_RATE_LIMIT_PER_SECOND = 5.0   # per API key; 0 disables
+GEMINI_RATE_LIMIT_BURST = 10
+GEMINI_RATE_LIMIT_MAX_WAIT = 10.0    # give up (mock fallback) rather than queue longer
+GEMINI_MAX_RETRIES = 3               # on 429/5xx/connection errors, jittered backoff
+GEMINI_RETRY_BACKOFF_SECONDS = 0.5
+GEMINI_RETRY_BACKOFF_MAX = 8.0
+GEMINI_BREAKER_FAILURES = 5          # consecutive failures before the circuit opens
+GEMINI_BREAKER_RESET_SECONDS = 30.0
+
+# --- LLM prompts (analyzer.prompts) ---
+# Estimated-token budget per prompt section; overrides prompts.DEFAULT_BUDGETS.
+PROMPT_TOKEN_BUDGETS = {
+    'resume': 800,
+    'job_description': 400,
+    'analysis': 120,
+    'target_role': 30,
+}
+
+# --- Metrics (analyzer.metrics, served at /metrics) ---
+# Readable by staff users, or with "Authorization: Bearer <METRICS_BEARER_TOKEN>"
+# (for Prometheus). METRICS_ALLOWED_IPS opts addresses in without either; behind
+# a reverse proxy on the same host every request comes from 127.0.0.1.
+METRICS_BEARER_TOKEN = os.environ.get('METRICS_BEARER_TOKEN') or None
+METRICS_ALLOWED_IPS = []
+# Shared directory where each process (web and queue workers) writes its
+# snapshot so /metrics covers all of them; None = this process only.
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+
+# --- Benchmarks (manage.py benchmark_analysis) ---
+BENCHMARK_BASELINE_PATH = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+
+# --- Analysis job queue ---
+# Uploads are queued as AnalysisJob rows and drained by
+# `python manage.py run_analysis_workers`. Set ANALYSIS_RUN_INLINE to True to
+# run jobs inside the request instead (handy when no worker is running).
+ANALYSIS_RUN_INLINE = os.environ.get('ANALYSIS_RUN_INLINE', '') == '1'
+# Stream uploads' analysis as server-sent events from the request itself instead of
+# queueing it. Holds a worker per upload, so only for ASGI or generously sized servers.
+ANALYSIS_STREAMING_ENABLED = os.environ.get('ANALYSIS_STREAMING_ENABLED', '') == '1'
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', '2'))
+ANALYSIS_JOB_MAX_ATTEMPTS = 3
+ANALYSIS_JOB_LEASE_SECONDS = 600  # running jobs older than this are re-queued
+# Uploaded files are deleted this long after submission by `run_analysis_workers --prune`
+RESUME_FILE_RETENTION_DAYS = 30
+
+# --- Embedding model ---
+# Loaded lazily on first analysis. EMBED_MODEL_PRELOAD loads it in prefork
+# parents (wsgi.py, run_analysis_workers) so children share it copy-on-write.
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBED_MODEL_PRELOAD = os.environ.get('EMBED_MODEL_PRELOAD', '') == '1'
+EMBED_BATCH_SIZE = 32  # texts per encode() batch when ranking many resumes
+# Runtime: 'sentence-transformers' (PyTorch, the reference), 'onnx' or
+# 'onnx-int8' (onnxruntime, no torch). Compare with `manage.py check_embedding_backend`.
+EMBED_BACKEND = os.environ.get('EMBED_BACKEND', 'sentence-transformers')
+EMBED_ONNX_DIR = os.environ.get('EMBED_ONNX_DIR') or None  # local model files; else the HF Hub
+EMBED_ONNX_FILE = None   # override the .onnx file within the model repo
+EMBED_ONNX_THREADS = int(os.environ.get('EMBED_ONNX_THREADS', '0'))  # 0: onnxruntime decides
+# Resumes are embedded per section in chunks of at most this many words (the
+# model truncates longer input) and scored by the mean of the best chunks.
+EMBED_CHUNK_WORDS = 160
+EMBED_TOP_CHUNKS = 3
+EMBED_CHUNK_CACHE_MAX_ENTRIES = 100000  # ChunkEmbedding rows kept, oldest dropped first
+# Optional embedding sidecar (`python manage.py run_embedding_server`): one
+# process holds the model and micro-batches encode calls from every worker.
+# Workers fall back to an in-process model when it is unreachable.
+EMBED_SERVER_SOCKET = os.environ.get('EMBED_SERVER_SOCKET') or None
+EMBED_SERVER_MAX_BATCH = 64          # texts per model call
+EMBED_SERVER_WINDOW_MS = 5.0         # wait for more requests before encoding
+EMBED_SERVER_TIMEOUT = 30.0          # client socket timeout, seconds
+EMBED_SERVER_RETRY_SECONDS = 30.0    # after a failure, use the local model this long
+# Ranked within one request. Tested at 1000 resumes (~9000 chunks) on SQLite
+# with a 999-parameter limit; rank larger sets with manage.py rank_resumes.
+BATCH_RANK_MAX_RESUMES = 1000
+
+# --- LanguageTool (grammar_check) ---
+# A bounded pool of long-lived clients is shared by all analyses in a process.
+LANGUAGE_TOOL_URL = os.environ.get('LANGUAGE_TOOL_URL', 'http://localhost:8081')
+LANGUAGE_TOOL_POOL_SIZE = 4
+LANGUAGE_TOOL_TIMEOUT = 10.0  # seconds per check() call
+LANGUAGE_TOOL_HEALTH_CHECK_SECONDS = 60.0  # probe clients idle longer than this
+
+# --- Async (ASGI) analysis ---
+# In-flight upstream calls per event loop; set these to the upstream rate
+# limits rather than to a thread count.
+GEMINI_MAX_CONCURRENCY = 50
+LANGUAGE_TOOL_MAX_CONCURRENCY = 20
+ASYNC_HTTP_MAX_CONNECTIONS = 100
+ASYNC_HTTP_MAX_KEEPALIVE = 20
+
+# --- Concurrent analysis stages ---
+# Grammar (network/JVM), embedding (CPU) and the structured Gemini review run
+# in parallel; a stage that misses its timeout (seconds) is reported as
+# unavailable instead of blocking.
+ANALYSIS_STAGE_THREADS = 8
+ANALYSIS_STAGE_PROCESSES = 2
+ANALYSIS_STAGE_TIMEOUTS = {
+    'grammar': 20.0,
+    'keyword_match': 30.0,
+    'structured': 25.0,
+}
+
+# --- PDF extraction ---
+# Pages without a text layer are OCR'd one at a time at the tier's DPI
+# ('fast' 150, 'balanced' 200, 'best' 300). Files with at least
+# PDF_PARALLEL_MIN_PAGES pages are split across the stage process pool.
+PDF_OCR_QUALITY = os.environ.get('PDF_OCR_QUALITY', 'best')
+PDF_PARALLEL_MIN_PAGES = 4
+# Poppler's bin directory and the tesseract executable; None looks them up
+# on PATH. On Windows, e.g. POPPLER_PATH=C:\poppler\Library\bin and
+# TESSERACT_PATH=C:\Program Files\Tesseract-OCR\tesseract.exe.
+POPPLER_PATH = os.environ.get('POPPLER_PATH') or None
+TESSERACT_PATH = os.environ.get('TESSERACT_PATH') or None
+
+# --- Analysis result cache ---
+# Results are keyed by sha256(resume bytes, normalized job description,
+# analyzer version) and evicted least-recently-used past these bounds.
+# Turning it off also bypasses the stage memo and the chunk embedding cache.
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANALYSIS_CACHE_MAX_ENTRIES = 5000
+ANALYSIS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+# Per-stage results (incremental re-analysis), reused when only some inputs
+# change; oldest dropped first past this many rows.
+ANALYSIS_STAGE_MEMO_MAX_ENTRIES = 20000
+
 
 
 # Application definition
@@ -57,10 +186,10 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'analyzer',
-    'google_auth_oauthlib.flow', 
 ]
 
 MIDDLEWARE = [
+    'analyzer.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Resume_Analyzer.settings')
 
 application = get_wsgi_application()
+
+# With a prefork server that imports the app before forking (e.g. gunicorn
+# --preload), loading the embedding model here lets every worker share it.
+from analyzer.model_registry import preload_if_configured  # noqa: E402
+
+preload_if_configured()
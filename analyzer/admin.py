@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import JobPosting
+
+
+@admin.register(JobPosting)
+class JobPostingAdmin(admin.ModelAdmin):
+    list_display = ('title', 'created_by', 'embedding_model', 'updated_at')
+    search_fields = ('title', 'description')
+    readonly_fields = ('keywords', 'summary', 'embedding_model', 'created_at', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        if obj.created_by is None:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
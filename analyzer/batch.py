@@ -0,0 +1,111 @@
+"""Rank many resumes against one job description.
+
+The job description is tokenized and encoded once, and the section chunks of
+every resume are encoded in one batched ``encode`` call (reusing cached chunk
+vectors, see embedding_store), so cost grows with the number of resumes
+rather than with per-request overhead. Against a JobPosting the stored
+keywords and vector are used and the job is not processed at all. Used by
+the BatchRankJob worker (queued by ``batch_rank_view``) and
+``manage.py rank_resumes``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import document, job_postings, model_registry
+from .models import ResumeSubmission
+from .text_classification import extract_job_keywords, extract_text, keyword_coverage
+
+logger = logging.getLogger(__name__)
+
+
+def submission_text(submission: ResumeSubmission) -> str:
+    """Pasted text if the submission has it, otherwise text extracted from its file."""
+    if submission.resume_text:
+        return document.parse(submission.resume_text)
+    if submission.resume_file:
+        return document.parse(extract_text(submission.resume_file.path))
+    return ""
+
+
+def texts_for_submissions(submissions: Iterable[ResumeSubmission]) -> List[Tuple[Any, str]]:
+    items = []
+    for submission in submissions:
+        try:
+            items.append((submission.pk, submission_text(submission)))
+        except Exception as e:
+            logger.warning('Could not read submission %s: %s', submission.pk, e)
+            items.append((submission.pk, ""))
+    return items
+
+
+def texts_for_files(files: Iterable[Tuple[Any, str]]) -> List[Tuple[Any, str]]:
+    """Extract text from ``(id, path)`` pairs, such as uploads saved for a BatchRankJob."""
+    items = []
+    for name, path in files:
+        try:
+            items.append((name, document.parse(extract_text(path))))
+        except Exception as e:
+            logger.warning('Could not read %s: %s', name, e)
+            items.append((name, ""))
+    return items
+
+
+def rank_resumes(job_description: str, resumes: Sequence[Tuple[Any, str]],
+                 top: Optional[int] = None, batch_size: Optional[int] = None,
+                 job_posting=None) -> Dict[str, Any]:
+    """Score ``(id, text)`` pairs against ``job_description``, best first.
+
+    Each result carries the same ``semantic_similarity`` and
+    ``keyword_coverage_percent`` that ``compute_keyword_match`` reports for a
+    single resume. Resumes are ordered by similarity, then coverage; when the
+    embedding model is unavailable similarity is -1 and coverage decides.
+    With ``job_posting`` its description and stored features are used.
+    """
+    if job_posting is not None:
+        job_description = job_posting.description
+        job_keywords = list(job_posting.keywords)
+    else:
+        job_keywords = extract_job_keywords(job_description)
+
+    similarities = [-1.0] * len(resumes)
+    error = None
+    model = model_registry.get_embed_model()
+    nonempty = [i for i, (_, text) in enumerate(resumes) if text]
+    if model is None:
+        error = "Embedding model not loaded."
+    elif nonempty:
+        try:
+            from .embedding_store import match_many
+            job_vector = job_postings.vector(job_posting, model) if job_posting is not None else None
+            matches = match_many([resumes[i][1] for i in nonempty], job_description, model, batch_size=batch_size,
+                                 job_vector=job_vector)
+            for i, match in zip(nonempty, matches):
+                similarities[i] = match.similarity
+        except Exception as e:
+            logger.exception('Batch encoding failed')
+            error = str(e)
+
+    results = []
+    for (resume_id, text), sim in zip(resumes, similarities):
+        item = {
+            'id': resume_id,
+            'semantic_similarity': sim,
+            'keyword_coverage_percent': keyword_coverage(text, job_keywords),
+        }
+        if not text:
+            item['error'] = 'No text extracted from resume.'
+        results.append(item)
+    results.sort(key=lambda r: (r['semantic_similarity'], r['keyword_coverage_percent']), reverse=True)
+    for rank, item in enumerate(results, start=1):
+        item['rank'] = rank
+
+    ranked = {
+        'job_keyword_count': len(job_keywords),
+        'resume_count': len(results),
+        'results': results[:top] if top else results,
+    }
+    if error:
+        ranked['error'] = error
+    return ranked
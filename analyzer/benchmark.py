@@ -0,0 +1,366 @@
+"""Benchmark harness for the resume analysis pipeline.
+
+Used by ``manage.py benchmark_analysis``. It builds a corpus from the sample
+PDFs in ``media/resumes/`` and ``resumes/`` (deduplicated by content) plus
+variants generated from each one: plain text, a longer plain text, .docx
+(when python-docx is installed) and an image-only "scanned" PDF. It then
+times ``analyze_resume_result`` end to end and each stage on its own.
+
+Network-backed stages (LanguageTool, Gemini, the structured gemini_client
+call) and the embedding model are replaced with local fakes by
+``stubbed_services``, with an optional simulated latency. The numbers
+therefore measure this code rather than upstream services, and runs can be
+compared. The result cache is disabled during runs.
+
+The report gives p50/p95/mean latency, throughput, peak RSS and a per-stage
+breakdown. ``compare`` diffs a report against a saved baseline and flags
+regressions beyond a tolerance.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.test.utils import override_settings
+
+SAMPLE_DIRS = ('media/resumes', 'resumes')
+
+DEFAULT_JOB_DESCRIPTION = (
+    "We are hiring a backend software engineer to design and build REST APIs in Python and Django, "
+    "own PostgreSQL schemas, write automated tests, deploy on AWS with Docker, and mentor junior "
+    "developers. Experience with machine learning, data pipelines and CI/CD is a plus."
+)
+
+# Slowdowns smaller than this are timer noise on sub-millisecond stages, not regressions.
+MIN_REGRESSION_MS = 0.5
+
+
+# --- Corpus -----------------------------------------------------------------
+
+def sample_pdfs(base_dir: str) -> List[str]:
+    seen, paths = set(), []
+    for sample_dir in SAMPLE_DIRS:
+        directory = os.path.join(base_dir, sample_dir)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith('.pdf'):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if digest not in seen:
+                seen.add(digest)
+                paths.append(path)
+    return paths
+
+
+def _write_scanned_pdf(source: str, target: str, dpi: int = 150) -> bool:
+    """Rasterize ``source`` into an image-only PDF (no text layer), like a scan."""
+    try:
+        import pypdfium2
+    except ImportError:
+        return False
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        images = [page.render(scale=dpi / 72).to_pil().convert('L') for page in pdf]
+    finally:
+        pdf.close()
+    if not images:
+        return False
+    images[0].save(target, 'PDF', resolution=dpi, save_all=True, append_images=images[1:])
+    return True
+
+
+def _write_docx(text: str, target: str) -> bool:
+    try:
+        import docx
+    except ImportError:
+        return False
+    document = docx.Document()
+    for line in text.splitlines():
+        if line.strip():
+            document.add_paragraph(line)
+    document.save(target)
+    return True
+
+
+def build_corpus(workdir: str, base_dir: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """Write the benchmark corpus into ``workdir``; return ``(paths, skipped notes)``."""
+    from .pdf_extraction import extract_pdf_text
+
+    base_dir = base_dir or str(settings.BASE_DIR)
+    os.makedirs(workdir, exist_ok=True)
+    paths, skipped = [], []
+    for index, pdf in enumerate(sample_pdfs(base_dir)):
+        stem = f"sample{index}"
+        target = os.path.join(workdir, f"{stem}.pdf")
+        shutil.copyfile(pdf, target)
+        paths.append(target)
+
+        text = extract_pdf_text(pdf, ocr=False)
+        for name, body in ((f"{stem}.txt", text), (f"{stem}_long.txt", "\n\n".join([text] * 5))):
+            with open(os.path.join(workdir, name), 'w', encoding='utf-8') as f:
+                f.write(body)
+            paths.append(os.path.join(workdir, name))
+
+        docx_path = os.path.join(workdir, f"{stem}.docx")
+        if _write_docx(text, docx_path):
+            paths.append(docx_path)
+        else:
+            skipped.append(f"{stem}.docx (python-docx not installed)")
+
+        scanned_path = os.path.join(workdir, f"{stem}_scanned.pdf")
+        if _write_scanned_pdf(pdf, scanned_path):
+            paths.append(scanned_path)
+        else:
+            skipped.append(f"{stem}_scanned.pdf (pypdfium2 not installed)")
+    return paths, skipped
+
+
+# --- Local fakes for network-backed stages ------------------------------------
+
+class FakeEmbedModel:
+    """Deterministic stand-in for SentenceTransformer.encode."""
+
+    dim = 384
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=None, **kwargs):
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:4], 'little')
+            vectors[row] = np.random.default_rng(seed).standard_normal(self.dim)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class _FakeMatch:
+    ruleId = 'MORFOLOGIK_RULE_EN_US'
+    message = 'Possible spelling mistake found.'
+
+
+class _FakeLanguageToolPool:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def check(self, text):
+        time.sleep(self.latency)
+        return [_FakeMatch()] * (len(text) // 2000)
+
+
+@contextlib.contextmanager
+def stubbed_services(latency_ms: float = 0.0) -> Iterator[None]:
+    """Replace LanguageTool, Gemini and the embedding model with local fakes."""
+    from . import capabilities, genai_client, grammar, model_registry
+
+    latency = latency_ms / 1000.0
+    model = FakeEmbedModel()
+
+    def fake_generate(api_key, model_name, prompt):
+        time.sleep(latency)
+        return "1. Quantify achievements.\n2. Tailor the summary to the role."
+
+    def fake_stream(api_key, model_name, prompt):
+        time.sleep(latency)
+        yield "1. Quantify achievements.\n"
+        yield "2. Tailor the summary to the role."
+
+    env = {k: v for k, v in os.environ.items() if k not in ('GEMINI_API_KEY', 'GEMINI_API_URL')}
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, env, clear=True))  # gemini_client -> local mock
+        stack.enter_context(mock.patch.object(grammar, 'get_pool', lambda: _FakeLanguageToolPool(latency)))
+        stack.enter_context(mock.patch.dict(capabilities._found, {
+            capabilities.CAPABILITIES['language_tool']: True,
+            capabilities.CAPABILITIES['genai']: True,
+        }))
+        stack.enter_context(mock.patch.object(genai_client, 'generate_content', fake_generate))
+        stack.enter_context(mock.patch.object(genai_client, 'stream_content', fake_stream))
+        stack.enter_context(mock.patch.object(model_registry, 'get_embed_model', lambda: model))
+        # Fake vectors must never be cached under the real model's id.
+        stack.enter_context(mock.patch.object(model_registry, 'model_id', lambda: 'benchmark-fake'))
+        yield
+
+
+# --- Measurement --------------------------------------------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return float(np.percentile(values, q))
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    ms = [s * 1000 for s in seconds]
+    return {
+        'runs': len(ms),
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'mean_ms': round(sum(ms) / len(ms), 3) if ms else 0.0,
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return {'self': round(own / 2 ** 20, 1), 'children': round(children / 2 ** 20, 1)}
+
+
+def _time(func: Callable, *args) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+def _stage_functions(job_description: str) -> List[Tuple[str, Callable[[Dict[str, Any]], Any]]]:
+    """``(name, fn(state))`` in pipeline order; each fn reads what earlier ones stored."""
+    from . import document, gemini_client, prompts, text_classification as tc
+
+    def extract(state):
+        state['raw'] = tc.extract_text(state['path'])
+
+    def parse(state):
+        state['text'] = document.parse(state['raw'])
+
+    def deterministic(state):
+        state['analysis'] = tc._deterministic_analysis(state['text'])
+
+    def grammar(state):
+        state['analysis']['grammar'] = tc.grammar_check(state['text'])
+
+    def keyword_match(state):
+        state['analysis']['keyword_match'] = tc._keyword_match_stage(state['text'], job_description)
+
+    def structured(state):
+        gemini_client.analyze_resume(state['text'], 'Software Engineer')
+
+    def prompt(state):
+        state['prompt'] = prompts.feedback_prompt(state['text'], state['analysis'], job_description)
+
+    def feedback(state):
+        tc.generate_feedback_genai(state['text'], state['analysis'], 'benchmark', job_description,
+                                   prompt=state['prompt'])
+
+    return [
+        ('extract_text', extract), ('parse', parse), ('deterministic', deterministic),
+        ('grammar', grammar), ('keyword_match', keyword_match), ('structured', structured),
+        ('prompt', prompt), ('feedback', feedback),
+    ]
+
+
+def run(paths: List[str], *, iterations: int = 5, warmup: int = 1, concurrency: int = 1,
+        job_description: str = DEFAULT_JOB_DESCRIPTION, stub: bool = True,
+        stub_latency_ms: float = 0.0, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Benchmark ``paths`` and return the report dict."""
+    from .result_cache import ANALYZER_VERSION
+    from .text_classification import analyze_resume_result
+
+    stages = _stage_functions(job_description)
+    stage_seconds: Dict[str, List[float]] = {name: [] for name, _ in stages}
+    pipeline_seconds: List[float] = []
+    per_document: Dict[str, List[float]] = {os.path.basename(p): [] for p in paths}
+
+    def pipeline(path):
+        _, seconds = _time(analyze_resume_result, path, job_description, None, None, 'Software Engineer')
+        return path, seconds
+
+    services = stubbed_services(stub_latency_ms) if stub else contextlib.nullcontext()
+    with services, override_settings(ANALYSIS_CACHE_ENABLED=False):
+        for path in paths:
+            for _ in range(warmup):
+                pipeline(path)
+
+        for path in paths:
+            if progress:
+                progress(f"stages: {os.path.basename(path)}")
+            for _ in range(iterations):
+                state = {'path': path}
+                for name, fn in stages:
+                    stage_seconds[name].append(_time(fn, state)[1])
+
+        if progress:
+            progress(f"pipeline: {len(paths)} documents x {iterations} iterations, concurrency {concurrency}")
+        work = [path for _ in range(iterations) for path in paths]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for path, seconds in pool.map(pipeline, work):
+                pipeline_seconds.append(seconds)
+                per_document[os.path.basename(path)].append(seconds)
+        wall = time.perf_counter() - started
+
+    return {
+        'meta': {
+            'documents': sorted(per_document),
+            'iterations': iterations,
+            'concurrency': concurrency,
+            'stubbed_services': stub,
+            'stub_latency_ms': stub_latency_ms if stub else None,
+            'analyzer_version': ANALYZER_VERSION,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'pipeline': dict(summarize(pipeline_seconds),
+                         throughput_per_s=round(len(pipeline_seconds) / wall, 2) if wall else 0.0),
+        'stages': {name: summarize(values) for name, values in stage_seconds.items()},
+        'documents': {name: summarize(values) for name, values in per_document.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+# --- Baseline -------------------------------------------------------------------
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Metric-by-metric comparison; each row has ``regression`` set when worse than ``tolerance``."""
+    rows = []
+
+    def latency(metric: str, now: Optional[float], before: Optional[float]) -> None:
+        if now is None or before is None:
+            return
+        change = (now - before) / before if before else 0.0
+        rows.append({
+            'metric': metric, 'baseline': before, 'current': now, 'change': round(change, 3),
+            'regression': change > tolerance and now - before > MIN_REGRESSION_MS,
+        })
+
+    for key in ('p50_ms', 'p95_ms'):
+        latency(f"pipeline.{key}", report['pipeline'].get(key), baseline.get('pipeline', {}).get(key))
+    before, now = baseline.get('pipeline', {}).get('throughput_per_s'), report['pipeline'].get('throughput_per_s')
+    if before and now is not None:
+        change = (now - before) / before
+        rows.append({'metric': 'pipeline.throughput_per_s', 'baseline': before, 'current': now,
+                     'change': round(change, 3), 'regression': change < -tolerance})
+    for name, stats in report['stages'].items():
+        latency(f"stages.{name}.p50_ms", stats.get('p50_ms'),
+                baseline.get('stages', {}).get(name, {}).get('p50_ms'))
+    before = baseline.get('peak_rss_mb', {}).get('self')
+    if before:
+        now = report['peak_rss_mb']['self']
+        change = (now - before) / before
+        rows.append({'metric': 'peak_rss_mb.self', 'baseline': before, 'current': now,
+                     'change': round(change, 3), 'regression': change > tolerance})
+    return rows
@@ -0,0 +1,72 @@
+"""Optional third-party dependencies, imported on first use.
+
+Extraction, grammar checking and feedback each depend on a package that may
+not be installed (python-docx, pytesseract, language_tool_python,
+google-genai, ...). Importing them when a module loads made every process
+pay for all of them: URL loading, ``manage.py check``, migrations and cold
+workers.
+
+``available(name)`` says whether a capability is installed without
+importing it: it uses ``importlib.util.find_spec``, which locates the
+package without running it. ``load(name)`` imports the module the first time
+a code path needs it; later calls return it from ``sys.modules``.
+``report()`` lists every capability, and /metrics exposes the same list.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import threading
+from typing import Dict
+
+# Capability -> module that provides it
+CAPABILITIES = {
+    'pdfplumber': 'pdfplumber',
+    'docx': 'docx',
+    'pdf2image': 'pdf2image',
+    'pytesseract': 'pytesseract',
+    'pil': 'PIL',
+    'language_tool': 'language_tool_python',
+    'genai': 'google.genai',
+    'httpx': 'httpx',
+}
+
+_lock = threading.Lock()
+_found: Dict[str, bool] = {}
+
+
+class MissingDependency(ImportError):
+    """A code path needed a capability that is not installed."""
+
+
+def installed(module: str) -> bool:
+    """Whether ``module`` can be imported, without importing it (cached)."""
+    found = _found.get(module)
+    if found is None:
+        try:
+            found = importlib.util.find_spec(module) is not None
+        except (ImportError, ValueError):  # e.g. the parent package of a dotted name is missing
+            found = False
+        with _lock:
+            _found[module] = found
+    return found
+
+
+def available(name: str) -> bool:
+    return installed(CAPABILITIES[name])
+
+
+def load(name: str):
+    """Import and return the module behind ``name``; MissingDependency if it is not installed."""
+    module = CAPABILITIES[name]
+    if not installed(module):
+        raise MissingDependency(f"{module} is not installed")
+    return importlib.import_module(module)
+
+
+def ocr_available() -> bool:
+    return available('pdf2image') and available('pytesseract')
+
+
+def report() -> Dict[str, bool]:
+    return {name: available(name) for name in CAPABILITIES}
@@ -0,0 +1,152 @@
+"""Parse extracted resume text once into the views every analyzer needs.
+
+``parse(raw_text)`` returns a ``ParsedDocument``. The document *is* the
+normalized text (a ``str`` equal to ``clean_text(raw_text)``), so it can be
+passed wherever resume text was passed before. It also carries, computed in
+one go:
+
+- ``lowered``: the lowercase view
+- ``tokens``: lowercase word tokens (see ``tokenize``)
+- ``line_spans``: ``(start, end)`` of each non-empty source line within the
+  normalized text, whose whitespace had erased the line breaks
+- ``bullet_lines``: indexes of lines that start with a bullet marker
+- ``sections``: the spans of recognised section headings and their bodies
+
+``chunks()`` splits the document along those sections for embedding.
+
+Analyzers call ``of(text)``, which returns the document unchanged or parses a
+plain string, and read these views instead of re-splitting, re-lowercasing
+or re-running regexes over the same text.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_BULLETS = "-•*"
+
+# Heading line (lowercase, surrounding punctuation stripped) -> section name
+SECTION_HEADINGS = {
+    'summary': 'summary', 'professional summary': 'summary', 'profile': 'summary',
+    'about': 'summary', 'about me': 'summary', 'objective': 'summary', 'career objective': 'summary',
+    'skills': 'skills', 'technical skills': 'skills', 'core skills': 'skills', 'key skills': 'skills',
+    'top skills': 'skills', 'core competencies': 'skills', 'technologies': 'skills',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'projects': 'projects', 'personal projects': 'projects', 'academic projects': 'projects',
+    'education': 'education', 'academic background': 'education', 'qualifications': 'education',
+    'certifications': 'certifications', 'licenses & certifications': 'certifications',
+    'awards': 'awards', 'honors & awards': 'awards', 'achievements': 'awards',
+    'publications': 'publications', 'languages': 'languages', 'interests': 'interests',
+    'volunteer experience': 'volunteering', 'volunteering': 'volunteering',
+    'contact': 'contact', 'contact information': 'contact',
+}
+_MAX_HEADING_WORDS = 4
+
+
+def tokenize(text: str, lowered: bool = False) -> List[str]:
+    """Lowercase word tokens; ``+`` and ``#`` stay part of a token (``c++``, ``c#``, ``+91``).
+
+    Pass ``lowered=True`` when ``text`` is already lowercase.
+    """
+    return _TOKEN.findall(text if lowered else (text or '').lower())
+
+
+class Section(NamedTuple):
+    name: str
+    heading: Tuple[int, int]  # span of the heading line
+    start: int                # body: after the heading ...
+    end: int                  # ... up to the next heading or the end of the text
+
+
+class Chunk(NamedTuple):
+    section: str  # section name, or 'header' for text before the first heading
+    text: str
+
+
+class ParsedDocument(str):
+    """Normalized resume text with its lowercase, token, line and section views."""
+
+    lowered: str
+    tokens: List[str]
+    line_spans: List[Tuple[int, int]]
+    bullet_lines: List[int]
+    sections: List[Section]
+
+    @property
+    def word_count(self) -> int:
+        # Normalized text has single spaces, so this equals len(self.split())
+        return self.count(' ') + 1 if self else 0
+
+    @property
+    def bullet_count(self) -> int:
+        return len(self.bullet_lines)
+
+    @property
+    def lines(self) -> List[str]:
+        return [self[start:end] for start, end in self.line_spans]
+
+    def section_text(self, name: str) -> str:
+        """Body text of every section called ``name``, joined by newlines."""
+        return '\n'.join(self[s.start:s.end].strip() for s in self.sections if s.name == name)
+
+    def section_map(self) -> Dict[str, str]:
+        return {name: self.section_text(name) for name in dict.fromkeys(s.name for s in self.sections)}
+
+    def chunks(self, max_words: int) -> List[Chunk]:
+        """Each section (heading included) cut into pieces of at most ``max_words`` words."""
+        spans = [('header', 0, self.sections[0].heading[0] if self.sections else len(self))]
+        spans += [(s.name, s.heading[0], s.end) for s in self.sections]
+        chunks = []
+        for name, start, end in spans:
+            words = self[start:end].split()
+            for i in range(0, len(words), max(1, max_words)):
+                chunks.append(Chunk(name, ' '.join(words[i:i + max_words])))
+        return chunks
+
+
+def _heading(line: str) -> Optional[str]:
+    if line.count(' ') >= _MAX_HEADING_WORDS:
+        return None
+    return SECTION_HEADINGS.get(line.strip(' :-|•*#').lower())
+
+
+def parse(raw_text: str) -> ParsedDocument:
+    """Normalize extracted text and build its views in a single pass over the lines."""
+    parts: List[str] = []
+    spans: List[Tuple[int, int]] = []
+    bullets: List[int] = []
+    headings: List[Tuple[str, Tuple[int, int]]] = []
+    pos = 0
+    for line in (raw_text or '').replace('\x00', ' ').splitlines():
+        line = ' '.join(line.split())
+        if not line:
+            continue
+        if parts:
+            pos += 1
+        span = (pos, pos + len(line))
+        if line[0] in _BULLETS and line[1:2] == ' ':
+            bullets.append(len(spans))
+        name = _heading(line)
+        if name:
+            headings.append((name, span))
+        spans.append(span)
+        parts.append(line)
+        pos = span[1]
+
+    doc = ParsedDocument(' '.join(parts))
+    doc.lowered = doc.lower()
+    doc.tokens = tokenize(doc.lowered, lowered=True)
+    doc.line_spans = spans
+    doc.bullet_lines = bullets
+    doc.sections = [
+        Section(name, span, span[1], headings[i + 1][1][0] if i + 1 < len(headings) else len(doc))
+        for i, (name, span) in enumerate(headings)
+    ]
+    return doc
+
+
+def of(text) -> ParsedDocument:
+    """``text`` itself if it is already parsed, else ``parse(text)``."""
+    return text if isinstance(text, ParsedDocument) else parse(text)
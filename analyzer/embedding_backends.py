@@ -0,0 +1,83 @@
+"""Embedding backends: one ``encode`` interface over different CPU runtimes.
+
+``EMBED_BACKEND`` picks the runtime ``model_registry`` loads:
+
+- ``sentence-transformers`` (default, the reference): the PyTorch
+  SentenceTransformer.
+- ``onnx``: the model's ONNX export run by onnxruntime, with the HF
+  ``tokenizers`` tokenizer and the pooling/normalization done in numpy. Same
+  numbers up to float rounding, without importing torch.
+- ``onnx-int8``: the dynamically int8-quantized ONNX export. It is smaller
+  and faster on CPU, and its cosine scores differ slightly. Measure the
+  difference with ``manage.py check_embedding_backend`` before switching.
+
+The ONNX files come from ``EMBED_ONNX_DIR`` (a local copy of the model repo
+for offline hosts), or else from the Hugging Face Hub. sentence-transformers
+repos ship ``onnx/model.onnx`` and quantized variants next to the tokenizer.
+``EMBED_ONNX_FILE`` overrides which ``.onnx`` file is used, e.g.
+``onnx/model_qint8_avx512_vnni.onnx`` on hosts with VNNI.
+
+Backends that change the vectors get their own cache identity
+(``model_registry.model_id()``), so chunk and submission embeddings computed
+by one backend are never mixed with another's.
+
+This module is imported on every request (via model_registry), so runtimes
+and numpy are only imported by the loaders.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from . import capabilities
+
+REFERENCE = 'sentence-transformers'
+
+
+class Backend(NamedTuple):
+    requires: Tuple[str, ...]    # modules that must be importable
+    load: Callable[[str], Any]   # model name -> object with .encode()
+
+
+def _load_sentence_transformer(name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _onnx_loader(default_file: str) -> Callable[[str], Any]:
+    def load(name: str):
+        from .onnx_embedding import load_onnx_model
+        return load_onnx_model(name, getattr(settings, 'EMBED_ONNX_FILE', None) or default_file)
+    return load
+
+
+_ONNX_REQUIRES = ('onnxruntime', 'tokenizers')
+
+BACKENDS: Dict[str, Backend] = {
+    REFERENCE: Backend(('sentence_transformers',), _load_sentence_transformer),
+    'onnx': Backend(_ONNX_REQUIRES, _onnx_loader('onnx/model.onnx')),
+    'onnx-int8': Backend(_ONNX_REQUIRES, _onnx_loader('onnx/model_quint8_avx2.onnx')),
+}
+
+
+def current() -> str:
+    return getattr(settings, 'EMBED_BACKEND', REFERENCE)
+
+
+def get(name: str) -> Backend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown EMBED_BACKEND {name!r}; choose one of {', '.join(sorted(BACKENDS))}") from None
+
+
+def available(name: str) -> bool:
+    """Whether the backend's runtime is installed, without importing it."""
+    return all(capabilities.installed(module) for module in get(name).requires)
+
+
+def load(name: str, model_name: str):
+    return get(name).load(model_name)
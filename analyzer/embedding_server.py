@@ -0,0 +1,267 @@
+"""Local embedding sidecar: one process owns the model, workers encode over a Unix socket.
+
+``manage.py run_embedding_server`` loads the model once and serves
+``encode`` requests on ``EMBED_SERVER_SOCKET``. Requests arriving within
+``EMBED_SERVER_WINDOW_MS`` of each other are merged into one micro-batch (up
+to ``EMBED_SERVER_MAX_BATCH`` texts) and encoded with a single model call, so
+concurrent analyses share the batching throughput of one model instead of
+each worker process holding its own copy.
+
+When the setting is present, ``model_registry.get_embed_model()`` returns a
+``SidecarEmbedModel``. It has the same ``encode`` signature as
+SentenceTransformer and falls back to the in-process model whenever the
+sidecar cannot be reached.
+
+Wire format: every message is a 4-byte big-endian length followed by the
+body. A request is one JSON body, ``{"texts": [...], "normalize": bool}``.
+A reply is a JSON header, ``{"ok": true, "shape": [n, dim]}`` or
+``{"ok": false, "error": ...}``, followed on success by a body of
+float32 rows.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('!I')
+
+
+class EmbeddingServerError(Exception):
+    """The sidecar could not be reached or reported a failure."""
+
+
+def _send(sock: socket.socket, body: bytes) -> None:
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError('embedding server closed the connection')
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, size)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# --- Server -----------------------------------------------------------------------
+
+class _Pending:
+    __slots__ = ('texts', 'done', 'vectors', 'error')
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests and runs them as one model call."""
+
+    def __init__(self, model, max_batch: int = 64, window_ms: float = 5.0, encode_batch_size: int = 32):
+        self.model = model
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.encode_batch_size = encode_batch_size
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        pending = _Pending(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise EmbeddingServerError(pending.error)
+        return pending.vectors
+
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = [text for item in batch for text in item.texts]
+            try:
+                vectors = np.asarray(
+                    self.model.encode(texts, batch_size=self.encode_batch_size, normalize_embeddings=False),
+                    dtype=np.float32,
+                )
+            except Exception as e:
+                logger.exception('Encoding a batch of %d texts failed', len(texts))
+                for item in batch:
+                    item.error = str(e)
+                    item.done.set()
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            offset = 0
+            for item in batch:
+                item.vectors = vectors[offset:offset + len(item.texts)]
+                offset += len(item.texts)
+                item.done.set()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher: MicroBatcher = self.server.batcher
+        while True:
+            try:
+                request = json.loads(_recv(self.request))
+            except (ConnectionError, OSError):
+                return
+            except ValueError as e:
+                _send(self.request, json.dumps({'ok': False, 'error': f'bad request: {e}'}).encode())
+                return
+            texts = [str(text) for text in request.get('texts', [])]
+            try:
+                vectors = batcher.encode(texts) if texts else np.empty((0, 0), dtype=np.float32)
+            except EmbeddingServerError as e:
+                _send(self.request, json.dumps({'ok': False, 'error': str(e)}).encode())
+                continue
+            if request.get('normalize', True) and len(vectors):
+                vectors = _normalize(vectors)
+            _send(self.request, json.dumps({'ok': True, 'shape': list(vectors.shape)}).encode())
+            _send(self.request, np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 refuses bursts of new worker connections
+
+    def __init__(self, socket_path: str, batcher: MicroBatcher):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left over from a previous run
+        self.batcher = batcher
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+
+# --- Client -----------------------------------------------------------------------
+
+class SidecarEmbedModel:
+    """Drop-in for SentenceTransformer.encode that talks to the sidecar.
+
+    Connections are kept per thread. If the sidecar is unreachable the
+    in-process model (``fallback()``) is used instead, and the sidecar is
+    not tried again for ``EMBED_SERVER_RETRY_SECONDS``.
+    """
+
+    def __init__(self, socket_path: str, fallback, timeout: float = 30.0, retry_seconds: float = 30.0):
+        self.socket_path = socket_path
+        self.fallback = fallback
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _drop_connection(self) -> None:
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def encode_remote(self, texts: Sequence[str], normalize_embeddings: bool = True) -> np.ndarray:
+        body = json.dumps({'texts': [str(text) for text in texts], 'normalize': normalize_embeddings}).encode()
+        for attempt in (1, 2):  # a kept-alive connection may have been closed by a server restart
+            try:
+                sock = self._connection()
+                _send(sock, body)
+                header = json.loads(_recv(sock))
+                if not header.get('ok'):
+                    raise EmbeddingServerError(header.get('error', 'embedding server error'))
+                rows, dim = header['shape']
+                data = _recv(sock)
+                return np.frombuffer(data, dtype=np.float32).reshape(rows, dim) if rows else \
+                    np.empty((0, 0), dtype=np.float32)
+            except (OSError, ValueError) as e:
+                self._drop_connection()
+                if attempt == 2:
+                    raise EmbeddingServerError(str(e)) from e
+
+    def encode(self, sentences, batch_size: Optional[int] = None, normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = None
+        if time.monotonic() >= self._down_until:
+            try:
+                vectors = self.encode_remote(texts, normalize_embeddings)
+            except EmbeddingServerError as e:
+                logger.warning('Embedding server unavailable (%s); encoding in-process', e)
+                self._down_until = time.monotonic() + self.retry_seconds
+        if vectors is None:
+            metrics.fallback('embedding_server')
+            model = self.fallback()
+            if model is None:
+                raise EmbeddingServerError('embedding server unavailable and no local model')
+            if batch_size:
+                kwargs['batch_size'] = batch_size
+            vectors = model.encode(texts, normalize_embeddings=normalize_embeddings, **kwargs)
+        return vectors[0] if single else vectors
+
+
+def client_from_settings(fallback) -> Optional[SidecarEmbedModel]:
+    socket_path = getattr(settings, 'EMBED_SERVER_SOCKET', None)
+    if not socket_path:
+        return None
+    return SidecarEmbedModel(
+        socket_path, fallback,
+        timeout=getattr(settings, 'EMBED_SERVER_TIMEOUT', 30.0),
+        retry_seconds=getattr(settings, 'EMBED_SERVER_RETRY_SECONDS', 30.0),
+    )
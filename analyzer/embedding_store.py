@@ -0,0 +1,269 @@
+"""Persisted submission embeddings and vectorized similarity search.
+
+Resumes are embedded per section, in chunks short enough for the model not to
+truncate them (``EMBED_CHUNK_WORDS``); the chunks and the job description go
+to the model in one batched ``encode`` call. Every chunk vector is cached in
+``ChunkEmbedding`` under a hash of the model name and chunk text, so an edited
+resume only re-encodes the chunks that changed and a job description shared
+by many submissions is encoded once. ``match()`` scores a resume by the mean
+of its ``EMBED_TOP_CHUNKS`` best chunks against the job.
+
+A submission's pooled resume vector and its job vector are stored as
+normalized float32 blobs in ``SubmissionEmbedding`` for search.
+
+``search()`` answers "which stored resumes fit this job" with one encode and
+one matrix-vector product: every stored resume vector is stacked into a
+matrix that stays in memory and is rebuilt only when the table changes.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from . import document, model_registry, result_cache
+from .models import ChunkEmbedding, ResumeSubmission, SubmissionEmbedding
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def to_blob(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_blob(blob) -> np.ndarray:
+    return np.frombuffer(bytes(blob), dtype=np.float32)
+
+
+# Keys per ``IN (...)`` query, under SQLite's historical 999 host-parameter limit
+_IN_BATCH = 900
+
+
+def _slices(values: Sequence, size: int = _IN_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def chunk_key(text: str) -> str:
+    return text_hash(f"{model_registry.model_id()}\0{text}")
+
+
+def encode_cached(texts: Sequence[str], embed_model, cache: bool = True,
+                  batch_size: Optional[int] = None) -> np.ndarray:
+    """Normalized vectors for ``texts`` (one row each), encoding only uncached ones, in one call.
+
+    The chunk cache is bypassed when ``cache`` is False or ANALYSIS_CACHE_ENABLED is off.
+    """
+    cache = cache and result_cache.enabled()
+    keys = [chunk_key(text) for text in texts]
+    found: Dict[str, np.ndarray] = {}
+    if cache:
+        for part in _slices(list(set(keys))):
+            for key, blob in ChunkEmbedding.objects.filter(key__in=part).values_list('key', 'vector'):
+                found[key] = from_blob(blob)
+
+    missing = list(dict.fromkeys(key for key in keys if key not in found))
+    if missing:
+        text_of = dict(zip(keys, texts))
+        encoded = embed_model.encode([text_of[key] for key in missing], normalize_embeddings=True,
+                                     batch_size=batch_size or getattr(settings, 'EMBED_BATCH_SIZE', 32))
+        for key, vector in zip(missing, encoded):
+            found[key] = np.asarray(vector, dtype=np.float32)
+        if cache:
+            ChunkEmbedding.objects.bulk_create(
+                [ChunkEmbedding(key=key, dim=int(found[key].shape[0]), vector=to_blob(found[key]))
+                 for key in missing],
+                ignore_conflicts=True,
+            )
+            _evict_chunks()
+    return np.vstack([found[key] for key in keys])
+
+
+def _evict_chunks() -> None:
+    limit = getattr(settings, 'EMBED_CHUNK_CACHE_MAX_ENTRIES', 100000)
+    excess = ChunkEmbedding.objects.count() - limit
+    if excess > 0:
+        oldest = list(ChunkEmbedding.objects.order_by('created_at').values_list('pk', flat=True)[:excess])
+        for part in _slices(oldest):
+            ChunkEmbedding.objects.filter(pk__in=part).delete()
+
+
+@dataclass
+class ChunkedMatch:
+    similarity: float                     # mean of the best chunk scores
+    section_similarity: Dict[str, float]  # best chunk score per section
+    chunk_count: int
+    resume_vector: np.ndarray             # length-weighted mean of the chunk vectors, normalized
+    job_vector: np.ndarray
+
+
+def match_many(resume_texts: Sequence[str], job_text: str, embed_model, cache: bool = True,
+               batch_size: Optional[int] = None, job_vector=None) -> List[ChunkedMatch]:
+    """Score each resume against ``job_text`` chunk by chunk, with one ``encode`` call for all of them.
+
+    ``job_vector`` is the job's normalized vector if already known (e.g. a JobPosting's), saving its encoding.
+    """
+    if not resume_texts:
+        return []
+    max_words = getattr(settings, 'EMBED_CHUNK_WORDS', 160)
+    top_k = max(1, getattr(settings, 'EMBED_TOP_CHUNKS', 3))
+    per_resume = [document.of(text).chunks(max_words) or [document.Chunk('header', str(text))]
+                  for text in resume_texts]
+    texts = [chunk.text for chunks in per_resume for chunk in chunks]
+    if job_vector is None:
+        vectors = encode_cached(texts + [job_text or ''], embed_model, cache, batch_size)
+        vectors, job_vec = vectors[:-1], vectors[-1]
+    else:
+        vectors = encode_cached(texts, embed_model, cache, batch_size)
+        job_vec = np.asarray(job_vector, dtype=np.float32)
+    all_scores = vectors @ job_vec
+
+    results, offset = [], 0
+    for chunks in per_resume:
+        chunk_vecs = vectors[offset:offset + len(chunks)]
+        scores = all_scores[offset:offset + len(chunks)]
+        offset += len(chunks)
+        sections: Dict[str, float] = {}
+        for chunk, score in zip(chunks, scores):
+            sections[chunk.section] = max(sections.get(chunk.section, -1.0), float(score))
+        weights = np.asarray([chunk.text.count(' ') + 1 for chunk in chunks], dtype=np.float32)
+        pooled = (chunk_vecs * weights[:, None]).sum(axis=0)
+        pooled /= np.linalg.norm(pooled) or 1.0
+        top = np.sort(scores)[::-1][:top_k]
+        results.append(ChunkedMatch(float(top.mean()), sections, len(chunks), pooled.astype(np.float32), job_vec))
+    return results
+
+
+def match(resume_text: str, job_text: str, embed_model, cache: bool = True, job_vector=None) -> ChunkedMatch:
+    """Score ``resume_text`` against ``job_text`` chunk by chunk (see the module docstring)."""
+    return match_many([resume_text], job_text, embed_model, cache, job_vector=job_vector)[0]
+
+
+def match_for_submission(submission_id: int, resume_text: str, job_text: str, embed_model,
+                         job_vector=None) -> ChunkedMatch:
+    """``match()``, also storing the submission's pooled resume and job vectors for search."""
+    result = match(resume_text, job_text, embed_model, job_vector=job_vector)
+    name = model_registry.model_id()
+    resume_hash, job_hash = text_hash(resume_text), text_hash(job_text)
+    stored = SubmissionEmbedding.objects.filter(submission_id=submission_id).only(
+        'model_name', 'resume_text_hash', 'job_text_hash', 'chunked').first()
+    if stored is None or (stored.model_name, stored.resume_text_hash, stored.job_text_hash, stored.chunked) != (
+            name, resume_hash, job_hash, True):
+        store_submission_vectors(submission_id, resume_text, job_text, result)
+    return result
+
+
+def store_submission_vectors(submission_id: int, resume_text: str, job_text: str, result: ChunkedMatch) -> None:
+    """Save ``result``'s pooled resume vector and job vector as the submission's embedding."""
+    SubmissionEmbedding.objects.update_or_create(
+        submission_id=submission_id,
+        defaults={
+            'model_name': model_registry.model_id(),
+            'dim': int(result.resume_vector.shape[0]),
+            'resume_vector': to_blob(result.resume_vector),
+            'resume_text_hash': text_hash(resume_text),
+            'job_vector': to_blob(result.job_vector),
+            'job_text_hash': text_hash(job_text),
+            'chunked': True,
+        },
+    )
+
+
+def copy_submission_vectors(submission_id: int, job_text: str) -> bool:
+    """Give a submission the stored vectors of an earlier submission of the same file and job text.
+
+    For analyses served from the result cache, which compute no vectors.
+    Whether there was one to copy.
+    """
+    sha = ResumeSubmission.objects.filter(pk=submission_id).values_list('resume_sha256', flat=True).first()
+    if not sha:
+        return False
+    source = SubmissionEmbedding.objects.filter(
+        submission__resume_sha256=sha, job_text_hash=text_hash(job_text),
+        model_name=model_registry.model_id(), chunked=True,
+    ).exclude(submission_id=submission_id).first()
+    if source is None:
+        return False
+    SubmissionEmbedding.objects.update_or_create(
+        submission_id=submission_id,
+        defaults={field: getattr(source, field) for field in (
+            'model_name', 'dim', 'resume_vector', 'resume_text_hash', 'job_vector', 'job_text_hash', 'chunked')},
+    )
+    return True
+
+
+class _ResumeMatrix:
+    """All stored resume vectors for the current model, stacked row-wise."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self.submission_ids = np.empty(0, dtype=np.int64)
+        self.user_ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+
+    def refresh(self) -> None:
+        name = model_registry.model_id()
+        # Whole-text vectors from before chunking are not comparable; embed_submissions replaces them.
+        rows = SubmissionEmbedding.objects.filter(model_name=name, chunked=True)
+        state = rows.aggregate(count=Count('pk'), latest=Max('updated_at'))
+        version = (name, state['count'], state['latest'])
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            ids, users, vectors = [], [], []
+            for submission_id, user_id, blob in rows.values_list(
+                    'submission_id', 'submission__user_id', 'resume_vector').iterator():
+                ids.append(submission_id)
+                users.append(user_id if user_id is not None else -1)
+                vectors.append(from_blob(blob))
+            self.submission_ids = np.asarray(ids, dtype=np.int64)
+            self.user_ids = np.asarray(users, dtype=np.int64)
+            self.vectors = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+            self._version = version
+
+
+_matrix = _ResumeMatrix()
+
+
+def search(job_text: Optional[str] = None, *, vector=None, top_k: Optional[int] = 10,
+           user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Stored resumes most similar to ``job_text`` (or a given ``vector``).
+
+    ``user_id`` limits the search to that user's submissions. Returns
+    ``[{'submission_id', 'semantic_similarity'}]`` best first.
+    """
+    if vector is None:
+        model = model_registry.get_embed_model()
+        if model is None:
+            raise RuntimeError("Embedding model not loaded.")
+        vector = model.encode([job_text or ''], normalize_embeddings=True)[0]
+    vector = np.asarray(vector, dtype=np.float32)
+
+    _matrix.refresh()
+    ids, users, matrix = _matrix.submission_ids, _matrix.user_ids, _matrix.vectors
+    if user_id is not None:
+        mask = users == user_id
+        ids, matrix = ids[mask], matrix[mask]
+    if not len(ids):
+        return []
+
+    scores = matrix @ vector
+    if top_k and top_k < len(scores):
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+    else:
+        best = np.argsort(-scores)
+    return [{'submission_id': int(ids[i]), 'semantic_similarity': float(scores[i])} for i in best]
@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from .models import ResumeSubmission
+from .models import JobPosting, ResumeSubmission
+from .uploads import UNSUPPORTED_MESSAGE, supported_extension
 import os
 
 class LoginForm(forms.Form):
@@ -54,11 +55,8 @@ class ResumeSubmissionForm(forms.ModelForm):
             raise forms.ValidationError('Please provide either a resume file or paste resume text.')
 
         # If file provided, validate extension
-        if resume_file:
-            name = resume_file.name.lower()
-            valid_ext = ['.pdf', '.doc', '.docx']
-            if not any(name.endswith(ext) for ext in valid_ext):
-                raise forms.ValidationError('Unsupported file type. Use PDF, DOC or DOCX.')
+        if resume_file and not supported_extension(resume_file.name):
+            raise forms.ValidationError(UNSUPPORTED_MESSAGE)
 
         # target_role (job title) is optional here; job description can be supplied instead
         # if not target_role:
@@ -68,6 +66,17 @@ class ResumeSubmissionForm(forms.ModelForm):
 
 from django import forms
 
+
+def _job_posting_description(cleaned, required=False):
+    """Use the chosen job posting's description as the job description."""
+    posting = cleaned.get('job_posting')
+    if posting is not None:
+        cleaned['job_description'] = posting.description
+    elif required and not cleaned.get('job_description'):
+        raise forms.ValidationError('Provide a job description or choose a job posting.')
+    return cleaned
+
+
 class ResumeUploadForm(forms.Form):
     resume_file = forms.FileField(
         label='Upload your Resume (.pdf, .docx, .txt)',
@@ -79,3 +88,47 @@ class ResumeUploadForm(forms.Form):
         required=False,
         widget=forms.Textarea(attrs={'rows': 10, 'cols': 50})
     )
+    target_role = forms.CharField(max_length=255, required=False)
+    job_posting = forms.ModelChoiceField(
+        queryset=JobPosting.objects.all(),
+        required=False,
+        help_text='Analyze against a saved job posting instead of a pasted description.'
+    )
+
+    def clean_resume_file(self):
+        resume_file = self.cleaned_data['resume_file']
+        if not supported_extension(resume_file.name):
+            raise forms.ValidationError(UNSUPPORTED_MESSAGE)
+        return resume_file
+
+    def clean(self):
+        return _job_posting_description(super().clean())
+
+
+class BatchRankForm(forms.Form):
+    job_description = forms.CharField(widget=forms.Textarea, required=False)
+    job_posting = forms.ModelChoiceField(queryset=JobPosting.objects.all(), required=False)
+    submission_ids = forms.CharField(
+        required=False,
+        help_text='Comma-separated ResumeSubmission ids to rank alongside any uploaded files.'
+    )
+    top = forms.IntegerField(required=False, min_value=1)
+
+    def clean_submission_ids(self):
+        raw = self.cleaned_data.get('submission_ids') or ''
+        try:
+            return [int(part) for part in raw.replace(' ', '').split(',') if part]
+        except ValueError:
+            raise forms.ValidationError('Submission ids must be comma-separated integers.')
+
+    def clean(self):
+        return _job_posting_description(super().clean(), required=True)
+
+
+class ResumeSearchForm(forms.Form):
+    job_description = forms.CharField(widget=forms.Textarea, required=False)
+    job_posting = forms.ModelChoiceField(queryset=JobPosting.objects.all(), required=False)
+    top_k = forms.IntegerField(required=False, min_value=1, max_value=1000, initial=10)
+
+    def clean(self):
+        return _job_posting_description(super().clean(), required=True)
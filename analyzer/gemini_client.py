@@ -5,12 +5,16 @@ This module uses environment variables to decide whether to call the real API:
 - GEMINI_API_URL : Full endpoint URL to POST generation requests to
 
 If those are not set, the client returns a deterministic mock response suitable
-for local development.
+for local development. Calls go through ``http_client`` (pooled connections,
+per-key rate limiting, retries, circuit breaker); when the upstream is
+unhealthy the mock result is returned straight away. Pointing GEMINI_API_URL
+at a local stub server exercises the whole path.
 
 The expected return value of analyze_resume(...) is a dict with keys:
  - score: int (0-100)
  - skills: list[str]
  - recommendations: list[str]
+ - mock: True, only on the mock result
 
 Note: the exact Gemini HTTP API may differ by product/version. This wrapper
 keeps the network code minimal; adapt request/response parsing to the exact
@@ -22,120 +26,98 @@ from __future__ import annotations
 import os
 import json
 import logging
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
 
-import requests
+from . import document, http_async, http_client, metrics, prompts
+from .stages import stage_timeout
 
 logger = logging.getLogger(__name__)
 
 
 def _build_prompt(resume_text: str, target_role: str) -> str:
-    # Prompt engineering: ask the model explicitly for JSON output
-    prompt = (
-        "You are an expert resume reviewer.\n"
-        "Given the resume text and the target job role, extract the candidate's"
-        " key technical and soft skills as a JSON array, produce a short list of"
-        " actionable recommendations to improve the resume for the role, and"
-        " provide a relevance score from 0 to 100 (higher is better).\n\n"
-        "Respond ONLY with a JSON object with keys: score (integer), skills (array of strings),"
-        " recommendations (array of strings). Do not add extra explanation.\n\n"
-        "Resume:\n" + resume_text + "\n\n"
-        "Target role: " + target_role + "\n"
-    )
-    return prompt
+    # Prompt engineering (ask explicitly for JSON) and token budgets live in prompts.py
+    return prompts.structured_prompt(resume_text, target_role).text
 
 
-def analyze_resume(resume_text: str, target_role: str, timeout: int = 20) -> Dict:
-    """Analyze resume using Gemini API if configured, otherwise return a mock.
-
-    Args:
-        resume_text: Plain text of resume (caller should extract/convert PDF if needed).
-        target_role: Target job role string.
-        timeout: HTTP request timeout in seconds.
-
-    Returns:
-        A dict with keys: score:int, skills:list[str], recommendations:list[str]
-    """
-
+def _request_parts(resume_text: str, target_role: str):
+    """(api_url, headers, payload) for a configured endpoint, or None for mock mode."""
     api_key = os.environ.get('GEMINI_API_KEY')
     api_url = os.environ.get('GEMINI_API_URL')
+    if not (api_key and api_url):
+        return None
 
     prompt = _build_prompt(resume_text or '(no text provided)', target_role or '')
-
-    if api_key and api_url:
-        # Call the real Gemini endpoint. The exact request body depends on the
-        # provider; many generative endpoints accept a `prompt` field or similar.
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json',
-        }
-        payload = {
-            'prompt': prompt,
-            # Provider-specific tuning parameters
-            'max_output_tokens': 1024,
-            'temperature': 0.0,
+    # The exact request body depends on the provider; many generative
+    # endpoints accept a `prompt` field or similar.
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json',
+    }
+    payload = {
+        'prompt': prompt,
+        # Provider-specific tuning parameters
+        'max_output_tokens': 1024,
+        'temperature': 0.0,
+    }
+    return api_url, headers, payload
+
+
+def _parse_response(text: str) -> Optional[Dict]:
+    """Normalize a model response body into the result dict, or None if unparseable."""
+    text = text.strip()
+
+    # Try to extract JSON object from the model response. Many LLM
+    # endpoints return a JSON envelope; adjust parsing as needed.
+    try:
+        data = json.loads(text)
+        # If the response is an envelope (e.g., {"candidates": [...]})
+        # try to find the text inside common keys.
+        if isinstance(data, dict):
+            if 'content' in data:
+                body = data['content']
+            elif 'candidates' in data and data['candidates']:
+                body = data['candidates'][0].get('content', '')
+            elif 'output' in data:
+                body = json.dumps(data['output'])
+            else:
+                body = json.dumps(data)
+        else:
+            body = json.dumps(data)
+    except ValueError:
+        # Not JSON: the model responded with a text blob, attempt to parse JSON within
+        body = text
+
+    # Attempt to load JSON from the body
+    try:
+        parsed = json.loads(body)
+        # Normalize result
+        return {
+            'score': int(parsed.get('score', 0)),
+            'skills': parsed.get('skills', []),
+            'recommendations': parsed.get('recommendations', []),
         }
-
-        try:
-            resp = requests.post(api_url, headers=headers, json=payload, timeout=timeout)
-            resp.raise_for_status()
-            text = resp.text.strip()
-
-            # Try to extract JSON object from the model response. Many LLM
-            # endpoints return a JSON envelope; adjust parsing as needed.
+    except Exception:
+        # As a last resort, attempt to find a JSON substring inside the text
+        m = re.search(r'(\{[\s\S]*\})', body)
+        if m:
             try:
-                data = resp.json()
-                # If the response is an envelope (e.g., {"candidates": [...]})
-                # try to find the text inside common keys.
-                if isinstance(data, dict):
-                    if 'content' in data:
-                        body = data['content']
-                    elif 'candidates' in data and data['candidates']:
-                        body = data['candidates'][0].get('content', '')
-                    elif 'output' in data:
-                        body = json.dumps(data['output'])
-                    else:
-                        body = json.dumps(data)
-                else:
-                    body = json.dumps(data)
-            except ValueError:
-                # Not JSON: the model responded with a text blob, attempt to parse JSON within
-                body = text
-
-            # Attempt to load JSON from the body
-            try:
-                parsed = json.loads(body)
-                # Normalize result
+                parsed = json.loads(m.group(1))
                 return {
                     'score': int(parsed.get('score', 0)),
                     'skills': parsed.get('skills', []),
                     'recommendations': parsed.get('recommendations', []),
                 }
             except Exception:
-                # As a last resort, attempt to find a JSON substring inside the text
-                import re
-
-                m = re.search(r'(\{[\s\S]*\})', body)
-                if m:
-                    try:
-                        parsed = json.loads(m.group(1))
-                        return {
-                            'score': int(parsed.get('score', 0)),
-                            'skills': parsed.get('skills', []),
-                            'recommendations': parsed.get('recommendations', []),
-                        }
-                    except Exception:
-                        logger.exception('Failed parsing JSON from model body')
-
-            # If parsing failed, log and fallback to mock
-            logger.warning('Gemini response could not be parsed as JSON; returning mock result')
-
-        except Exception:
-            logger.exception('Error calling Gemini API; falling back to mock result')
+                logger.exception('Failed parsing JSON from model body')
+    return None
+
 
+def _mock_result(resume_text: str) -> Dict:
     # Mock deterministic fallback for dev / missing credentials
     # Create simple heuristics: score based on presence of keywords
-    lower = (resume_text or '').lower()
+    doc = document.of(resume_text or '')
+    lower = doc.lowered
     score = 40
     skills: List[str] = []
     recommendations: List[str] = []
@@ -150,7 +132,7 @@ def analyze_resume(resume_text: str, target_role: str, timeout: int = 20) -> Dic
         skills.append('SQL')
         score += 5
 
-    if len(lower.split()) > 250:
+    if doc.word_count > 250:
         score += 10
     else:
         recommendations.append('Add more detail to experience and projects to increase score')
@@ -165,4 +147,71 @@ def analyze_resume(resume_text: str, target_role: str, timeout: int = 20) -> Dic
         'score': score,
         'skills': skills,
         'recommendations': recommendations,
+        'mock': True,
     }
+
+
+def _retry_deadline() -> Optional[float]:
+    """Seconds the whole call may take, retries included.
+
+    A second under the structured stage's timeout, so a failing upstream ends
+    in the mock result instead of the stage timing out.
+    """
+    timeout = stage_timeout('structured')
+    return max(timeout - 1.0, 0.0) if timeout else None
+
+
+def analyze_resume(resume_text: str, target_role: str, timeout: int = 20) -> Dict:
+    """Analyze resume using Gemini API if configured, otherwise return a mock.
+
+    Args:
+        resume_text: Plain text of resume (caller should extract/convert PDF if needed).
+        target_role: Target job role string.
+        timeout: HTTP request timeout in seconds.
+
+    Returns:
+        A dict with keys: score:int, skills:list[str], recommendations:list[str]
+    """
+    with metrics.timer('gemini_client_seconds', mode='sync'):
+        request = _request_parts(resume_text, target_role)
+        if request is not None:
+            api_url, headers, payload = request
+            try:
+                resp = http_client.get_client().post(api_url, key=headers['Authorization'], headers=headers,
+                                                     json=payload, timeout=timeout, deadline=_retry_deadline())
+                result = _parse_response(resp.text)
+                if result is not None:
+                    return result
+                # If parsing failed, log and fallback to mock
+                logger.warning('Gemini response could not be parsed as JSON; returning mock result')
+            except http_client.UpstreamUnavailable as e:
+                logger.warning('Gemini API unavailable (%s); returning mock result', e)
+            except Exception:
+                logger.exception('Error calling Gemini API; falling back to mock result')
+
+        metrics.fallback('gemini_mock')
+        return _mock_result(resume_text)
+
+
+async def analyze_resume_async(resume_text: str, target_role: str, timeout: int = 20) -> Dict:
+    """Non-blocking analyze_resume for ASGI views; same result and fallbacks."""
+    with metrics.timer('gemini_client_seconds', mode='async'):
+        request = _request_parts(resume_text, target_role)
+        if request is not None:
+            api_url, headers, payload = request
+            try:
+                async with http_async.concurrency_limit('GEMINI_MAX_CONCURRENCY', 50):
+                    resp = await http_client.get_client().apost(api_url, key=headers['Authorization'],
+                                                                headers=headers, json=payload, timeout=timeout,
+                                                                deadline=_retry_deadline())
+                result = _parse_response(resp.text)
+                if result is not None:
+                    return result
+                logger.warning('Gemini response could not be parsed as JSON; returning mock result')
+            except http_client.UpstreamUnavailable as e:
+                logger.warning('Gemini API unavailable (%s); returning mock result', e)
+            except Exception:
+                logger.exception('Error calling Gemini API; falling back to mock result')
+
+        metrics.fallback('gemini_mock')
+        return _mock_result(resume_text)
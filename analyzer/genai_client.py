@@ -0,0 +1,176 @@
+"""Process-wide ``genai.Client`` and in-flight request coalescing.
+
+Building a ``genai.Client`` per resume re-creates its HTTP transport (and TLS
+handshake) on every call; one client per API key is kept for the life of the
+process instead, rebuilt after fork and closed at exit.
+
+``generate_content`` coalesces identical requests: while a call for a given
+(model, prompt) is in flight, further callers with the same prompt wait for
+it and share its result (or its exception) rather than issuing their own.
+Double-submits and the same resume uploaded twice at once therefore cost one
+upstream call. Only concurrent calls are merged; nothing is cached afterwards
+(that is result_cache's job).
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str):
+    """The shared ``genai.Client`` for ``api_key``."""
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                from google import genai
+                client = _clients[api_key] = genai.Client(api_key=api_key)
+    return client
+
+
+def close() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                getattr(client, 'close', lambda: None)()
+            except Exception:
+                logger.debug('Error closing genai client', exc_info=True)
+        _clients.clear()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome.
+
+    With ``metric``, every call is also counted in that metrics counter, by
+    ``kind`` (``upstream`` or ``coalesced``).
+    """
+
+    def __init__(self, metric: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.metric = metric
+        self.calls = 0
+        self.coalesced = 0
+
+    def _record(self, leader: bool) -> None:
+        if leader:
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        if self.metric:
+            metrics.inc(self.metric, kind='upstream' if leader else 'coalesced')
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._record(leader)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        self._record(task is None)
+        if task is None:
+            task = tasks[key] = loop.create_task(fn())
+            task.add_done_callback(lambda _t: tasks.pop(key, None))
+        # A cancelled waiter must not cancel the call the others are waiting on.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'coalesced': self.coalesced}
+
+
+_flight = SingleFlight('genai_requests_total')
+
+
+def _key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+
+def generate_content(api_key: str, model: str, prompt: str) -> str:
+    """Response text for ``prompt``, sharing any identical call already in flight."""
+    def call():
+        resp = get_client(api_key).models.generate_content(model=model, contents=[prompt])
+        return resp.text.strip()
+    return _flight.do(_key(model, prompt), call)
+
+
+async def generate_content_async(api_key: str, model: str, prompt: str) -> str:
+    """Async generate_content; only the leading call takes a GEMINI_MAX_CONCURRENCY slot."""
+    from . import http_async
+
+    async def call():
+        async with http_async.concurrency_limit('GEMINI_MAX_CONCURRENCY', 50):
+            resp = await get_client(api_key).aio.models.generate_content(model=model, contents=[prompt])
+        return resp.text.strip()
+    return await _flight.ado(_key(model, prompt), call)
+
+
+def stream_content(api_key: str, model: str, prompt: str) -> Iterator[str]:
+    """Yield response text as the model produces it.
+
+    Streams are not coalesced: each caller wants its own stream.
+    """
+    for chunk in get_client(api_key).models.generate_content_stream(model=model, contents=[prompt]):
+        if chunk.text:
+            yield chunk.text
+
+
+def stats() -> Dict[str, int]:
+    """Upstream calls made vs. requests that joined one already in flight."""
+    return _flight.stats()
+
+
+def _forget_after_fork() -> None:
+    # The parent's transports and in-flight calls do not carry over.
+    global _clients_lock, _flight
+    _clients.clear()
+    _clients_lock = threading.Lock()
+    _flight = SingleFlight('genai_requests_total')
+
+
+atexit.register(close)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_after_fork)
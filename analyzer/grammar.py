@@ -0,0 +1,178 @@
+"""Bounded pool of long-lived LanguageTool clients for grammar_check.
+
+Creating a ``language_tool_python.LanguageTool`` per resume pays the
+connection/handshake cost every time. The pool keeps up to
+``LANGUAGE_TOOL_POOL_SIZE`` clients alive and hands them out one caller at a
+time. Clients idle for longer than ``LANGUAGE_TOOL_HEALTH_CHECK_SECONDS`` are
+probed before reuse; a client that fails or times out is discarded, and the
+next checkout connects a fresh one.
+
+A call that times out keeps running on its executor thread until it returns;
+it keeps its call slot until then, so new calls never queue behind hung ones
+for an executor thread.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledClient:
+    __slots__ = ('tool', 'last_used')
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.last_used = time.monotonic()
+
+
+class LanguageToolPool:
+    def __init__(self, size: int, language: str, server_url: Optional[str],
+                 timeout: float, health_check_seconds: float):
+        self.size = max(1, size)
+        self.language = language
+        self.server_url = server_url
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+
+        self._idle: "queue.LifoQueue[_PooledClient]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        # Runs the blocking check() calls so they can be abandoned on timeout.
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='languagetool')
+        # One per executor thread; released when the call finishes, even if abandoned.
+        self._calls = threading.BoundedSemaphore(self.size)
+
+    def _connect(self) -> _PooledClient:
+        import language_tool_python
+        if self.server_url:
+            tool = language_tool_python.LanguageTool(self.language, remote_server_addr=self.server_url)
+        else:
+            tool = language_tool_python.LanguageTool(self.language)
+        return _PooledClient(tool)
+
+    @staticmethod
+    def _close(client: _PooledClient) -> None:
+        try:
+            client.tool.close()
+        except Exception:
+            logger.debug('Error closing LanguageTool client', exc_info=True)
+
+    def _run(self, client: _PooledClient, text: str) -> List[Any]:
+        if not self._calls.acquire(timeout=self.timeout):
+            raise TimeoutError(f"All {self.size} LanguageTool calls still in flight after {self.timeout}s")
+        try:
+            future = self._executor.submit(client.tool.check, text)
+        except BaseException:
+            self._calls.release()
+            raise
+        future.add_done_callback(lambda f: self._calls.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The call is still in flight; close the client once it returns.
+            future.add_done_callback(lambda f: self._close(client))
+            raise TimeoutError(f"LanguageTool check timed out after {self.timeout}s")
+
+    def _checkout(self) -> _PooledClient:
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - client.last_used < self.health_check_seconds:
+                return client
+            try:
+                self._run(client, "Health check.")
+                return client
+            except TimeoutError:
+                logger.warning('Idle LanguageTool client timed out its health check; reconnecting')
+            except Exception:
+                logger.warning('Idle LanguageTool client failed its health check; reconnecting')
+                self._close(client)
+
+    def check(self, text: str) -> List[Any]:
+        """Run ``tool.check(text)`` on a pooled client, reconnecting once on failure."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No LanguageTool client free within {self.timeout}s")
+        try:
+            for attempt in (1, 2):
+                client = self._checkout()
+                try:
+                    matches = self._run(client, text)
+                except TimeoutError:
+                    raise
+                except Exception:
+                    self._close(client)
+                    if attempt == 2:
+                        raise
+                    logger.warning('LanguageTool call failed; retrying on a new connection')
+                    continue
+                client.last_used = time.monotonic()
+                self._idle.put(client)
+                return matches
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        self._executor.shutdown(wait=False)
+
+
+async def check_async(text: str) -> List[Tuple[str, str]]:
+    """Check ``text`` against the LanguageTool server's HTTP API on the event loop.
+
+    Returns ``(rule_id, message)`` pairs; in-flight calls are capped by
+    ``LANGUAGE_TOOL_MAX_CONCURRENCY``.
+    """
+    from . import http_async
+
+    url = getattr(settings, 'LANGUAGE_TOOL_URL', 'http://localhost:8081').rstrip('/') + '/v2/check'
+    data = {'language': getattr(settings, 'LANGUAGE_TOOL_LANGUAGE', 'en-US'), 'text': text}
+    async with http_async.concurrency_limit('LANGUAGE_TOOL_MAX_CONCURRENCY', 20):
+        resp = await http_async.get_client().post(
+            url, data=data, timeout=getattr(settings, 'LANGUAGE_TOOL_TIMEOUT', 10.0)
+        )
+    resp.raise_for_status()
+    return [(m.get('rule', {}).get('id', ''), m.get('message', '')) for m in resp.json().get('matches', [])]
+
+
+_pool: Optional[LanguageToolPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> LanguageToolPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LanguageToolPool(
+                    size=getattr(settings, 'LANGUAGE_TOOL_POOL_SIZE', 4),
+                    language=getattr(settings, 'LANGUAGE_TOOL_LANGUAGE', 'en-US'),
+                    server_url=getattr(settings, 'LANGUAGE_TOOL_URL', 'http://localhost:8081'),
+                    timeout=getattr(settings, 'LANGUAGE_TOOL_TIMEOUT', 10.0),
+                    health_check_seconds=getattr(settings, 'LANGUAGE_TOOL_HEALTH_CHECK_SECONDS', 60.0),
+                )
+    return _pool
+
+
+def _forget_pool_after_fork() -> None:
+    # Sockets and executor threads do not survive fork(); children build their own pool.
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
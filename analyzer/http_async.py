@@ -0,0 +1,50 @@
+"""Shared asyncio HTTP plumbing for the async analysis path.
+
+One ``httpx.AsyncClient`` (connection pool + keep-alive) and one semaphore per
+named upstream are kept per event loop, so a single ASGI worker can hold
+many in-flight calls while each upstream only sees as many as its
+``*_MAX_CONCURRENCY`` setting allows. httpx is optional and imported on
+first use: ``http_async.httpx`` is the module, or None when it is missing,
+in which case callers run the sync client in a thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import weakref
+
+from django.conf import settings
+
+from . import capabilities
+
+_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The event loop's shared ``httpx.AsyncClient``."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        import httpx
+        limits = httpx.Limits(
+            max_connections=getattr(settings, 'ASYNC_HTTP_MAX_CONNECTIONS', 100),
+            max_keepalive_connections=getattr(settings, 'ASYNC_HTTP_MAX_KEEPALIVE', 20),
+        )
+        client = _clients[loop] = httpx.AsyncClient(limits=limits)
+    return client
+
+
+def concurrency_limit(setting_name: str, default: int) -> asyncio.Semaphore:
+    """Per-event-loop semaphore sized by ``settings.<setting_name>``."""
+    loop = asyncio.get_running_loop()
+    per_loop = _limits.setdefault(loop, {})
+    sem = per_loop.get(setting_name)
+    if sem is None:
+        sem = per_loop[setting_name] = asyncio.Semaphore(getattr(settings, setting_name, default))
+    return sem
+
+
+def __getattr__(name):
+    if name == 'httpx':
+        return capabilities.load('httpx') if capabilities.available('httpx') else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,288 @@
+"""Pooled, rate-limited, retrying HTTP client for upstream model APIs.
+
+One ``requests.Session`` per process keeps TLS connections alive between
+calls. Each API key gets a token bucket (``GEMINI_RATE_LIMIT_PER_SECOND``,
+bursts up to ``GEMINI_RATE_LIMIT_BURST``), 429/5xx responses and connection
+errors are retried with full-jitter exponential backoff (honouring
+``Retry-After``), and a circuit breaker stops calling an upstream that keeps
+failing, so callers go straight to their fallback instead of waiting out
+timeouts. The async variant shares the buckets and the breaker. A caller
+with a time budget (an analysis stage timeout) passes it as ``deadline``:
+queueing, attempts and backoff all fit inside it.
+
+Everything is configured from settings and the URL is supplied by the
+caller, so the client can be pointed at a local stub server.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailable(Exception):
+    """The call was not made (circuit open or rate limit wait too long) or kept failing."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """Take one token; return how long to wait before using it.
+
+        Raises UpstreamUnavailable, without taking a token, if that would be
+        longer than ``max_wait``.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                raise UpstreamUnavailable(f"Rate limit: next slot in {wait:.1f}s")
+            self._tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; after
+    ``reset_seconds`` lets a single trial call through (half-open)."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning('Circuit opened after %d consecutive upstream failures', self._failures)
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open trial slot that ended up not calling upstream."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryingClient:
+    def __init__(self, *, pool_size: int = 10, rate: float = 5.0, burst: float = 10.0,
+                 max_retries: int = 3, backoff_seconds: float = 0.5, backoff_max: float = 8.0,
+                 max_queue_seconds: float = 10.0, breaker_failures: int = 5,
+                 breaker_reset_seconds: float = 30.0):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max = backoff_max
+        self.max_queue_seconds = max_queue_seconds
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_seconds * 2 ** attempt))
+        try:
+            return max(delay, min(self.backoff_max, float(retry_after)))
+        except (TypeError, ValueError):
+            return delay
+
+    def _admit(self, key: str, remaining: float) -> float:
+        if remaining <= 0:
+            raise UpstreamUnavailable('Deadline exceeded')
+        if not self.breaker.allow():
+            raise UpstreamUnavailable('Circuit open: upstream marked unhealthy')
+        try:
+            return self._bucket(key).reserve(min(self.max_queue_seconds, remaining))
+        except UpstreamUnavailable:
+            self.breaker.release()
+            raise
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str], remaining: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if there is none (out of retries or time)."""
+        if attempt == self.max_retries:
+            return None
+        delay = self._backoff(attempt, retry_after)
+        return delay if delay < remaining else None
+
+    def post(self, url: str, *, key: str = '', timeout: float = 20, deadline: Optional[float] = None,
+             **kwargs) -> requests.Response:
+        """POST with rate limiting, retries and the circuit breaker.
+
+        ``key`` (normally the API key) selects the token bucket; ``deadline``
+        bounds the whole call, retries included, in seconds. Returns the
+        successful response; raises UpstreamUnavailable or the last error.
+        """
+        ends = time.monotonic() + (deadline if deadline is not None else float('inf'))
+        for attempt in range(self.max_retries + 1):
+            wait = self._admit(key, ends - time.monotonic())
+            retry_after = None
+            try:
+                time.sleep(wait)
+                resp = self.session.post(url, timeout=min(timeout, max(ends - time.monotonic(), 0.01)), **kwargs)
+                if resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    self.breaker.record_success()
+                    return resp
+                retry_after = resp.headers.get('Retry-After')
+                error: Exception = requests.HTTPError(f"{resp.status_code} from upstream", response=resp)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.HTTPError:
+                # Other 4xx: the request itself is wrong, retrying will not help.
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                # Says nothing about upstream (bad URL, interrupted), but must not keep a half-open trial slot.
+                self.breaker.release()
+                raise
+            self.breaker.record_failure()
+            delay = self._retry_delay(attempt, retry_after, ends - time.monotonic())
+            if delay is None:
+                raise error
+            logger.info('Upstream call failed (%s); retry %d/%d', error, attempt + 1, self.max_retries)
+            time.sleep(delay)
+        raise AssertionError('unreachable')
+
+    async def apost(self, url: str, *, key: str = '', timeout: float = 20, deadline: Optional[float] = None,
+                    **kwargs):
+        """Async post() on the event loop's shared httpx client (thread fallback without httpx)."""
+        from . import http_async
+
+        if http_async.httpx is None:
+            return await asyncio.to_thread(self.post, url, key=key, timeout=timeout, deadline=deadline, **kwargs)
+        client = http_async.get_client()
+        ends = time.monotonic() + (deadline if deadline is not None else float('inf'))
+        for attempt in range(self.max_retries + 1):
+            wait = self._admit(key, ends - time.monotonic())
+            retry_after = None
+            try:
+                await asyncio.sleep(wait)
+                resp = await client.post(url, timeout=min(timeout, max(ends - time.monotonic(), 0.01)), **kwargs)
+                if resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    self.breaker.record_success()
+                    return resp
+                retry_after = resp.headers.get('Retry-After')
+                error: Exception = http_async.httpx.HTTPStatusError(
+                    f"{resp.status_code} from upstream", request=resp.request, response=resp)
+            except http_async.httpx.TransportError as e:
+                error = e
+            except http_async.httpx.HTTPStatusError:
+                self.breaker.record_success()
+                raise
+            except BaseException:  # e.g. CancelledError from wait_for or a client disconnect
+                self.breaker.release()
+                raise
+            self.breaker.record_failure()
+            delay = self._retry_delay(attempt, retry_after, ends - time.monotonic())
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+        raise AssertionError('unreachable')
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[RetryingClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> RetryingClient:
+    """Process-wide client configured from the ``GEMINI_*`` HTTP settings."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RetryingClient(
+                    pool_size=getattr(settings, 'GEMINI_HTTP_POOL_SIZE', 10),
+                    rate=getattr(settings, 'GEMINI_RATE_LIMIT_PER_SECOND', 5.0),
+                    burst=getattr(settings, 'GEMINI_RATE_LIMIT_BURST', 10),
+                    max_retries=getattr(settings, 'GEMINI_MAX_RETRIES', 3),
+                    backoff_seconds=getattr(settings, 'GEMINI_RETRY_BACKOFF_SECONDS', 0.5),
+                    backoff_max=getattr(settings, 'GEMINI_RETRY_BACKOFF_MAX', 8.0),
+                    max_queue_seconds=getattr(settings, 'GEMINI_RATE_LIMIT_MAX_WAIT', 10.0),
+                    breaker_failures=getattr(settings, 'GEMINI_BREAKER_FAILURES', 5),
+                    breaker_reset_seconds=getattr(settings, 'GEMINI_BREAKER_RESET_SECONDS', 30.0),
+                )
+    return _client
+
+
+def reset() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def _forget_client_after_fork() -> None:
+    # Pooled sockets must not be shared with the parent.
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
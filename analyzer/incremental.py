@@ -0,0 +1,143 @@
+"""Incremental re-analysis: memoized stages keyed by the hashes of their inputs.
+
+The analysis is a small dependency graph::
+
+    file ──► extract ──► resume text ──┬──► grammar ─────────────┐
+                                       ├──► structured ◄── target role
+    job description ───────────────────┴──► keyword_match ───────┴──► prompt ──► feedback
+
+Each stage's output is stored in ``StageResult`` under
+``sha256(ANALYZER_VERSION, stage, digests of its inputs)``. Inputs are hashed
+by content, not by where they came from. ``extract`` is keyed by the file
+hash and the OCR quality; the stages after it are keyed by the text it
+produced. So:
+
+- changing only the job description re-runs keyword_match and feedback;
+  extraction, grammar and the structured review are reused
+- changing only the file re-runs what depends on the resume text; job-side
+  work is reused (the job keywords' automaton and the job embedding, see
+  text_features and embedding_store)
+- a re-exported file with the same text reuses everything after extraction
+
+The whole-result cache (result_cache) is still consulted first; this only
+comes into play when it misses, and is switched off with it
+(``ANALYSIS_CACHE_ENABLED``). Fallback values (timeouts, mock reviews,
+canned feedback) are never stored, so they are retried next time.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+
+from . import metrics, result_cache
+from .models import StageResult
+
+logger = logging.getLogger(__name__)
+
+# Stage -> the inputs its output depends on
+GRAPH = {
+    'extract': ('file', 'ocr_quality'),
+    'grammar': ('resume_text',),
+    'structured': ('resume_text', 'target_role'),
+    'keyword_match': ('resume_text', 'job_description', 'embed_model', 'embed_chunking'),
+    'feedback': ('prompt',),
+}
+
+
+def digest(value: Optional[str]) -> str:
+    return hashlib.sha256((value or '').encode('utf-8')).hexdigest()
+
+
+# Markers of feedback that came from generate_feedback_fallback rather than Gemini. The
+# failures are transient; a missing library is not, so the whole result may still be cached.
+FEEDBACK_FAILURES = ("Gemini request failed", "Gemini stream interrupted")
+FEEDBACK_FALLBACKS = ("Gemini library not installed",) + FEEDBACK_FAILURES
+
+
+def reusable(stage: str, value: Any) -> bool:
+    """Whether ``value`` is a real result worth memoizing rather than a fallback."""
+    if value is None or value == '':
+        return False
+    if stage == 'feedback':
+        return not any(marker in value for marker in FEEDBACK_FALLBACKS)
+    if isinstance(value, dict):
+        if 'error' in value or value.get('mock'):
+            return False
+        if stage == 'grammar' and value.get('errors_count', 0) < 0:
+            return False
+    return True
+
+
+class Memo:
+    """Stage results of one analysis, looked up and stored by input digests.
+
+    Inputs are bound as they become known (the resume text after extraction,
+    the prompt after the analysis); a stage can be looked up once all of its
+    inputs are bound. ``reused`` lists the stages served from the memo.
+    """
+
+    def __init__(self, **inputs: Optional[str]):
+        self._digests: Dict[str, str] = {}
+        self.reused = []
+        for name, value in inputs.items():
+            self.bind(name, value)
+
+    def bind(self, name: str, value: Optional[str]) -> None:
+        self._digests[name] = digest(value)
+
+    def key(self, stage: str) -> str:
+        parts = [result_cache.ANALYZER_VERSION, stage] + [self._digests[name] for name in GRAPH[stage]]
+        return digest('\0'.join(parts))
+
+    def lookup(self, *stages: str) -> Dict[str, Any]:
+        """Memoized outputs of ``stages`` (missing ones are left out), in one query."""
+        if not result_cache.enabled() or not stages:
+            return {}
+        keys = {self.key(stage): stage for stage in stages}
+        try:
+            found = {keys[key]: value for key, value in
+                     StageResult.objects.filter(key__in=list(keys)).values_list('key', 'value')}
+        except Exception as e:
+            logger.warning("Stage memo unavailable: %s", e)
+            return {}
+        for stage in stages:
+            metrics.inc('resume_analysis_stage_memo_total', stage=stage, outcome='hit' if stage in found else 'miss')
+        self.reused.extend(stage for stage in stages if stage in found)
+        return found
+
+    def get(self, stage: str) -> Optional[Any]:
+        return self.lookup(stage).get(stage)
+
+    def store(self, values: Dict[str, Any]) -> None:
+        """Memoize the reusable entries of ``{stage: value}``."""
+        rows = [StageResult(key=self.key(stage), stage=stage, value=value)
+                for stage, value in values.items() if stage in GRAPH and reusable(stage, value)]
+        if not rows or not result_cache.enabled():
+            return
+        try:
+            StageResult.objects.bulk_create(rows, ignore_conflicts=True)
+            _evict()
+        except Exception as e:
+            logger.warning("Could not store stage results: %s", e)
+
+
+def _evict() -> None:
+    limit = getattr(settings, 'ANALYSIS_STAGE_MEMO_MAX_ENTRIES', 20000)
+    excess = StageResult.objects.count() - limit
+    if excess > 0:
+        from .embedding_store import _slices
+        oldest = list(StageResult.objects.order_by('created_at').values_list('pk', flat=True)[:excess])
+        for part in _slices(oldest):
+            StageResult.objects.filter(pk__in=part).delete()
+
+
+def clear(stages: Iterable[str] = ()) -> int:
+    """Delete memoized results, of ``stages`` only if given."""
+    rows = StageResult.objects.all()
+    if stages:
+        rows = rows.filter(stage__in=list(stages))
+    removed, _ = rows.delete()
+    return removed
@@ -0,0 +1,83 @@
+"""Job-side features of a JobPosting, computed once instead of per analysis.
+
+A pasted job description costs every analysis the same work: extracting its
+keywords, cleaning and cutting it to the prompt budget, and encoding it. A
+``JobPosting`` does that when it is saved with a new description
+(``prepare``), and analyses, rankings and searches against the posting read
+the stored results:
+
+- ``keywords``: ``text_features.job_keywords`` of the description
+- ``summary``: the description as the feedback prompt sends it
+  (``prompts.summarize_job``)
+- ``embedding``: the normalized job vector, for ``model_registry.model_id()``
+
+If no embedding model can be loaded at save time, or the model changes later
+(``EMBED_MODEL_NAME``/``EMBED_BACKEND``), the vector is computed by the first
+analysis that needs it and stored on the posting (``vector``). After changing
+``PROMPT_TOKEN_BUDGETS``, re-run ``prepare(posting, force=True)`` and save.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple
+
+from . import model_registry, prompts, text_features
+from .incremental import digest
+
+logger = logging.getLogger(__name__)
+
+PREPARED_FIELDS = ('description_sha256', 'keywords', 'summary', 'embedding', 'embedding_model')
+
+
+def prepare(posting, force: bool = False) -> bool:
+    """Recompute ``posting``'s features if its description changed; whether it did.
+
+    Only sets the fields; the caller (JobPosting.save) saves them.
+    """
+    sha = digest(posting.description)
+    if sha == posting.description_sha256 and not force:
+        return False
+    posting.description_sha256 = sha
+    posting.keywords = sorted(text_features.job_keywords(posting.description))
+    posting.summary = prompts.summarize_job(posting.description)
+    posting.embedding, posting.embedding_model = None, ''
+    model = model_registry.get_embed_model()
+    if model is not None:
+        try:
+            _set_vector(posting, model)
+        except Exception as e:
+            logger.warning("Could not embed job posting %s: %s", posting.pk, e)
+    return True
+
+
+def _set_vector(posting, embed_model):
+    from .embedding_store import encode_cached, to_blob
+    vector = encode_cached([posting.description], embed_model)[0]
+    posting.embedding = to_blob(vector)
+    posting.embedding_model = model_registry.model_id()
+    return vector
+
+
+def vector(posting, embed_model=None):
+    """The posting's job vector for the current model, computing and storing it if missing or stale.
+
+    None if it has to be computed and no embedding model can be loaded.
+    """
+    from .embedding_store import from_blob
+    from .models import JobPosting
+
+    if posting.embedding is not None and posting.embedding_model == model_registry.model_id():
+        return from_blob(posting.embedding)
+    embed_model = embed_model or model_registry.get_embed_model()
+    if embed_model is None:
+        return None
+    vec = _set_vector(posting, embed_model)
+    # Only if the description was not edited meanwhile
+    JobPosting.objects.filter(pk=posting.pk, description_sha256=posting.description_sha256).update(
+        embedding=posting.embedding, embedding_model=posting.embedding_model)
+    return vec
+
+
+def keywords(posting) -> Optional[Tuple[str, ...]]:
+    """The posting's stored keywords, or None (derive them from the text) without a posting."""
+    return tuple(posting.keywords) if posting is not None else None
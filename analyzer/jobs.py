@@ -0,0 +1,280 @@
+"""Database-backed queue for resume analysis.
+
+Uploads create an ``AnalysisJob`` row instead of analyzing inline; worker
+processes started by ``manage.py run_analysis_workers`` claim pending jobs,
+run ``text_classification.analyze_resume_result`` on them and store the result
+on the submission. The queue lives in the regular database (SQLite or
+Postgres), so no outside broker is needed. Batch rankings
+(``BatchRankJob``, from ``batch_rank_view``) go through the same workers, after
+any pending single analyses.
+
+Claiming is a conditional UPDATE (``status='pending'`` -> ``'running'``) on a
+single row; whichever worker's UPDATE matches the row owns the job. This works
+the same on SQLite, which has no ``SELECT ... FOR UPDATE SKIP LOCKED``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics, result_cache
+from .models import AnalysisJob, BatchRankJob, ResumeSubmission
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_analysis(submission: ResumeSubmission) -> AnalysisJob:
+    """Queue ``submission`` for analysis and return the new job.
+
+    A result already in the cache completes the job immediately, without a
+    worker, if the submission's search vectors can be copied from an earlier
+    submission of the same file and job; otherwise a worker computes them
+    (the analysis itself still comes from the cache). With
+    ``ANALYSIS_RUN_INLINE`` enabled the job is run before returning.
+    """
+    cached = _cached_result(submission)
+    if cached is not None and _copy_vectors(submission):
+        submission.store_analysis(cached)
+        now = timezone.now()
+        return AnalysisJob.objects.create(
+            submission=submission, status=AnalysisJob.STATUS_DONE, worker_id='cache',
+            result={'feedback': cached['feedback']}, started_at=now, finished_at=now,
+        )
+
+    job = AnalysisJob.objects.create(submission=submission)
+    if getattr(settings, 'ANALYSIS_RUN_INLINE', False):
+        claimed = claim_job(job.pk, worker_id='inline')
+        if claimed is not None:
+            run_job(claimed)
+        job.refresh_from_db()
+    return job
+
+
+def enqueue_batch_rank(user, job_description: str, submission_ids, uploads, top=None,
+                       job_posting=None) -> BatchRankJob:
+    """Queue a batch ranking of stored submissions and uploaded files and return the new job.
+
+    Uploads are saved to ``default_storage`` under ``batches/`` and deleted
+    once the job has finished. ``submission_ids`` should already be limited to
+    what ``user`` may see.
+    """
+    folder = f'batches/{uuid.uuid4().hex}'
+    stored = [[default_storage.save(f'{folder}/{os.path.basename(f.name)}', f), f.name] for f in uploads]
+    job = BatchRankJob.objects.create(user=user, job_description=job_description, job_posting=job_posting,
+                                      submission_ids=list(submission_ids), uploads=stored, top=top)
+    if getattr(settings, 'ANALYSIS_RUN_INLINE', False):
+        claimed = claim_job(job.pk, worker_id='inline', model=BatchRankJob)
+        if claimed is not None:
+            run_job(claimed)
+        job.refresh_from_db()
+    return job
+
+
+def _copy_vectors(submission: ResumeSubmission) -> bool:
+    from .embedding_store import copy_submission_vectors
+    try:
+        return copy_submission_vectors(submission.pk, submission.job_description)
+    except Exception:
+        logger.exception('Could not copy embeddings for submission %s', submission.pk)
+        return False
+
+
+def _cached_result(submission: ResumeSubmission):
+    if not submission.resume_file or not result_cache.enabled():
+        return None
+    try:
+        file_hash = submission.resume_sha256 or result_cache.hash_file(submission.resume_file.path)
+        return result_cache.lookup(
+            result_cache.make_key(file_hash, submission.job_description, submission.target_role)
+        )
+    except Exception:
+        logger.exception('Result cache lookup failed for submission %s', submission.pk)
+        return None
+
+
+# Queues the workers drain, in claiming order: single uploads first, as someone is waiting on each.
+QUEUES = (AnalysisJob, BatchRankJob)
+
+
+def claim_job(job_id: int, worker_id: str, model=AnalysisJob):
+    """Atomically move one pending job (of ``model``) to running; None if someone else won."""
+    updated = model.objects.filter(pk=job_id, status=model.STATUS_PENDING).update(
+        status=model.STATUS_RUNNING,
+        worker_id=worker_id[:64],
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    if not updated:
+        return None
+    return model.objects.select_related('submission' if model is AnalysisJob else 'job_posting').get(pk=job_id)
+
+
+def claim_next_job(worker_id: str):
+    """Claim the oldest pending job of the first queue that has one, retrying past jobs taken by other workers."""
+    for model in QUEUES:
+        while True:
+            job_id = (model.objects
+                      .filter(status=model.STATUS_PENDING)
+                      .order_by('created_at', 'pk')
+                      .values_list('pk', flat=True)
+                      .first())
+            if job_id is None:
+                break
+            job = claim_job(job_id, worker_id, model)
+            if job is not None:
+                return job
+    return None
+
+
+def run_job(job):
+    """Run a claimed job (an AnalysisJob or a BatchRankJob) and record the outcome."""
+    if isinstance(job, BatchRankJob):
+        return _run_batch_job(job)
+    # Imported here so that enqueuing from a web process does not pull in the
+    # analysis stack.
+    from .text_classification import analyze_resume_result
+
+    submission = job.submission
+    try:
+        if not submission.resume_file:
+            raise ValueError("Submission has no resume file.")
+        result = analyze_resume_result(submission.resume_file.path, submission.job_description, submission.pk,
+                                       file_hash=submission.resume_sha256 or None,
+                                       target_role=submission.target_role, job_posting=submission.job_posting)
+        submission.store_analysis(result)
+    except Exception as e:
+        return _failed(job, e)
+    return _done(job, {'feedback': result['feedback']})
+
+
+def _run_batch_job(job: BatchRankJob) -> BatchRankJob:
+    from .batch import rank_resumes, texts_for_files, texts_for_submissions
+
+    try:
+        resumes = texts_for_submissions(_submissions(job.submission_ids))
+        resumes += texts_for_files([(name, default_storage.path(stored)) for stored, name in job.uploads])
+        ranked = rank_resumes(job.job_description, resumes, top=job.top, job_posting=job.job_posting)
+    except Exception as e:
+        job = _failed(job, e)
+    else:
+        job = _done(job, ranked)
+    if job.is_finished:
+        for stored, _ in job.uploads:
+            default_storage.delete(stored)
+    return job
+
+
+def _submissions(ids):
+    """The submissions with ``ids`` that still exist, in that order (fetched in slices under SQLite's parameter limit)."""
+    from .embedding_store import _slices
+    found = {}
+    for part in _slices(list(ids)):
+        found.update(ResumeSubmission.objects.in_bulk(part))
+    return [found[pk] for pk in ids if pk in found]
+
+
+def _failed(job, error: Exception):
+    logger.exception('%s failed', job)
+    max_attempts = getattr(settings, 'ANALYSIS_JOB_MAX_ATTEMPTS', 3)
+    job.error = str(error)
+    if job.attempts < max_attempts:
+        job.status = job.STATUS_PENDING
+    else:
+        job.status = job.STATUS_FAILED
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def _done(job, result):
+    job.result = result
+    job.error = ''
+    job.status = job.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['result', 'error', 'status', 'finished_at'])
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """Put running jobs whose worker died (lease expired) back in the queue.
+
+    Jobs that already used up their attempts are failed instead, so a resume
+    that crashes the worker outright cannot loop forever.
+    """
+    lease = getattr(settings, 'ANALYSIS_JOB_LEASE_SECONDS', 600)
+    max_attempts = getattr(settings, 'ANALYSIS_JOB_MAX_ATTEMPTS', 3)
+    requeued = 0
+    for model in QUEUES:
+        stale = model.objects.filter(
+            status=model.STATUS_RUNNING,
+            started_at__lt=timezone.now() - timedelta(seconds=lease),
+        )
+        stale.filter(attempts__gte=max_attempts).update(
+            status=model.STATUS_FAILED,
+            error='Worker stopped responding while running this job.',
+            finished_at=timezone.now(),
+        )
+        requeued += stale.update(status=model.STATUS_PENDING, worker_id='')
+    return requeued
+
+
+def prune_resume_files(older_than_days: Optional[float] = None) -> int:
+    """Delete the uploaded files of submissions older than ``RESUME_FILE_RETENTION_DAYS``; returns how many.
+
+    Submissions whose analysis is still queued or running keep their file.
+    The stored result, cache entry and embeddings stay, so history still
+    shows the analysis; only the file and its download link go.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'RESUME_FILE_RETENTION_DAYS', 30)
+    unfinished = AnalysisJob.objects.filter(
+        status__in=[AnalysisJob.STATUS_PENDING, AnalysisJob.STATUS_RUNNING]).values('submission_id')
+    expired = (ResumeSubmission.objects
+               .filter(created_at__lt=timezone.now() - timedelta(days=older_than_days))
+               .exclude(resume_file='').exclude(resume_file__isnull=True)
+               .exclude(pk__in=unfinished))
+    pruned = 0
+    for submission in expired.iterator():
+        submission.resume_file.delete(save=False)
+        ResumeSubmission.objects.filter(pk=submission.pk).update(resume_file='')
+        pruned += 1
+    return pruned
+
+
+def work(worker_id: Optional[str] = None, poll_interval: float = 1.0,
+         stop_event=None, exit_when_empty: bool = False) -> int:
+    """Drain the queue until ``stop_event`` is set; returns jobs processed.
+
+    With ``exit_when_empty`` the loop returns as soon as no pending job is
+    left, which is what ``run_analysis_workers --once`` uses.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        job = claim_next_job(worker_id)
+        if job is None:
+            if exit_when_empty:
+                break
+            time.sleep(poll_interval)
+            continue
+        logger.info('Worker %s running job %s', worker_id, job.pk)
+        run_job(job)
+        metrics.dump()  # make this worker's timings visible to /metrics (METRICS_DIR)
+        processed += 1
+    return processed
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from analyzer import incremental, result_cache
+from analyzer.models import StageResult
+
+
+class Command(BaseCommand):
+    help = "Inspect or maintain the persistent analysis result cache and stage memo."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'evict', 'clear'],
+                            help='stats: show footprint; evict: apply TTL/size bounds now; '
+                                 'clear: drop every entry and memoized stage result.')
+
+    def handle(self, *args, **options):
+        action = options['action']
+        if action == 'clear':
+            self.stdout.write(self.style.SUCCESS(f"Removed {result_cache.clear()} cache entries and "
+                                                 f"{incremental.clear()} stage results."))
+        elif action == 'evict':
+            self.stdout.write(self.style.SUCCESS(f"Evicted {result_cache.evict()} cache entries."))
+        else:
+            stats = result_cache.stats()
+            self.stdout.write(f"entries: {stats['entries']}")
+            self.stdout.write(f"bytes:   {stats['bytes']}")
+            self.stdout.write(f"hits:    {stats['entry_hits']}")
+            self.stdout.write(f"stage results: {StageResult.objects.count()}")
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import benchmark
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the resume analysis pipeline over the sample corpus, with network services "
+            "stubbed, and optionally compare against a saved baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5, help='Timed runs per document.')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per document first.')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Threads running the full pipeline at once (affects throughput).')
+        parser.add_argument('--corpus-dir', help='Write the generated corpus here and keep it '
+                                                 '(default: a temporary directory).')
+        parser.add_argument('--files', nargs='*', default=[],
+                            help='Benchmark these files instead of the generated corpus.')
+        parser.add_argument('--stub-latency-ms', type=float, default=0.0,
+                            help='Simulated latency of each stubbed network call.')
+        parser.add_argument('--real-services', action='store_true',
+                            help='Use the configured LanguageTool/Gemini/embedding model instead of fakes.')
+        parser.add_argument('--baseline', default=None,
+                            help='Baseline report to compare with (default: BENCHMARK_BASELINE_PATH).')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Write this run as the new baseline.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Relative slowdown reported as a regression (default 0.2 = 20%%).')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any metric regressed.')
+        parser.add_argument('--output', help='Also write the report JSON here.')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        baseline_path = options['baseline'] or getattr(
+            settings, 'BENCHMARK_BASELINE_PATH', os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json'))
+
+        with tempfile.TemporaryDirectory(prefix='resume-bench-') as tmp:
+            if options['files']:
+                paths, skipped = options['files'], []
+                missing = [p for p in paths if not os.path.exists(p)]
+                if missing:
+                    raise CommandError(f"No such file: {', '.join(missing)}")
+            else:
+                paths, skipped = benchmark.build_corpus(options['corpus_dir'] or tmp)
+            if not paths:
+                raise CommandError("No documents to benchmark (no sample PDFs found).")
+            for note in skipped:
+                self.stderr.write(f"Skipping variant: {note}")
+
+            report = benchmark.run(
+                paths,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                concurrency=options['concurrency'],
+                stub=not options['real_services'],
+                stub_latency_ms=options['stub_latency_ms'],
+                progress=lambda message: self.stderr.write(message),
+            )
+
+        comparison = None
+        if os.path.exists(baseline_path) and not options['save_baseline']:
+            comparison = benchmark.compare(report, benchmark.load_report(baseline_path), options['tolerance'])
+            report['comparison'] = {'baseline': baseline_path, 'rows': comparison}
+        if options['output']:
+            benchmark.save_report(report, options['output'])
+        if options['save_baseline']:
+            benchmark.save_report(report, baseline_path)
+            self.stderr.write(f"Saved baseline to {baseline_path}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report, comparison)
+
+        if options['fail_on_regression'] and comparison and any(row['regression'] for row in comparison):
+            raise CommandError("Performance regression against the baseline.")
+
+    def _print(self, report, comparison):
+        pipeline = report['pipeline']
+        meta = report['meta']
+        self.stdout.write(
+            f"Pipeline ({len(meta['documents'])} documents x {meta['iterations']} iterations, "
+            f"concurrency {meta['concurrency']}, {'stubbed' if meta['stubbed_services'] else 'real'} services)"
+        )
+        self.stdout.write(
+            f"  p50 {pipeline['p50_ms']:.1f} ms   p95 {pipeline['p95_ms']:.1f} ms   "
+            f"mean {pipeline['mean_ms']:.1f} ms   throughput {pipeline['throughput_per_s']:.2f}/s"
+        )
+        rss = report['peak_rss_mb']
+        self.stdout.write(f"  peak RSS {rss['self']:.1f} MB (children {rss['children']:.1f} MB)")
+
+        self.stdout.write("\nStages (per document)")
+        for name, stats in report['stages'].items():
+            self.stdout.write(f"  {name:<15} p50 {stats['p50_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+        self.stdout.write("\nDocuments (full pipeline)")
+        for name, stats in report['documents'].items():
+            self.stdout.write(f"  {name:<24} p50 {stats['p50_ms']:>9.1f} ms   p95 {stats['p95_ms']:>9.1f} ms")
+
+        if comparison is None:
+            return
+        self.stdout.write("\nAgainst baseline")
+        for row in comparison:
+            flag = self.style.ERROR('REGRESSION') if row['regression'] else ''
+            self.stdout.write(
+                f"  {row['metric']:<28} {row['baseline']:>10} -> {row['current']:>10} "
+                f"({row['change']:+.0%}) {flag}"
+            )
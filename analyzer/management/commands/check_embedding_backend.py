@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import benchmark, document, embedding_backends, model_registry
+from analyzer.batch import texts_for_submissions
+from analyzer.embedding_store import match
+from analyzer.models import ResumeSubmission
+from analyzer.text_classification import extract_text
+
+
+class Command(BaseCommand):
+    help = ("Compare an embedding backend against the reference one: match scores, "
+            "vector agreement, encode latency and memory.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default=None, choices=sorted(embedding_backends.BACKENDS),
+                            help='Backend to check (default: settings.EMBED_BACKEND).')
+        parser.add_argument('--reference', default=embedding_backends.REFERENCE,
+                            choices=sorted(embedding_backends.BACKENDS),
+                            help='Backend to compare against (default: %(default)s).')
+        parser.add_argument('--limit', type=int, default=50,
+                            help='Most submissions to score (default: %(default)s). The sample PDFs '
+                                 'are used when there are none.')
+        parser.add_argument('--tolerance', type=float, default=0.02,
+                            help='Largest allowed difference in a match score (default: %(default)s).')
+
+    def handle(self, *args, **options):
+        candidate = options['backend'] or embedding_backends.current()
+        reference = options['reference']
+        if candidate == reference:
+            raise CommandError(f"Nothing to compare: both backends are {reference!r}.")
+        for name in (candidate, reference):
+            if not embedding_backends.available(name):
+                raise CommandError(
+                    f"Backend {name!r} needs {', '.join(embedding_backends.get(name).requires)} installed.")
+
+        pairs = self._pairs(options['limit'])
+        if not pairs:
+            raise CommandError("No submissions or sample PDFs to compare on.")
+        chunk_words = getattr(settings, 'EMBED_CHUNK_WORDS', 160)
+        texts = list(dict.fromkeys(
+            [chunk.text for text, _ in pairs for chunk in document.of(text).chunks(chunk_words)]
+            + [job for _, job in pairs]))
+
+        # The candidate is loaded first so its memory delta is not hidden by the reference's runtime.
+        results = {name: self._measure(name, texts, pairs) for name in (candidate, reference)}
+
+        ref, cand = results[reference], results[candidate]
+        agreement = np.sum(ref['vectors'] * cand['vectors'], axis=1) / (
+            np.linalg.norm(ref['vectors'], axis=1) * np.linalg.norm(cand['vectors'], axis=1))
+        score_diff = np.abs(np.array(ref['scores']) - np.array(cand['scores']))
+        ranks_agree = np.array_equal(np.argsort(ref['scores'], kind='stable'),
+                                     np.argsort(cand['scores'], kind='stable'))
+
+        self.stdout.write(f"{len(pairs)} resume/job pair(s), {len(texts)} distinct text(s)")
+        for name in (reference, candidate):
+            r = results[name]
+            rss = f"{r['rss_delta'] / 2 ** 20:.0f} MiB" if r['rss_delta'] is not None else 'n/a'
+            self.stdout.write(f"  {name:<22} load {r['load_seconds']:6.2f}s  "
+                              f"encode {r['encode_seconds'] / len(texts) * 1000:7.2f} ms/text  memory +{rss}")
+        self.stdout.write(f"  vector cosine vs reference: mean {agreement.mean():.4f}  min {agreement.min():.4f}")
+        self.stdout.write(f"  match score difference:     mean {score_diff.mean():.4f}  max {score_diff.max():.4f}")
+        self.stdout.write(f"  ranking of pairs unchanged: {'yes' if ranks_agree else 'no'}")
+
+        if score_diff.max() > options['tolerance']:
+            raise CommandError(
+                f"{candidate} differs from {reference} by up to {score_diff.max():.4f} "
+                f"(tolerance {options['tolerance']}).")
+        self.stdout.write(self.style.SUCCESS(f"{candidate} is within {options['tolerance']} of {reference}."))
+
+    def _pairs(self, limit):
+        submissions = list(ResumeSubmission.objects.order_by('-pk')[:limit])
+        jobs = {s.pk: s.job_description or benchmark.DEFAULT_JOB_DESCRIPTION for s in submissions}
+        pairs = [(text, jobs[pk]) for pk, text in texts_for_submissions(submissions) if text]
+        if not pairs:
+            for path in benchmark.sample_pdfs(str(settings.BASE_DIR))[:limit]:
+                text = document.parse(extract_text(path))
+                if text:
+                    pairs.append((text, benchmark.DEFAULT_JOB_DESCRIPTION))
+        return pairs
+
+    def _measure(self, name, texts, pairs):
+        rss_before = model_registry.rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = embedding_backends.load(name, model_registry.model_name())
+        except Exception as e:
+            raise CommandError(f"Could not load {name}: {e}")
+        load_seconds = time.perf_counter() - started
+        rss_after = model_registry.rss_bytes()
+
+        model.encode(texts[:1], normalize_embeddings=True)  # warm-up
+        started = time.perf_counter()
+        vectors = np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+        encode_seconds = time.perf_counter() - started
+        scores = [match(text, job, model, cache=False).similarity for text, job in pairs]
+        return {
+            'load_seconds': load_seconds,
+            'rss_delta': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            'encode_seconds': encode_seconds,
+            'vectors': vectors,
+            'scores': scores,
+        }
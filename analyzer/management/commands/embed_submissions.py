@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import model_registry
+from analyzer.batch import submission_text
+from analyzer.embedding_store import match_many, store_submission_vectors
+from analyzer.models import ResumeSubmission
+
+
+class Command(BaseCommand):
+    help = ("Compute and store embeddings for submissions that do not have them yet, "
+            "or whose stored vectors predate section-chunked embedding.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=32, help='Submissions per encode() call.')
+        parser.add_argument('--force', action='store_true', help='Recompute every submission.')
+
+    def handle(self, *args, **options):
+        model = model_registry.get_embed_model()
+        if model is None:
+            raise CommandError(f"Embedding model not available: {model_registry.load_error()}")
+        name = model_registry.model_id()
+
+        submissions = ResumeSubmission.objects.order_by('pk')
+        if not options['force']:
+            submissions = submissions.exclude(embedding__model_name=name, embedding__chunked=True)
+
+        batch_size = options['batch_size']
+        done = 0
+        batch = []
+        for submission in submissions.iterator():
+            batch.append(submission)
+            if len(batch) >= batch_size:
+                done += self._store(model, batch)
+                batch = []
+        if batch:
+            done += self._store(model, batch)
+        self.stdout.write(self.style.SUCCESS(f"Stored embeddings for {done} submission(s)."))
+
+    def _store(self, model, submissions):
+        """Embed ``submissions`` the way analyses do (embedding_store.match), one call per job description."""
+        by_job = defaultdict(list)
+        for submission in submissions:
+            try:
+                text = submission_text(submission)
+            except Exception as e:
+                self.stderr.write(f"Skipping submission {submission.pk}: {e}")
+                continue
+            if text:
+                by_job[submission.job_description or ''].append((submission.pk, text))
+        for job, items in by_job.items():
+            matches = match_many([text for _, text in items], job, model)
+            for (pk, text), result in zip(items, matches):
+                store_submission_vectors(pk, text, job, result)
+        return sum(len(items) for items in by_job.values())
@@ -0,0 +1,82 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer.batch import rank_resumes, texts_for_submissions
+from analyzer.models import JobPosting, ResumeSubmission
+from analyzer.text_classification import clean_text, extract_text
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+class Command(BaseCommand):
+    help = "Rank resume files and/or stored submissions against one job description."
+
+    def add_arguments(self, parser):
+        job = parser.add_mutually_exclusive_group(required=True)
+        job.add_argument('--job', help='Job description text.')
+        job.add_argument('--job-file', help='Path to a file containing the job description.')
+        job.add_argument('--posting', type=int, help='JobPosting id (uses its precomputed features).')
+        parser.add_argument('paths', nargs='*',
+                            help='Resume files or directories (searched for .pdf/.docx/.txt).')
+        parser.add_argument('--submissions', nargs='*', type=int, default=[],
+                            help='ResumeSubmission ids to include.')
+        parser.add_argument('--all-submissions', action='store_true',
+                            help='Include every stored ResumeSubmission.')
+        parser.add_argument('--top', type=int, default=None, help='Only print the best N.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Texts per encode() call.')
+        parser.add_argument('--json', action='store_true', help='Print the full result as JSON.')
+
+    def _resume_files(self, paths):
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    for name in sorted(names):
+                        if name.lower().endswith(RESUME_EXTENSIONS):
+                            yield os.path.join(root, name)
+            elif os.path.exists(path):
+                yield path
+            else:
+                raise CommandError(f"No such file: {path}")
+
+    def handle(self, *args, **options):
+        posting = None
+        if options['posting'] is not None:
+            try:
+                posting = JobPosting.objects.get(pk=options['posting'])
+            except JobPosting.DoesNotExist:
+                raise CommandError(f"No job posting with id {options['posting']}.")
+            job_description = posting.description
+        elif options['job_file']:
+            with open(options['job_file'], encoding='utf-8', errors='ignore') as f:
+                job_description = f.read()
+        else:
+            job_description = options['job']
+
+        resumes = []
+        for path in self._resume_files(options['paths']):
+            try:
+                resumes.append((path, clean_text(extract_text(path))))
+            except Exception as e:
+                self.stderr.write(f"Skipping {path}: {e}")
+        submissions = ResumeSubmission.objects.all()
+        if not options['all_submissions']:
+            submissions = submissions.filter(pk__in=options['submissions'])
+        if options['all_submissions'] or options['submissions']:
+            resumes += texts_for_submissions(submissions)
+        if not resumes:
+            raise CommandError("No resumes to rank.")
+
+        ranked = rank_resumes(job_description, resumes, top=options['top'], batch_size=options['batch_size'],
+                              job_posting=posting)
+        if options['json']:
+            self.stdout.write(json.dumps(ranked, indent=2))
+            return
+        if ranked.get('error'):
+            self.stderr.write(f"Warning: {ranked['error']}")
+        for item in ranked['results']:
+            self.stdout.write(
+                f"{item['rank']:>4}. sim={item['semantic_similarity']:.3f} "
+                f"keywords={item['keyword_coverage_percent']:.1f}%  {item['id']}"
+            )
@@ -0,0 +1,90 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from analyzer import jobs, model_registry
+
+
+def _worker_main(poll_interval, stop_event):
+    # Forked children must not reuse the parent's DB connection; spawned
+    # children need Django configured before touching models.
+    import django
+    django.setup()
+    connections.close_all()
+
+    # Finish the current job on Ctrl-C / SIGTERM instead of dying mid-write.
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+    jobs.work(poll_interval=poll_interval, stop_event=stop_event)
+
+
+class Command(BaseCommand):
+    help = "Run a pool of local worker processes that drain the resume analysis queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of worker processes (default: settings.ANALYSIS_WORKERS).')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds an idle worker waits before checking the queue again.')
+        parser.add_argument('--once', action='store_true',
+                            help='Process the pending jobs in this process and exit.')
+        parser.add_argument('--prune', action='store_true',
+                            help='Also delete uploaded resume files older than settings.RESUME_FILE_RETENTION_DAYS '
+                                 '(at start, then hourly).')
+
+    def _prune(self):
+        self.stdout.write(f"Deleted {jobs.prune_resume_files()} expired resume file(s).")
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        jobs.requeue_stale_jobs()
+
+        if options['once']:
+            processed = jobs.work(poll_interval=poll_interval, exit_when_empty=True)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)."))
+            if options['prune']:
+                self._prune()
+            return
+
+        num_workers = options['workers'] or getattr(settings, 'ANALYSIS_WORKERS', 2)
+        stop_event = multiprocessing.Event()
+        signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+        signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+
+        def start_worker():
+            proc = multiprocessing.Process(target=_worker_main, args=(poll_interval, stop_event), daemon=True)
+            proc.start()
+            return proc
+
+        # Load the model once here so forked workers share it copy-on-write.
+        model_registry.preload_if_configured()
+        connections.close_all()
+        workers = [start_worker() for _ in range(num_workers)]
+        self.stdout.write(f"Started {num_workers} analysis worker(s); press Ctrl-C to stop.")
+
+        lease_check_every = max(poll_interval, 30.0)
+        last_lease_check = time.monotonic()
+        prune_every = 3600.0
+        last_prune = time.monotonic() - prune_every  # prune straight away
+        while not stop_event.is_set():
+            time.sleep(poll_interval)
+            for i, proc in enumerate(workers):
+                if not proc.is_alive() and not stop_event.is_set():
+                    self.stderr.write(f"Worker pid={proc.pid} exited with {proc.exitcode}; restarting.")
+                    connections.close_all()
+                    workers[i] = start_worker()
+            if time.monotonic() - last_lease_check >= lease_check_every:
+                jobs.requeue_stale_jobs()
+                last_lease_check = time.monotonic()
+            if options['prune'] and time.monotonic() - last_prune >= prune_every:
+                self._prune()
+                last_prune = time.monotonic()
+
+        self.stdout.write("Stopping workers after their current job...")
+        for proc in workers:
+            proc.join()
+        self.stdout.write(self.style.SUCCESS("All workers stopped."))
@@ -0,0 +1,59 @@
+import os
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import model_registry
+from analyzer.embedding_server import EmbeddingServer, MicroBatcher
+
+
+class Command(BaseCommand):
+    help = ("Load the embedding model once and serve encode requests from web and queue workers "
+            "over a Unix socket, micro-batching concurrent requests.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=None,
+                            help='Socket path (default: settings.EMBED_SERVER_SOCKET).')
+        parser.add_argument('--max-batch', type=int, default=None,
+                            help='Most texts encoded in one model call (default: EMBED_SERVER_MAX_BATCH).')
+        parser.add_argument('--window-ms', type=float, default=None,
+                            help='How long the first request of a batch waits for others '
+                                 '(default: EMBED_SERVER_WINDOW_MS).')
+
+    def handle(self, *args, **options):
+        socket_path = options['socket'] or getattr(settings, 'EMBED_SERVER_SOCKET', None)
+        if not socket_path:
+            raise CommandError("No socket path: pass --socket or set EMBED_SERVER_SOCKET.")
+
+        model = model_registry.get_local_model()
+        if model is None:
+            raise CommandError(f"Embedding model not available: {model_registry.load_error()}")
+
+        batcher = MicroBatcher(
+            model,
+            max_batch=options['max_batch'] or getattr(settings, 'EMBED_SERVER_MAX_BATCH', 64),
+            window_ms=options['window_ms'] if options['window_ms'] is not None
+            else getattr(settings, 'EMBED_SERVER_WINDOW_MS', 5.0),
+            encode_batch_size=getattr(settings, 'EMBED_BATCH_SIZE', 32),
+        )
+        server = EmbeddingServer(socket_path, batcher)
+
+        def stop(*args):
+            # shutdown() blocks until serve_forever returns, so call it from another thread.
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self.stdout.write(f"Serving {model_registry.model_name()} on {socket_path}; press Ctrl-C to stop.")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Stopped after {batcher.requests} request(s) in {batcher.batches} batch(es)."))
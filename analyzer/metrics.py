@@ -0,0 +1,282 @@
+"""In-process timing histograms and counters, exported in Prometheus text format.
+
+Analysis code records into a module-level registry (``observe``, ``inc`` and
+the ``timer`` context manager); ``render()`` produces the text served by
+``metrics_view`` at ``/metrics``. ``MetricsMiddleware`` times every view.
+
+Each process has its own registry. Queue workers are separate processes, so
+when ``METRICS_DIR`` is set every process also writes its snapshot there
+(``dump()``, called after each job), and ``render()`` adds up the snapshots
+of the other live processes, in the same way as prometheus_client's
+multiprocess mode; snapshots of exited processes are removed. Without
+``METRICS_DIR`` only the serving process's own numbers are exported.
+"""
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+HELP = {
+    'resume_analysis_seconds': ('histogram', 'Wall time of one resume analysis.'),
+    'resume_analysis_stage_seconds': ('histogram', 'Wall time of one analysis stage.'),
+    'resume_analysis_fallbacks_total': ('counter', 'Stages that returned a fallback instead of a real result.'),
+    'gemini_client_seconds': ('histogram', 'Wall time of gemini_client.analyze_resume.'),
+    'http_request_seconds': ('histogram', 'Wall time of Django views.'),
+    'resume_analysis_cache_lookups_total': ('counter', 'Result cache lookups by outcome.'),
+    'resume_analysis_cache_hit_ratio': ('gauge', 'Result cache hits / lookups.'),
+    'resume_analysis_stage_memo_total': ('counter', 'Stage memo lookups (incremental re-analysis) by stage and outcome.'),
+    'genai_requests_total': ('counter', 'Feedback LLM requests: upstream calls vs. coalesced joins.'),
+    'resume_analysis_capability_available': ('gauge', 'Whether an optional dependency is installed (1) or not (0).'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}  # bucket counts..., sum, count
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            row = self.histograms.get(key)
+            if row is None:
+                row = self.histograms[key] = [0.0] * (len(DEFAULT_BUCKETS) + 2)
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if seconds <= bound:
+                    row[i] += 1
+            row[-2] += seconds
+            row[-1] += 1
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'histograms': [[name, list(labels), list(row)] for (name, labels), row in self.histograms.items()],
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for name, labels, row in snapshot.get('histograms', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                mine = self.histograms.setdefault(key, [0.0] * len(row))
+                for i, value in enumerate(row):
+                    mine[i] += value
+            for name, labels, value in snapshot.get('counters', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+
+
+_registry = Registry()
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    _registry.observe(name, seconds, **labels)
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    _registry.inc(name, amount, **labels)
+
+
+def fallback(kind: str) -> None:
+    """Count a stage that degraded to its fallback (mock result, canned feedback, ...)."""
+    _registry.inc('resume_analysis_fallbacks_total', kind=kind)
+
+
+class timer:
+    """``with timer('name', label=value) as t:`` observes the block; ``t.seconds`` holds the time.
+
+    ``into`` (a dict) also receives ``into[key] = seconds``, for attaching
+    timings to a result.
+    """
+
+    def __init__(self, name: str, *, into: Optional[dict] = None, key: Optional[str] = None, **labels):
+        self.name = name
+        self.labels = labels
+        self.into = into
+        self.key = key
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._started
+        observe(self.name, self.seconds, **self.labels)
+        if self.into is not None:
+            self.into[self.key or self.labels.get('stage', self.name)] = self.seconds
+        return False
+
+
+def timed(name: str, **labels) -> Callable:
+    """Decorator form of ``timer``."""
+    def decorate(func):
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorate
+
+
+# --- Cross-process snapshots ------------------------------------------------------
+
+def _metrics_dir() -> Optional[str]:
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def dump() -> None:
+    """Write this process's snapshot to ``METRICS_DIR`` (no-op when unset)."""
+    directory = _metrics_dir()
+    if not directory:
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(_registry.snapshot(), f)
+        os.replace(tmp, os.path.join(directory, f"metrics_{os.getpid()}.json"))
+    except OSError:
+        logger.warning('Could not write metrics snapshot to %s', directory, exc_info=True)
+
+
+def _alive(pid: int) -> bool:
+    if os.name != 'posix':
+        return True  # no signal-0 probe; keep every snapshot
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _combined() -> Registry:
+    """This process's registry plus the snapshots of the other live processes.
+
+    Snapshots left by processes that have exited are deleted, so restarted
+    workers do not keep adding their predecessors' numbers.
+    """
+    combined = Registry()
+    combined.merge(_registry.snapshot())
+    directory = _metrics_dir()
+    if directory:
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            try:
+                pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                if not _alive(pid):
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    combined.merge(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return combined
+
+
+# --- Exposition -------------------------------------------------------------------
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + body + '}'
+
+
+def _collect(registry: Registry) -> None:
+    """Add the derived cache hit ratio and this process's capability gauges."""
+    from . import capabilities
+
+    hits = registry.counters.get(('resume_analysis_cache_lookups_total', (('outcome', 'hits'),)), 0)
+    misses = registry.counters.get(('resume_analysis_cache_lookups_total', (('outcome', 'misses'),)), 0)
+    registry.counters[('resume_analysis_cache_hit_ratio', ())] = hits / (hits + misses) if hits + misses else 0.0
+    for name, found in capabilities.report().items():
+        registry.counters[('resume_analysis_capability_available', (('name', name),))] = int(found)
+
+
+def render() -> str:
+    registry = _combined()
+    _collect(registry)
+    lines = []
+    names = sorted({name for name, _ in registry.histograms} | {name for name, _ in registry.counters})
+    for name in names:
+        kind, help_text = HELP.get(name, ('untyped', name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), row in sorted(registry.histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(DEFAULT_BUCKETS, row):
+                le = '+Inf' if bound == math.inf else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {count:g}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {row[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {row[-1]:g}")
+        for (metric, labels), value in sorted(registry.counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    return '\n'.join(lines) + '\n'
+
+
+def reset() -> None:
+    global _registry
+    _registry = Registry()
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Observe ``http_request_seconds`` per view (URL name), method and status."""
+
+    def process_request(self, request):
+        request._metrics_started = time.perf_counter()
+
+    def process_response(self, request, response):
+        started = getattr(request, '_metrics_started', None)
+        if started is not None:
+            match = getattr(request, 'resolver_match', None)
+            view = (match.url_name or 'unnamed') if match is not None else 'unresolved'
+            observe('http_request_seconds', time.perf_counter() - started,
+                    view=view, method=request.method, status=response.status_code)
+        return response
+
+
+def _forget_after_fork() -> None:
+    # A forked worker starts counting from zero; the parent keeps its own numbers.
+    reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_after_fork)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_analysiscacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=255)),
+                ('dim', models.PositiveSmallIntegerField()),
+                ('resume_vector', models.BinaryField()),
+                ('resume_text_hash', models.CharField(max_length=64)),
+                ('job_vector', models.BinaryField(blank=True, null=True)),
+                ('job_text_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='analyzer.resumesubmission')),
+            ],
+        ),
+    ]
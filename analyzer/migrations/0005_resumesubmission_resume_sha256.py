@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_submissionembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumesubmission',
+            name='resume_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_resumesubmission_resume_sha256'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumesubmission',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumesubmission',
+            name='feedback',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='resumesubmission',
+            name='metrics',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumesubmission',
+            name='timings',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resumesubmission',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='submission_user_created'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_resumesubmission_results_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('dim', models.PositiveSmallIntegerField()),
+                ('vector', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_jobposting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionembedding',
+            name='chunked',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,178 @@
+"""Process-wide, lazily loaded sentence embedding model.
+
+Nothing heavy is imported until the first call to ``get_embed_model()``, so
+``manage.py`` commands, migrations and test runs that never analyze a resume
+do not pay for the runtime (torch or onnxruntime) or the model weights. The
+runtime is chosen by ``EMBED_BACKEND`` (see embedding_backends.py).
+
+For prefork servers set ``EMBED_MODEL_PRELOAD = True``: ``wsgi.py`` and
+``run_analysis_workers`` then call ``preload()`` in the parent before forking,
+so every child shares the model's pages copy-on-write instead of loading its
+own copy.
+
+With ``EMBED_SERVER_SOCKET`` set, ``get_embed_model()`` instead returns a
+client for the embedding sidecar (see embedding_server.py): the model lives
+in that one process and is only loaded here as a fallback when the sidecar
+is unreachable.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from . import embedding_backends
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_lock = threading.Lock()
+_model = None
+_sidecar = None
+_load_error: Optional[str] = None
+_metrics: Dict[str, Any] = {
+    'model_name': None,
+    'backend': None,
+    'loaded': False,
+    'load_seconds': None,
+    'rss_before_bytes': None,
+    'rss_after_bytes': None,
+    'loaded_in_pid': None,
+}
+
+
+def model_name() -> str:
+    return getattr(settings, 'EMBED_MODEL_NAME', DEFAULT_EMBED_MODEL_NAME)
+
+
+def model_id() -> str:
+    """Identity of the vectors this process produces: the model name, plus the
+    backend when it is not the reference one (stored embeddings are keyed by it).
+    """
+    backend = embedding_backends.current()
+    return model_name() if backend == embedding_backends.REFERENCE else f"{model_name()}@{backend}"
+
+
+def embedding_available() -> bool:
+    """Whether the configured backend's runtime is installed, without importing it."""
+    return embedding_backends.available(embedding_backends.current())
+
+
+def rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS; close enough
+        # for a before/after comparison where /proc is missing.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+def get_embed_model():
+    """The model to encode with: the sidecar client if configured, else ``get_local_model()``."""
+    global _sidecar
+    if getattr(settings, 'EMBED_SERVER_SOCKET', None):
+        if _sidecar is None:
+            from .embedding_server import client_from_settings
+            _sidecar = client_from_settings(fallback=get_local_model)
+        return _sidecar
+    return get_local_model()
+
+
+def get_local_model():
+    """Return this process's embedding model, loading it on first use.
+
+    Returns None if the backend's runtime is missing or the load failed; the
+    failure is remembered so later calls do not retry the expensive load.
+    """
+    global _model, _load_error
+    if _model is not None or _load_error is not None:
+        return _model
+    with _lock:
+        if _model is not None or _load_error is not None:
+            return _model
+        name = model_name()
+        backend = embedding_backends.current()
+        if not embedding_available():
+            _load_error = f"{', '.join(embedding_backends.get(backend).requires)} not installed"
+            return None
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = embedding_backends.load(backend, name)
+        except Exception as e:
+            _load_error = str(e)
+            logger.error("Error loading embedding model %s (%s): %s", name, backend, e)
+            return None
+        _metrics.update(
+            model_name=name,
+            backend=backend,
+            loaded=True,
+            load_seconds=time.perf_counter() - started,
+            rss_before_bytes=rss_before,
+            rss_after_bytes=rss_bytes(),
+            loaded_in_pid=os.getpid(),
+        )
+        logger.info("Embedding model %s (%s) loaded in %.2fs", name, backend, _metrics['load_seconds'])
+        _model = model
+        return _model
+
+
+def preload() -> bool:
+    """Load the model now (e.g. in a prefork parent); True if it is usable."""
+    return get_local_model() is not None
+
+
+def preload_if_configured() -> None:
+    # With a sidecar the model is not loaded here unless the sidecar fails.
+    if getattr(settings, 'EMBED_MODEL_PRELOAD', False) and not getattr(settings, 'EMBED_SERVER_SOCKET', None):
+        preload()
+
+
+def load_error() -> Optional[str]:
+    return _load_error
+
+
+def reset() -> None:
+    """Forget the loaded model (or remembered failure) so the next call reloads."""
+    global _model, _load_error, _sidecar
+    with _lock:
+        _model = None
+        _load_error = None
+        _sidecar = None
+        _metrics.update(loaded=False, load_seconds=None, rss_before_bytes=None,
+                        rss_after_bytes=None, loaded_in_pid=None)
+
+
+def metrics() -> Dict[str, Any]:
+    """Load time and memory footprint of the model in this process."""
+    data = dict(_metrics)
+    if data['rss_before_bytes'] is not None and data['rss_after_bytes'] is not None:
+        data['rss_delta_bytes'] = data['rss_after_bytes'] - data['rss_before_bytes']
+    else:
+        data['rss_delta_bytes'] = None
+    # A model loaded in a prefork parent is shared copy-on-write with this child.
+    data['inherited_from_parent'] = bool(data['loaded_in_pid']) and data['loaded_in_pid'] != os.getpid()
+    data['load_error'] = _load_error
+    return data
+
+
+def _forget_sidecar_after_fork() -> None:
+    # Sidecar connections must not be shared with the parent; a preloaded
+    # local model is kept on purpose (copy-on-write).
+    global _sidecar
+    _sidecar = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_sidecar_after_fork)
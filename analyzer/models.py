@@ -1,20 +1,208 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class ResumeSubmission(models.Model):
 	"""Store a user's resume submission (file or text) and results."""
 	user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
 	resume_file = models.FileField(upload_to='resumes/', null=True, blank=True)
+	resume_sha256 = models.CharField(max_length=64, blank=True, default='')
 	resume_text = models.TextField(null=True, blank=True)
 	target_role = models.CharField(max_length=255)
+	job_description = models.TextField(blank=True, default='')
+	job_posting = models.ForeignKey('JobPosting', on_delete=models.SET_NULL, null=True, blank=True,
+		related_name='submissions')
 
 	# Analysis results (populated after processing)
 	score = models.IntegerField(null=True, blank=True)
 	skills = models.JSONField(null=True, blank=True)
 	recommendations = models.JSONField(null=True, blank=True)
+	feedback = models.TextField(blank=True, default='')
+	metrics = models.JSONField(null=True, blank=True)  # raw analysis: word_count, grammar, keyword_match, ...
+	timings = models.JSONField(null=True, blank=True)  # seconds per analysis stage
+	analyzed_at = models.DateTimeField(null=True, blank=True)
 
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			# History is read per user, newest first, paginated by (created_at, id).
+			models.Index(fields=['user', '-created_at', '-id'], name='submission_user_created'),
+		]
+
 	def __str__(self):
 		return f"ResumeSubmission(id={self.id}, user={self.user}, role={self.target_role})"
+
+	def store_analysis(self, result):
+		"""Save an analysis result (text_classification.analyze_resume_result) on this submission."""
+		self.feedback = result.get('feedback') or ''
+		self.metrics = result.get('analysis')
+		self.timings = result.get('stage_seconds')
+		self.score = result.get('score')
+		self.skills = result.get('skills')
+		self.recommendations = result.get('recommendations')
+		self.analyzed_at = timezone.now()
+		self.save(update_fields=[
+			'feedback', 'metrics', 'timings', 'score', 'skills', 'recommendations', 'analyzed_at',
+		])
+
+
+class AnalysisJob(models.Model):
+	"""A queued analysis of a ResumeSubmission, drained by ``run_analysis_workers``."""
+	STATUS_PENDING = 'pending'
+	STATUS_RUNNING = 'running'
+	STATUS_DONE = 'done'
+	STATUS_FAILED = 'failed'
+	STATUS_CHOICES = [
+		(STATUS_PENDING, 'Pending'),
+		(STATUS_RUNNING, 'Running'),
+		(STATUS_DONE, 'Done'),
+		(STATUS_FAILED, 'Failed'),
+	]
+
+	submission = models.ForeignKey(ResumeSubmission, on_delete=models.CASCADE, related_name='jobs')
+	status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	worker_id = models.CharField(max_length=64, blank=True, default='')
+
+	result = models.JSONField(null=True, blank=True)
+	error = models.TextField(blank=True, default='')
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			# Workers claim the oldest pending job; keep that lookup an index scan.
+			models.Index(fields=['status', 'created_at'], name='analysisjob_status_created'),
+		]
+
+	@property
+	def is_finished(self):
+		return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+	def __str__(self):
+		return f"AnalysisJob(id={self.id}, submission={self.submission_id}, status={self.status})"
+
+
+class AnalysisCacheEntry(models.Model):
+	"""Cached analysis output keyed by a hash of resume bytes + job description."""
+	key = models.CharField(max_length=64, unique=True)
+	result = models.JSONField()
+	size = models.PositiveIntegerField(default=0)
+	hits = models.PositiveIntegerField(default=0)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	def __str__(self):
+		return f"AnalysisCacheEntry(key={self.key[:12]}, hits={self.hits})"
+
+
+class SubmissionEmbedding(models.Model):
+	"""Normalized float32 embeddings of a submission's resume and job description."""
+	submission = models.OneToOneField(ResumeSubmission, on_delete=models.CASCADE, related_name='embedding')
+	model_name = models.CharField(max_length=255)
+	dim = models.PositiveSmallIntegerField()
+
+	resume_vector = models.BinaryField()
+	resume_text_hash = models.CharField(max_length=64)
+	job_vector = models.BinaryField(null=True, blank=True)
+	job_text_hash = models.CharField(max_length=64, blank=True, default='')
+	# resume_vector is the pooled section-chunk vector (embedding_store.match), not a whole-text encode
+	chunked = models.BooleanField(default=False)
+
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"SubmissionEmbedding(submission={self.submission_id}, model={self.model_name})"
+
+
+class ChunkEmbedding(models.Model):
+	"""Normalized float32 embedding of one text chunk, keyed by a hash of model name + chunk text."""
+	key = models.CharField(max_length=64, unique=True)
+	dim = models.PositiveSmallIntegerField()
+	vector = models.BinaryField()
+
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	def __str__(self):
+		return f"ChunkEmbedding(key={self.key[:12]}, dim={self.dim})"
+
+
+class StageResult(models.Model):
+	"""Memoized output of one analysis stage, keyed by a hash of the stage name and its inputs."""
+	key = models.CharField(max_length=64, unique=True)
+	stage = models.CharField(max_length=32)
+	value = models.JSONField()
+
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	def __str__(self):
+		return f"StageResult(stage={self.stage}, key={self.key[:12]})"
+
+
+class JobPosting(models.Model):
+	"""A job description analyzed against many resumes; its job-side features are computed on save (see job_postings.py)."""
+	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+	title = models.CharField(max_length=255)
+	description = models.TextField()
+
+	# Derived from description by job_postings.prepare()
+	description_sha256 = models.CharField(max_length=64, blank=True, default='', editable=False)
+	keywords = models.JSONField(default=list, blank=True, editable=False)
+	summary = models.TextField(blank=True, default='', editable=False)  # cleaned and cut to the prompt budget
+	embedding = models.BinaryField(null=True, blank=True, editable=False)  # normalized float32
+	embedding_model = models.CharField(max_length=255, blank=True, default='', editable=False)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return self.title
+
+	def save(self, *args, **kwargs):
+		from .job_postings import PREPARED_FIELDS, prepare
+		if prepare(self) and kwargs.get('update_fields') is not None:
+			kwargs['update_fields'] = set(kwargs['update_fields']) | set(PREPARED_FIELDS)
+		super().save(*args, **kwargs)
+
+
+class BatchRankJob(models.Model):
+	"""A queued ``batch_rank_view`` ranking, run by ``run_analysis_workers`` like an AnalysisJob."""
+	STATUS_PENDING = AnalysisJob.STATUS_PENDING
+	STATUS_RUNNING = AnalysisJob.STATUS_RUNNING
+	STATUS_DONE = AnalysisJob.STATUS_DONE
+	STATUS_FAILED = AnalysisJob.STATUS_FAILED
+
+	user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='batch_rank_jobs')
+	job_description = models.TextField(blank=True, default='')
+	job_posting = models.ForeignKey(JobPosting, on_delete=models.SET_NULL, null=True, blank=True)
+	submission_ids = models.JSONField(default=list, blank=True)
+	uploads = models.JSONField(default=list, blank=True)  # [storage name, original name] pairs, deleted when done
+	top = models.PositiveIntegerField(null=True, blank=True)
+
+	status = models.CharField(max_length=16, choices=AnalysisJob.STATUS_CHOICES, default=STATUS_PENDING)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	worker_id = models.CharField(max_length=64, blank=True, default='')
+
+	result = models.JSONField(null=True, blank=True)
+	error = models.TextField(blank=True, default='')
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['status', 'created_at'], name='batchrankjob_status_created'),
+		]
+
+	@property
+	def is_finished(self):
+		return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+	def __str__(self):
+		return f"BatchRankJob(id={self.id}, status={self.status})"
@@ -0,0 +1,102 @@
+"""onnxruntime implementation of the ``onnx`` / ``onnx-int8`` embedding backends.
+
+Imported by embedding_backends only when one of them is loaded.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Optional
+
+import numpy as np
+from django.conf import settings
+
+DEFAULT_MAX_LENGTH = 256  # max_seq_length of all-MiniLM-L6-v2
+
+
+class OnnxEmbedModel:
+    """Mean-pooled transformer embeddings from an onnxruntime session.
+
+    ``encode`` takes the same arguments as SentenceTransformer.encode and
+    returns float32 arrays.
+    """
+
+    def __init__(self, session, tokenizer, normalize: bool = True):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.normalize = normalize  # the model ends in a Normalize module
+        self._inputs = {i.name for i in session.get_inputs()}
+
+    def _encode_batch(self, texts) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {'input_ids': ids, 'attention_mask': mask}
+        if 'token_type_ids' in self._inputs:
+            feeds['token_type_ids'] = np.zeros_like(ids)
+        tokens = self.session.run(None, feeds)[0]  # (batch, seq, dim)
+        weights = mask[..., None].astype(np.float32)
+        return (tokens * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(s) for s in sentences]
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        # Similar lengths per batch means less padding, as SentenceTransformer does
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        batch_size = max(1, batch_size or 32)
+        parts = [self._encode_batch([texts[i] for i in order[start:start + batch_size]])
+                 for start in range(0, len(order), batch_size)]
+        vectors = np.empty((len(texts), parts[0].shape[1]), dtype=np.float32)
+        vectors[order] = np.vstack(parts)
+        if self.normalize or normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.clip(norms, 1e-12, None)
+        return vectors[0] if single else vectors
+
+
+def _model_files(name: str, onnx_file: str) -> str:
+    """Directory holding ``onnx_file`` and the tokenizer/config files of ``name``."""
+    local = getattr(settings, 'EMBED_ONNX_DIR', None)
+    if local:
+        return local
+    from huggingface_hub import snapshot_download
+    repo_id = name if '/' in name else f'sentence-transformers/{name}'
+    return snapshot_download(repo_id, allow_patterns=[
+        onnx_file, 'tokenizer.json', 'modules.json', 'sentence_bert_config.json', '1_Pooling/config.json',
+    ])
+
+
+def _read_json(directory: str, name: str) -> Optional[Any]:
+    try:
+        with open(os.path.join(directory, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_onnx_model(name: str, onnx_file: str) -> OnnxEmbedModel:
+    import onnxruntime
+    from tokenizers import Tokenizer
+
+    directory = _model_files(name, onnx_file)
+    pooling = _read_json(directory, '1_Pooling/config.json') or {}
+    if pooling and not pooling.get('pooling_mode_mean_tokens'):
+        raise ValueError(f"{name}: only mean-pooling models are supported by the ONNX backend")
+    config = _read_json(directory, 'sentence_bert_config.json') or {}
+    modules = _read_json(directory, 'modules.json') or []
+
+    tokenizer = Tokenizer.from_file(os.path.join(directory, 'tokenizer.json'))
+    tokenizer.enable_truncation(max_length=config.get('max_seq_length', DEFAULT_MAX_LENGTH))
+    tokenizer.enable_padding(pad_id=tokenizer.token_to_id('[PAD]') or 0)
+
+    options = onnxruntime.SessionOptions()
+    threads = getattr(settings, 'EMBED_ONNX_THREADS', 0)
+    if threads:
+        options.intra_op_num_threads = threads
+    session = onnxruntime.InferenceSession(
+        os.path.join(directory, onnx_file), options, providers=['CPUExecutionProvider'])
+    normalize = any(m.get('type', '').endswith('Normalize') for m in modules)
+    return OnnxEmbedModel(session, tokenizer, normalize=normalize)
@@ -0,0 +1,181 @@
+"""Token-budgeted prompt building shared by the LLM callers.
+
+Both text_classification (free-text feedback) and gemini_client (structured
+score/skills/recommendations) build their prompts here. Each section of a
+prompt gets a token budget (``PROMPT_TOKEN_BUDGETS``) instead of a character
+cut or no limit at all; text is stripped of redundant whitespace and resume /
+job-ad boilerplate before it is budgeted, and the analysis dict is sent as
+dense ``key=value`` lines rather than its ``repr``.
+
+Token counts are estimates (see ``estimate_tokens``); they are logged for
+every prompt and returned with it so callers can record them.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from .document import ParsedDocument
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS = {
+    'resume': 800,
+    'job_description': 400,
+    'analysis': 120,
+    'target_role': 30,
+}
+
+# Pieces that add tokens but no information for a reviewer.
+_BOILERPLATE = re.compile(
+    r"""
+      \bpage\s+\d+\s+of\s+\d+\b
+    | \breferences\s+(?:are\s+)?available\s+(?:up)?on\s+request\b\.?
+    | \bcurriculum\s+vitae\b
+    | \b(?:we\s+are\s+(?:an?\s+)?|is\s+an?\s+)?equal\s+(?:employment\s+)?opportunity\s+employer\b\.?
+    | \ball\s+qualified\s+applicants\s+will\s+receive\s+consideration[^.\n]*\.?
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count: one per punctuation mark, one per ~4 word characters."""
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PIECE.findall(text or ''))
+
+
+def clean(text: str) -> str:
+    """Drop boilerplate, repeated lines (page headers/footers) and redundant whitespace."""
+    if isinstance(text, ParsedDocument):
+        # Normalized text has lost its line breaks; the document still knows them.
+        text = '\n'.join(text.lines)
+    text = _BOILERPLATE.sub(' ', (text or '').replace('\x00', ' '))
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = re.sub(r'[ \t\f\v]+', ' ', line).strip(' -|•')
+        if not line or line.isdigit():
+            continue
+        key = line.lower()
+        if key in seen and len(line) < 80:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Longest prefix of ``text`` within ``budget`` tokens, cut at a word boundary."""
+    if budget <= 0:
+        return ''
+    used = 0
+    for match in _TOKEN_PIECE.finditer(text):
+        used += math.ceil(len(match.group()) / 4)
+        if used > budget:
+            return text[:match.start()].rstrip() + ' …'
+    return text
+
+
+def compact_analysis(analysis: dict) -> str:
+    """The analysis dict as short ``key=value`` lines, leaving out failed stages."""
+    lines = []
+    for key in ('word_count', 'action_verbs'):
+        if key in analysis:
+            lines.append(f"{key}={analysis[key]}")
+    if analysis.get('missing_sections'):
+        lines.append("missing_sections=" + ','.join(analysis['missing_sections']))
+    grammar = analysis.get('grammar') or {}
+    if grammar.get('errors_count', -1) >= 0:
+        samples = '; '.join(s.split(' | ', 1)[-1][:80] for s in grammar.get('sample_errors', [])[:3])
+        lines.append(f"grammar_errors={grammar['errors_count']}" + (f" (e.g. {samples})" if samples else ''))
+    match = analysis.get('keyword_match') or {}
+    if 'error' not in match and match:
+        lines.append(
+            f"semantic_similarity={match.get('semantic_similarity', 0):.2f} "
+            f"keyword_coverage={match.get('keyword_coverage_percent', 0):.0f}%"
+        )
+    return '\n'.join(lines)
+
+
+def budgets() -> Dict[str, int]:
+    return {**DEFAULT_BUDGETS, **getattr(settings, 'PROMPT_TOKEN_BUDGETS', {})}
+
+
+@dataclass
+class Prompt:
+    text: str
+    tokens: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+
+
+def build(kind: str, instructions: Sequence[str], sections: List[Tuple[str, str, Optional[str]]],
+          prepared: Sequence[str] = ()) -> Prompt:
+    """Join ``instructions`` with ``(budget_name, heading, text)`` sections.
+
+    Each section is cleaned and cut to its budget, except those named in
+    ``prepared`` (already cleaned and cut); empty sections are left out.
+    ``kind`` only labels the log line.
+    """
+    limits = budgets()
+    parts = ['\n'.join(instructions)]
+    section_tokens = {}
+    for name, heading, text in sections:
+        if name in prepared:
+            body = text or ''
+        else:
+            body = text if name == 'analysis' else clean(text)
+            body = truncate_to_tokens(body, limits[name]) if name in limits else body
+        if not body:
+            continue
+        section_tokens[name] = estimate_tokens(body)
+        parts.append(f"{heading}:\n{body}")
+    text = '\n\n'.join(parts)
+    prompt = Prompt(text=text, tokens=estimate_tokens(text), section_tokens=section_tokens)
+    logger.info('%s prompt: ~%d tokens %s', kind, prompt.tokens, section_tokens)
+    return prompt
+
+
+def summarize_job(job_text: Optional[str]) -> str:
+    """``job_text`` as the feedback prompt sends it: cleaned and cut to the job_description budget."""
+    return truncate_to_tokens(clean(job_text), budgets()['job_description'])
+
+
+def feedback_prompt(resume_text: str, analysis: dict, job_text: Optional[str] = None,
+                    job_summary: Optional[str] = None) -> Prompt:
+    """Prompt for text_classification's free-text reviewer feedback.
+
+    ``job_summary`` (e.g. a JobPosting's stored summary) is used instead of
+    cleaning and cutting ``job_text`` again.
+    """
+    instructions = [
+        "You are a professional resume reviewer. Provide 4-6 actionable, concise suggestions.",
+        "Focus on structure, clarity, achievements, keywords, formatting.",
+    ]
+    if job_text or job_summary:
+        instructions.append("Also comment briefly on job match.")
+    return build('feedback', instructions, [
+        ('resume', 'RESUME', resume_text),
+        ('analysis', 'ANALYSIS', compact_analysis(analysis)),
+        ('job_description', 'JOB DESCRIPTION', job_summary or job_text),
+    ], prepared=('job_description',) if job_summary else ())
+
+
+def structured_prompt(resume_text: str, target_role: str) -> Prompt:
+    """Prompt for gemini_client's JSON score/skills/recommendations."""
+    instructions = [
+        "You are an expert resume reviewer.",
+        "Given the resume text and the target job role, extract the candidate's key technical and soft"
+        " skills as a JSON array, produce a short list of actionable recommendations to improve the"
+        " resume for the role, and provide a relevance score from 0 to 100 (higher is better).",
+        "Respond ONLY with a JSON object with keys: score (integer), skills (array of strings),"
+        " recommendations (array of strings). Do not add extra explanation.",
+    ]
+    return build('structured', instructions, [
+        ('resume', 'Resume', resume_text),
+        ('target_role', 'Target role', target_role),
+    ])
@@ -0,0 +1,156 @@
+"""Persistent, content-addressed cache for resume analysis results.
+
+Entries are keyed by ``sha256(resume bytes) + normalized job description +
+target role + ANALYZER_VERSION + embedding model id`` and stored in the
+``AnalysisCacheEntry`` table, so every web and worker process shares them.
+Entries expire after ``ANALYSIS_CACHE_TTL_SECONDS`` and the least recently
+used ones are evicted once the table grows past ``ANALYSIS_CACHE_MAX_ENTRIES``
+rows or ``ANALYSIS_CACHE_MAX_BYTES`` of stored results.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from . import metrics, model_registry
+from .models import AnalysisCacheEntry
+
+# Bump whenever text_classification changes what it produces for the same
+# input, so stale results stop matching instead of being served.
+ANALYZER_VERSION = "7"
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+    if name in ('hits', 'misses'):
+        # Recorded where it happens so worker processes' lookups reach /metrics too.
+        metrics.inc('resume_analysis_cache_lookups_total', n, outcome=name)
+
+
+def enabled() -> bool:
+    return getattr(settings, 'ANALYSIS_CACHE_ENABLED', True)
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_job_description(job_description: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form, so re-pasted text still matches."""
+    return re.sub(r'\s+', ' ', job_description or '').strip().lower()
+
+
+def make_key(file_hash: str, job_description: Optional[str], target_role: Optional[str] = '') -> str:
+    digest = hashlib.sha256()
+    for part in (ANALYZER_VERSION, file_hash, normalize_job_description(job_description),
+                 normalize_job_description(target_role), model_registry.model_id()):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def lookup(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for ``key`` or None, dropping expired entries."""
+    if not enabled():
+        return None
+    entry = AnalysisCacheEntry.objects.filter(key=key).only('pk', 'result', 'created_at').first()
+    if entry is not None:
+        ttl = getattr(settings, 'ANALYSIS_CACHE_TTL_SECONDS', 7 * 24 * 3600)
+        if entry.created_at < timezone.now() - timedelta(seconds=ttl):
+            AnalysisCacheEntry.objects.filter(pk=entry.pk).delete()
+            entry = None
+    if entry is None:
+        _count('misses')
+        return None
+    AnalysisCacheEntry.objects.filter(pk=entry.pk).update(
+        hits=F('hits') + 1, last_accessed_at=timezone.now()
+    )
+    _count('hits')
+    return entry.result
+
+
+def store(key: str, result: Dict[str, Any]) -> None:
+    if not enabled():
+        return
+    size = len(json.dumps(result, default=str).encode('utf-8'))
+    try:
+        AnalysisCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={'result': result, 'size': size, 'created_at': timezone.now(),
+                      'last_accessed_at': timezone.now()},
+        )
+    except IntegrityError:
+        # Another process stored the same key first; its result is as good as ours.
+        return
+    _count('stores')
+    evict()
+
+
+def evict() -> int:
+    """Delete expired entries, then LRU entries until both bounds hold."""
+    ttl = getattr(settings, 'ANALYSIS_CACHE_TTL_SECONDS', 7 * 24 * 3600)
+    max_entries = getattr(settings, 'ANALYSIS_CACHE_MAX_ENTRIES', 5000)
+    max_bytes = getattr(settings, 'ANALYSIS_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+
+    removed, _ = AnalysisCacheEntry.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=ttl)
+    ).delete()
+
+    footprint = AnalysisCacheEntry.objects.aggregate(count=Count('pk'), total=Sum('size'))
+    count, total = footprint['count'], footprint['total'] or 0
+    if count > max_entries or total > max_bytes:
+        from .embedding_store import _slices
+        doomed = []
+        for pk, size in AnalysisCacheEntry.objects.order_by('last_accessed_at').values_list('pk', 'size').iterator():
+            if count <= max_entries and total <= max_bytes:
+                break
+            doomed.append(pk)
+            count -= 1
+            total -= size
+        for part in _slices(doomed):
+            AnalysisCacheEntry.objects.filter(pk__in=part).delete()
+        removed += len(doomed)
+
+    if removed:
+        _count('evictions', removed)
+    return removed
+
+
+def clear() -> int:
+    removed, _ = AnalysisCacheEntry.objects.all().delete()
+    return removed
+
+
+def counters() -> Dict[str, int]:
+    """This process's hit/miss/store/eviction counters, without touching the database."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters for this process plus the table's current footprint."""
+    data = counters()
+    lookups = data['hits'] + data['misses']
+    data['hit_rate'] = data['hits'] / lookups if lookups else 0.0
+    footprint = AnalysisCacheEntry.objects.aggregate(count=Count('pk'), total=Sum('size'), hits=Sum('hits'))
+    data['entries'] = footprint['count']
+    data['bytes'] = footprint['total'] or 0
+    data['entry_hits'] = footprint['hits'] or 0  # across all processes, for live entries
+    return data
@@ -0,0 +1,159 @@
+"""Run independent analysis stages concurrently with per-stage timeouts.
+
+Each ``Stage`` says where it runs:
+
+- ``inline``: in the calling thread (cheap, pure-Python work);
+- ``thread``: on a shared thread pool (network/JVM calls, and native code
+  such as torch that releases the GIL);
+- ``process``: on a shared process pool (CPU-bound pure Python; the function
+  and its arguments must be picklable).
+
+A stage that raises or misses its deadline yields its ``default`` value
+instead of failing the whole analysis, so callers always get a full result
+dict and the wall-clock cost approaches the slowest stage rather than the sum.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+INLINE = 'inline'
+THREAD = 'thread'
+PROCESS = 'process'
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable, *args, kind: str = INLINE,
+                 timeout: Optional[float] = None, default: Any = None):
+        if kind not in (INLINE, THREAD, PROCESS):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kind = kind
+        self.timeout = timeout
+        self.default = default
+
+    def fallback(self, error: str) -> Any:
+        metrics.fallback(self.name)
+        value = self.default() if callable(self.default) else self.default
+        if isinstance(value, dict):
+            value = dict(value, error=error)
+        return value
+
+
+_executor_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor(kind: str):
+    """Shared thread (``THREAD``) or process (``PROCESS``) pool for this process."""
+    global _thread_pool, _process_pool
+    with _executor_lock:
+        if kind == THREAD:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ANALYSIS_STAGE_THREADS', 8),
+                    thread_name_prefix='analysis-stage',
+                )
+            return _thread_pool
+        if _process_pool is None:
+            # spawn, not fork: callers usually have live threads (LanguageTool
+            # pool, torch), which fork() would copy in an undefined state.
+            _process_pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'ANALYSIS_STAGE_PROCESSES', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _process_pool
+
+
+def _forget_executors_after_fork() -> None:
+    global _thread_pool, _process_pool, _executor_lock
+    _thread_pool = None
+    _process_pool = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executors_after_fork)
+
+
+def _timed_call(func: Callable, args: tuple) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+def run_stages(stages: Iterable[Stage]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run ``stages`` and return ``(results, seconds)`` keyed by stage name.
+
+    Timeouts count from when the stages were submitted, so a stage waited on
+    late is not given extra time because an earlier one was slow.
+    """
+    stages = list(stages)
+    results: Dict[str, Any] = {}
+    seconds: Dict[str, float] = {}
+    submitted = time.perf_counter()
+
+    futures = {}
+    for stage in stages:
+        if stage.kind != INLINE:
+            futures[stage.name] = get_executor(stage.kind).submit(_timed_call, stage.func, stage.args)
+
+    for stage in stages:
+        if stage.kind != INLINE:
+            continue
+        started = time.perf_counter()
+        try:
+            results[stage.name] = stage.func(*stage.args)
+        except Exception as e:
+            logger.exception('Analysis stage %s failed', stage.name)
+            results[stage.name] = stage.fallback(str(e))
+        seconds[stage.name] = time.perf_counter() - started
+
+    for stage in stages:
+        if stage.kind == INLINE:
+            continue
+        future = futures[stage.name]
+        remaining = None
+        if stage.timeout is not None:
+            remaining = max(0.0, stage.timeout - (time.perf_counter() - submitted))
+        try:
+            results[stage.name], seconds[stage.name] = future.result(timeout=remaining)
+        except FutureTimeout:
+            logger.warning('Analysis stage %s timed out after %ss', stage.name, stage.timeout)
+            future.cancel()
+            results[stage.name] = stage.fallback(f"timed out after {stage.timeout}s")
+            seconds[stage.name] = time.perf_counter() - submitted
+        except Exception as e:
+            logger.exception('Analysis stage %s failed', stage.name)
+            results[stage.name] = stage.fallback(str(e))
+            seconds[stage.name] = time.perf_counter() - submitted
+
+    for name, value in seconds.items():
+        metrics.observe('resume_analysis_stage_seconds', value, stage=name)
+    return results, seconds
+
+
+# Seconds; ANALYSIS_STAGE_TIMEOUTS overrides these per stage (None: no timeout)
+DEFAULT_STAGE_TIMEOUTS = {
+    'grammar': 20.0,
+    'keyword_match': 30.0,
+    'structured': 25.0,
+}
+
+
+def stage_timeout(name: str) -> Optional[float]:
+    return {**DEFAULT_STAGE_TIMEOUTS, **getattr(settings, 'ANALYSIS_STAGE_TIMEOUTS', {})}.get(name)
@@ -0,0 +1,11 @@
+# A small resume shared by the test modules
+RESUME = """Jane Doe
+SUMMARY
+Backend engineer who built and optimized Python services.
+SKILLS
+Python, Django, machine learning, CI-CD
+EXPERIENCE
+- Led a team of four; reduced latency by 40%.
+EDUCATION
+B.Tech, Computer Science
+"""
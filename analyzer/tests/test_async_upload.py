@@ -0,0 +1,51 @@
+import asyncio
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from ..uploads import ResumeUploadHandler
+from ..views import upload_resume_async_view
+from . import RESUME
+
+
+async def _anonymous():
+    return AnonymousUser()
+
+
+class AsyncUploadViewTests(TestCase):
+    def _request(self, enforce_csrf=False):
+        request = RequestFactory().post(reverse('upload_resume_async'), {
+            'resume_file': SimpleUploadedFile('cv.txt', RESUME.encode(), 'text/plain'),
+        })
+        request._dont_enforce_csrf_checks = not enforce_csrf
+        request.auser = _anonymous
+        return request
+
+    def test_the_upload_is_read_off_the_event_loop(self):
+        on_loop = []
+        receive = ResumeUploadHandler.receive_data_chunk
+
+        def record(handler, raw_data, start):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return receive(handler, raw_data, start)
+
+        analyze = mock.AsyncMock(return_value={'feedback': 'ok', 'analysis': {}})
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch.object(ResumeUploadHandler, 'receive_data_chunk', record), \
+                mock.patch('analyzer.text_classification.analyze_resume_result_async', analyze):
+            response = async_to_sync(upload_resume_async_view)(self._request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(on_loop), {False})
+
+    def test_csrf_is_still_checked(self):
+        response = async_to_sync(upload_resume_async_view)(self._request(enforce_csrf=True))
+        self.assertEqual(response.status_code, 403)
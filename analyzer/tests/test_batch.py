@@ -0,0 +1,57 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import RESUME
+from .. import jobs
+from ..benchmark import stubbed_services
+from ..models import BatchRankJob, ResumeSubmission
+
+JOB = "Python developer with Django and SQL experience"
+
+
+class BatchRankQueueTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.enterContext(stubbed_services())
+        self.user = get_user_model().objects.create_user('ranker', password='pw')
+        self.client.force_login(self.user)
+
+    def _post(self, **data):
+        return self.client.post(reverse('batch_rank'), {'job_description': JOB, **data})
+
+    def test_view_queues_and_worker_ranks(self):
+        mine = ResumeSubmission.objects.create(user=self.user, resume_text=RESUME)
+        other = get_user_model().objects.create_user('other', password='pw')
+        theirs = ResumeSubmission.objects.create(user=other, resume_text=RESUME)
+        response = self._post(submission_ids=f'{mine.pk},{theirs.pk}',
+                              resume_files=SimpleUploadedFile('cv.txt', RESUME.encode()))
+        self.assertEqual(response.status_code, 202)
+        payload = response.json()
+        self.assertEqual(payload['status'], 'pending')
+        job = BatchRankJob.objects.get(pk=payload['job_id'])
+        self.assertEqual(job.submission_ids, [mine.pk])
+        stored = job.uploads[0][0]
+        self.assertTrue(default_storage.exists(stored))
+
+        self.assertEqual(jobs.work(exit_when_empty=True), 1)
+        status = self.client.get(payload['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(sorted(str(item['id']) for item in status['results']), sorted([str(mine.pk), 'cv.txt']))
+        self.assertFalse(default_storage.exists(stored))
+
+    def test_status_is_private(self):
+        job = BatchRankJob.objects.create(user=get_user_model().objects.create_user('other', password='pw'),
+                                          job_description=JOB, submission_ids=[], uploads=[])
+        self.assertEqual(self.client.get(reverse('batch_rank_status', args=[job.pk])).status_code, 404)
+
+    @override_settings(ANALYSIS_RUN_INLINE=True)
+    def test_inline_runs_before_returning(self):
+        mine = ResumeSubmission.objects.create(user=self.user, resume_text=RESUME)
+        response = self._post(submission_ids=str(mine.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['results']], [mine.pk])
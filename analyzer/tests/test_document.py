@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+
+from .. import document
+from . import RESUME
+
+
+class DocumentParseTests(SimpleTestCase):
+    def test_sections_and_bullets(self):
+        doc = document.parse(RESUME)
+        self.assertEqual([s.name for s in doc.sections], ['summary', 'skills', 'experience', 'education'])
+        self.assertEqual(doc.section_text('skills'), 'Python, Django, machine learning, CI-CD')
+        self.assertEqual(doc.bullet_count, 1)
+        self.assertEqual(doc, ' '.join(RESUME.split()))
+
+    def test_chunks_follow_sections_and_word_limit(self):
+        chunks = document.parse(RESUME).chunks(max_words=3)
+        self.assertEqual(chunks[0], document.Chunk('header', 'Jane Doe'))
+        self.assertTrue(all(len(chunk.text.split()) <= 3 for chunk in chunks))
+        self.assertEqual([c.section for c in chunks if c.text.startswith('SKILLS')], ['skills'])
+
+    def test_of_does_not_reparse(self):
+        doc = document.parse(RESUME)
+        self.assertIs(document.of(doc), doc)
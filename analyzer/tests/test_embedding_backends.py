@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from .. import capabilities, embedding_backends, model_registry
+from ..onnx_embedding import OnnxEmbedModel
+
+
+class BackendSelectionTests(SimpleTestCase):
+    def setUp(self):
+        model_registry.reset()
+        self.addCleanup(model_registry.reset)
+
+    def test_reference_backend_by_default(self):
+        self.assertEqual(embedding_backends.current(), embedding_backends.REFERENCE)
+        self.assertEqual(model_registry.model_id(), model_registry.model_name())
+
+    @override_settings(EMBED_BACKEND='onnx-int8', EMBED_ONNX_FILE='onnx/model_qint8_avx512_vnni.onnx')
+    def test_onnx_backend_loads_the_configured_file_under_its_own_id(self):
+        self.enterContext(mock.patch.dict(capabilities._found, {'onnxruntime': True, 'tokenizers': True}))
+        with mock.patch('analyzer.onnx_embedding.load_onnx_model', return_value='onnx model') as load:
+            self.assertEqual(model_registry.get_local_model(), 'onnx model')
+        load.assert_called_once_with(model_registry.model_name(), 'onnx/model_qint8_avx512_vnni.onnx')
+        self.assertEqual(model_registry.model_id(), f'{model_registry.model_name()}@onnx-int8')
+        self.assertEqual(model_registry.metrics()['backend'], 'onnx-int8')
+
+    @override_settings(EMBED_BACKEND='onnx')
+    def test_missing_runtime_is_remembered_without_importing(self):
+        self.enterContext(mock.patch.dict(capabilities._found, {'onnxruntime': False, 'tokenizers': True}))
+        with mock.patch('analyzer.onnx_embedding.load_onnx_model') as load:
+            self.assertIsNone(model_registry.get_local_model())
+            self.assertIsNone(model_registry.get_local_model())
+        load.assert_not_called()
+        self.assertEqual(model_registry.load_error(), 'onnxruntime, tokenizers not installed')
+
+    @override_settings(EMBED_BACKEND='tensorflow')
+    def test_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            model_registry.embedding_available()
+
+
+class _Tokenizer:
+    def encode_batch(self, texts):
+        # Shorter texts are padded; padding must not count in the mean.
+        width = max(len(t.split()) for t in texts)
+        return [SimpleNamespace(ids=[1] * width, attention_mask=[1] * len(t.split()) + [0] * (width - len(t.split())))
+                for t in texts]
+
+
+class _Session:
+    def get_inputs(self):
+        return [SimpleNamespace(name='input_ids'), SimpleNamespace(name='attention_mask')]
+
+    def run(self, outputs, feeds):
+        batch, seq = feeds['input_ids'].shape
+        tokens = np.zeros((batch, seq, 2), dtype=np.float32)
+        tokens[:, :, 0] = np.arange(1, seq + 1)  # token i embeds as (i, 1)
+        tokens[:, :, 1] = 1
+        return [tokens]
+
+
+class OnnxEmbedModelTests(SimpleTestCase):
+    def test_mean_pools_over_unpadded_tokens_in_input_order(self):
+        model = OnnxEmbedModel(_Session(), _Tokenizer(), normalize=False)
+        vectors = model.encode(['one', 'one two three'])
+        np.testing.assert_allclose(vectors, [[1, 1], [2, 1]])
+        self.assertEqual(model.encode('one two three').shape, (2,))
+
+    def test_normalizes(self):
+        vectors = OnnxEmbedModel(_Session(), _Tokenizer()).encode(['one two three'])
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), [1.0], rtol=1e-6)
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from .. import model_registry
+from ..benchmark import FakeEmbedModel
+from ..embedding_server import EmbeddingServer, EmbeddingServerError, MicroBatcher, SidecarEmbedModel
+
+
+class SidecarTests(SimpleTestCase):
+    def setUp(self):
+        self.socket_path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'embed.sock')
+        self.model = FakeEmbedModel()
+
+    def _serve(self, **batcher_options):
+        batcher = MicroBatcher(self.model, **batcher_options)
+        server = EmbeddingServer(self.socket_path, batcher)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return batcher
+
+    def test_encodes_over_the_socket(self):
+        self._serve()
+        fallback = mock.Mock()
+        client = SidecarEmbedModel(self.socket_path, fallback)
+        vectors = client.encode(['python developer', 'data analyst'], normalize_embeddings=True)
+        np.testing.assert_allclose(vectors, self.model.encode(['python developer', 'data analyst']), rtol=1e-5)
+        self.assertEqual(client.encode('python developer').shape, (FakeEmbedModel.dim,))
+        fallback.assert_not_called()
+
+    def test_concurrent_requests_share_a_batch(self):
+        batcher = self._serve(window_ms=200)
+        client = SidecarEmbedModel(self.socket_path, mock.Mock())
+        threads = [threading.Thread(target=client.encode, args=([f'resume {i}'],)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(batcher.requests, 4)
+        self.assertLess(batcher.batches, 4)
+
+    def test_falls_back_in_process_and_backs_off(self):
+        fallback = mock.Mock(return_value=self.model)
+        client = SidecarEmbedModel(self.socket_path, fallback, retry_seconds=60)
+        with mock.patch.object(client, 'encode_remote', wraps=client.encode_remote) as remote, \
+                self.assertLogs('analyzer.embedding_server', 'WARNING'):
+            vectors = client.encode(['python developer'])
+            client.encode(['data analyst'])
+        self.assertEqual(vectors.shape, (1, FakeEmbedModel.dim))
+        self.assertEqual(remote.call_count, 1)  # not retried until retry_seconds have passed
+        self.assertEqual(fallback.call_count, 2)
+
+    def test_no_sidecar_and_no_local_model(self):
+        client = SidecarEmbedModel(self.socket_path, lambda: None)
+        with self.assertRaises(EmbeddingServerError), self.assertLogs('analyzer.embedding_server', 'WARNING'):
+            client.encode(['python developer'])
+
+    def test_registry_returns_the_sidecar_client_when_configured(self):
+        self.addCleanup(model_registry.reset)
+        model_registry.reset()
+        with override_settings(EMBED_SERVER_SOCKET=self.socket_path):
+            client = model_registry.get_embed_model()
+        self.assertIsInstance(client, SidecarEmbedModel)
+        self.assertEqual(client.socket_path, self.socket_path)
+        self.assertIs(client.fallback, model_registry.get_local_model)
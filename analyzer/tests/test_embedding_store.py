@@ -0,0 +1,70 @@
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .. import jobs, result_cache, text_classification
+from ..benchmark import FakeEmbedModel, stubbed_services
+from ..models import ChunkEmbedding, ResumeSubmission, SubmissionEmbedding
+from . import RESUME
+
+
+class ChunkCacheTests(TestCase):
+    def test_lookup_stays_under_sqlite_parameter_limit(self):
+        from ..embedding_store import encode_cached
+
+        texts = [f'chunk {i}' for i in range(2000)]
+        model = FakeEmbedModel()
+        encode_cached(texts, model)
+        connection.ensure_connection()
+        previous = connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        try:
+            with mock.patch.object(model, 'encode', side_effect=AssertionError('re-encoded')):
+                vectors = encode_cached(texts, model)
+        finally:
+            connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, previous)
+        self.assertEqual(vectors.shape, (2000, FakeEmbedModel.dim))
+
+    @override_settings(ANALYSIS_CACHE_ENABLED=False)
+    def test_not_cached_when_the_analysis_cache_is_off(self):
+        from ..embedding_store import encode_cached
+
+        encode_cached(['some text'], FakeEmbedModel())
+        self.assertFalse(ChunkEmbedding.objects.exists())
+
+
+class CachedResultEmbeddingTests(TransactionTestCase):
+    job = "Python developer"
+
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.enterContext(stubbed_services())
+
+    def _submission(self):
+        submission = ResumeSubmission.objects.create(
+            resume_file=SimpleUploadedFile('cv.txt', RESUME.encode()), job_description=self.job)
+        submission.resume_sha256 = result_cache.hash_file(submission.resume_file.path)
+        submission.save(update_fields=['resume_sha256'])
+        return submission
+
+    def _analyze(self, submission):
+        return text_classification.analyze_resume_result(
+            submission.resume_file.path, self.job, submission.pk, file_hash=submission.resume_sha256)
+
+    def test_a_cache_hit_copies_the_vectors_of_the_same_file_and_job(self):
+        self._analyze(self._submission())
+        submission = self._submission()
+        job = jobs.enqueue_analysis(submission)
+        self.assertEqual((job.status, job.worker_id), ('done', 'cache'))
+        self.assertTrue(SubmissionEmbedding.objects.filter(submission=submission).exists())
+
+    def test_a_cache_hit_with_nothing_to_copy_computes_the_vectors(self):
+        self._analyze(self._submission())
+        SubmissionEmbedding.objects.all().delete()
+        submission = self._submission()
+        self.assertEqual(jobs.enqueue_analysis(submission).status, 'pending')
+        self._analyze(submission)
+        self.assertTrue(SubmissionEmbedding.objects.filter(submission=submission).exists())
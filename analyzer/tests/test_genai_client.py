@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ..genai_client import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        entered, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            entered.set()
+            release.wait(5)
+            return 'feedback'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('prompt', slow)))
+        leader.start()
+        entered.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do('prompt', slow))) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        while flight.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(results, ['feedback'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {'calls': 1, 'coalesced': 3})
+        # Finished calls are not cached: the next caller goes upstream again.
+        self.assertEqual(flight.do('prompt', lambda: 'again'), 'again')
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+        entered, release = threading.Event(), threading.Event()
+
+        def failing():
+            entered.set()
+            release.wait(5)
+            raise RuntimeError('quota')
+
+        errors = []
+
+        def call():
+            try:
+                flight.do('prompt', failing)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call)]
+        threads[0].start()
+        entered.wait(5)
+        threads.append(threading.Thread(target=call))
+        threads[1].start()
+        while flight.coalesced < 1:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(errors, ['quota', 'quota'])
+
+    def test_async_callers_share_one_task(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'feedback'
+
+        async def main():
+            return await asyncio.gather(*(flight.ado('prompt', fetch) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(main()), ['feedback'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {'calls': 1, 'coalesced': 3})
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from .. import grammar
+
+
+class _Tool:
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    def check(self, text):
+        if self.gate is not None:
+            self.gate.wait()
+        return ['match']
+
+    def close(self):
+        pass
+
+
+class LanguageToolPoolTests(SimpleTestCase):
+    def test_recovers_once_hung_calls_return(self):
+        gate = threading.Event()
+        tools = iter([_Tool(gate), _Tool(gate)] + [_Tool() for _ in range(5)])
+        pool = grammar.LanguageToolPool(2, 'en-US', None, timeout=0.1, health_check_seconds=60)
+        pool._connect = lambda: grammar._PooledClient(next(tools))
+        try:
+            for _ in range(3):
+                with self.assertRaises(TimeoutError):
+                    pool.check('text')
+            gate.set()
+            time.sleep(0.05)
+            self.assertEqual(pool.check('text'), ['match'])
+        finally:
+            gate.set()
+            pool.close()
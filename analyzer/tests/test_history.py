@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import ResumeSubmission
+
+
+@override_settings(HISTORY_PAGE_SIZE=2)
+class HistoryViewTests(TestCase):
+    def test_cursor_pages_through_every_submission_once(self):
+        user = User.objects.create_user('ann', 'ann@example.com', 'pw')
+        other = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        ids = [ResumeSubmission.objects.create(user=user, target_role=f'r{i}').pk for i in range(5)]
+        ResumeSubmission.objects.create(user=other, target_role='hidden')
+        # Equal timestamps must still page by id
+        ResumeSubmission.objects.filter(pk__in=ids[1:4]).update(created_at=timezone.now())
+        self.client.force_login(user)
+
+        seen, cursor = [], None
+        for _ in range(5):
+            response = self.client.get(reverse('history'), {'before': cursor} if cursor else {})
+            seen += [item['analysis_url'] for item in response.context['history_items']]
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                break
+        expected = ResumeSubmission.objects.filter(user=user).order_by('-created_at', '-id')
+        self.assertEqual(seen, [reverse('submission_result', args=[s.pk]) for s in expected])
@@ -0,0 +1,65 @@
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from ..http_client import CircuitBreaker, RetryingClient, TokenBucket, UpstreamUnavailable
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_waits_once_the_burst_is_used(self):
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        self.assertEqual(bucket.reserve(max_wait=5), 0.0)
+        self.assertEqual(bucket.reserve(max_wait=5), 0.0)
+        self.assertGreater(bucket.reserve(max_wait=5), 0.9)
+
+    def test_refuses_waits_longer_than_max_wait(self):
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        bucket.reserve(max_wait=5)
+        with self.assertRaises(UpstreamUnavailable):
+            bucket.reserve(max_wait=0.1)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_then_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'closed')
+        with self.assertLogs('analyzer.http_client', 'WARNING'):
+            breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        with mock.patch('analyzer.http_client.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(breaker.state, 'half-open')
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=5, reset_seconds=0)
+        breaker._opened_at = time.monotonic()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())  # reset_seconds=0: half-open again straight away
+
+    def test_unexpected_error_gives_back_the_trial_slot(self):
+        client = RetryingClient(max_retries=0, breaker_failures=1, breaker_reset_seconds=0)
+        with self.assertLogs('analyzer.http_client', 'WARNING'):
+            client.breaker.record_failure()
+        with self.assertRaises(Exception):
+            client.post('not a url')
+        self.assertTrue(client.breaker.allow())
+
+
+class RetryDeadlineTests(SimpleTestCase):
+    def test_retries_stop_at_the_deadline(self):
+        client = RetryingClient(max_retries=5, backoff_seconds=0.2, backoff_max=0.2, breaker_failures=100)
+        unavailable = mock.Mock(status_code=503, headers={'Retry-After': '0.2'})
+        started = time.monotonic()
+        with mock.patch.object(client.session, 'post', return_value=unavailable) as post:
+            with self.assertRaises(requests.HTTPError):
+                client.post('http://upstream.invalid', deadline=0.5)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertLessEqual(post.call_count, 3)  # at 0, 0.2 and 0.4 s at most; not the six retries allow
+        self.assertLessEqual(post.call_args.kwargs['timeout'], 0.5)
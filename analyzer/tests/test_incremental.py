@@ -0,0 +1,53 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from .. import incremental, result_cache, text_classification
+from ..benchmark import stubbed_services
+from ..models import StageResult
+from . import RESUME
+
+
+class StageMemoTests(TransactionTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as f:
+            f.write(RESUME)
+        self.addCleanup(os.remove, self.path)
+
+    def _analyze(self, job_description):
+        with stubbed_services():
+            return text_classification.analyze_resume_result(self.path, job_description)
+
+    def test_a_new_job_description_reuses_the_resume_side_stages(self):
+        self._analyze("Python developer")
+        result = self._analyze("Django developer")
+        self.assertEqual(sorted(result['reused_stages']), ['extract', 'grammar'])
+
+    def test_chunking_settings_are_part_of_the_keyword_match_key(self):
+        self._analyze("Python developer")
+        result_cache.clear()
+        self.assertIn('keyword_match', self._analyze("Python developer")['reused_stages'])
+        result_cache.clear()
+        with override_settings(EMBED_TOP_CHUNKS=1):
+            self.assertNotIn('keyword_match', self._analyze("Python developer")['reused_stages'])
+
+    def test_fallback_feedback_is_not_memoized(self):
+        memo = incremental.Memo(prompt='prompt')
+        memo.store({'feedback': "Gemini request failed: 503\n\nFallback:\n..."})
+        memo.store({'feedback': "Gemini library not installed. Fallback:\n\n..."})
+        self.assertFalse(StageResult.objects.exists())
+
+    @override_settings(ANALYSIS_STAGE_MEMO_MAX_ENTRIES=10)
+    def test_eviction_stays_under_sqlite_parameter_limit(self):
+        StageResult.objects.bulk_create(StageResult(key=f'k{i}', stage='grammar', value={}) for i in range(1200))
+        connection.ensure_connection()
+        previous = connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        try:
+            incremental._evict()
+        finally:
+            connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, previous)
+        self.assertEqual(StageResult.objects.count(), 10)
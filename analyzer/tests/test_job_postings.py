@@ -0,0 +1,63 @@
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .. import document, prompts
+from ..benchmark import FakeEmbedModel
+from ..models import JobPosting
+from . import RESUME
+
+
+@mock.patch('analyzer.model_registry.get_embed_model', FakeEmbedModel)
+class JobPostingTests(TestCase):
+    description = "Senior Python engineer. Django, PostgreSQL, Kubernetes.\nWe are an equal opportunity employer."
+
+    def test_features_are_computed_on_save(self):
+        posting = JobPosting.objects.create(title='Backend', description=self.description)
+        self.assertIn('kubernetes', posting.keywords)
+        self.assertEqual(posting.summary, prompts.summarize_job(self.description))
+        self.assertTrue(posting.embedding)
+
+    def test_prompt_matches_the_pasted_description(self):
+        posting = JobPosting.objects.create(title='Backend', description=self.description)
+        analysis = {'word_count': 10}
+        self.assertEqual(prompts.feedback_prompt(RESUME, analysis, self.description).text,
+                         prompts.feedback_prompt(RESUME, analysis, self.description, job_summary=posting.summary).text)
+
+    def test_ranking_against_a_posting_does_not_process_the_job_again(self):
+        from ..batch import rank_resumes
+
+        posting = JobPosting.objects.create(title='Backend', description=self.description)
+        model = FakeEmbedModel()
+        with mock.patch('analyzer.model_registry.get_embed_model', lambda: model), \
+                mock.patch.object(model, 'encode', wraps=model.encode) as encode, \
+                mock.patch('analyzer.text_features.job_keywords', side_effect=AssertionError):
+            ranked = rank_resumes('', [(1, document.parse(RESUME))], job_posting=posting)
+        encoded = [text for call in encode.call_args_list for text in call.args[0]]
+        self.assertNotIn(self.description, encoded)
+        self.assertGreater(ranked['results'][0]['keyword_coverage_percent'], 0)
+
+    def test_async_upload_with_a_posting(self):
+        from ..views import upload_resume_async_view
+
+        posting = JobPosting.objects.create(title='Backend', description=self.description)
+        request = RequestFactory().post(reverse('upload_resume_async'), {
+            'resume_file': SimpleUploadedFile('cv.txt', RESUME.encode(), 'text/plain'),
+            'job_posting': str(posting.pk),
+        })
+        request._dont_enforce_csrf_checks = True
+
+        async def auser():
+            return AnonymousUser()
+        request.auser = auser
+        analyze = mock.AsyncMock(return_value={'feedback': 'ok', 'analysis': {}})
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch('analyzer.text_classification.analyze_resume_result_async', analyze):
+            response = async_to_sync(upload_resume_async_view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(analyze.call_args.kwargs['job_posting'], posting)
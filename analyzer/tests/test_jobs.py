@@ -0,0 +1,63 @@
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import jobs
+from ..models import AnalysisJob, ResumeSubmission
+
+
+class AnalysisQueueTests(TestCase):
+    def setUp(self):
+        self.submission = ResumeSubmission.objects.create(target_role='Engineer')
+
+    def test_a_job_is_claimed_once(self):
+        job = AnalysisJob.objects.create(submission=self.submission)
+        claimed = jobs.claim_job(job.pk, 'worker-1')
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker_id), ('running', 1, 'worker-1'))
+        self.assertIsNone(jobs.claim_job(job.pk, 'worker-2'))
+
+    def test_claim_next_takes_the_oldest_pending_job(self):
+        first = AnalysisJob.objects.create(submission=self.submission)
+        AnalysisJob.objects.create(submission=self.submission)
+        self.assertEqual(jobs.claim_next_job('w').pk, first.pk)
+
+    @override_settings(ANALYSIS_JOB_LEASE_SECONDS=60, ANALYSIS_JOB_MAX_ATTEMPTS=2)
+    def test_requeue_stale_jobs(self):
+        long_ago = timezone.now() - timedelta(seconds=120)
+        retry = AnalysisJob.objects.create(submission=self.submission, status='running', attempts=1,
+                                           started_at=long_ago)
+        exhausted = AnalysisJob.objects.create(submission=self.submission, status='running', attempts=2,
+                                               started_at=long_ago)
+        fresh = AnalysisJob.objects.create(submission=self.submission, status='running', attempts=1,
+                                           started_at=timezone.now())
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        statuses = dict(AnalysisJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {retry.pk: 'pending', exhausted.pk: 'failed', fresh.pk: 'running'})
+
+
+class PruneResumeFilesTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+
+    def _submission(self, age_days, status=AnalysisJob.STATUS_DONE):
+        submission = ResumeSubmission.objects.create(resume_file=SimpleUploadedFile('cv.txt', b'resume'))
+        ResumeSubmission.objects.filter(pk=submission.pk).update(
+            created_at=timezone.now() - timedelta(days=age_days))
+        AnalysisJob.objects.create(submission=submission, status=status)
+        return submission
+
+    @override_settings(RESUME_FILE_RETENTION_DAYS=30)
+    def test_deletes_only_expired_finished_uploads(self):
+        expired = self._submission(40)
+        queued = self._submission(40, status=AnalysisJob.STATUS_PENDING)
+        recent = self._submission(1)
+        path = expired.resume_file.path
+        self.assertEqual(jobs.prune_resume_files(), 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ResumeSubmission.objects.get(pk=expired.pk).resume_file)
+        for kept in (queued, recent):
+            self.assertTrue(os.path.exists(kept.resume_file.path))
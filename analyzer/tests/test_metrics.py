@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import metrics
+
+
+class MetricsViewTests(TestCase):
+    def _status(self, **headers):
+        return self.client.get(reverse('metrics'), **headers).status_code
+
+    def test_hidden_from_loopback_by_default(self):
+        self.assertEqual(self._status(REMOTE_ADDR='127.0.0.1'), 404)
+
+    @override_settings(METRICS_BEARER_TOKEN='s3cret')
+    def test_bearer_token(self):
+        self.assertEqual(self._status(HTTP_AUTHORIZATION='Bearer s3cret'), 200)
+        self.assertEqual(self._status(HTTP_AUTHORIZATION='Bearer wrong'), 404)
+
+    def test_staff(self):
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        self.assertEqual(self._status(), 200)
+
+
+class CombinedMetricsTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_DIR=self.directory))
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _snapshot(self, pid, **counts):
+        snapshot = {'counters': [['resume_analysis_cache_lookups_total', [['outcome', outcome]], value]
+                                 for outcome, value in counts.items()]}
+        path = os.path.join(self.directory, f'metrics_{pid}.json')
+        with open(path, 'w') as f:
+            json.dump(snapshot, f)
+        return path
+
+    def test_hit_ratio_covers_every_live_process(self):
+        self._snapshot(os.getppid(), hits=3)
+        metrics.inc('resume_analysis_cache_lookups_total', outcome='misses')
+        text = metrics.render()
+        self.assertIn('resume_analysis_cache_lookups_total{outcome="hits"} 3', text)
+        self.assertIn('resume_analysis_cache_hit_ratio 0.75', text)
+
+    def test_snapshots_of_exited_processes_are_dropped(self):
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        path = self._snapshot(exited.pid, hits=3)
+        self.assertNotIn('outcome="hits"', metrics.render())
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import pdf_extraction
+
+# Pages 2 and 4 are scans with no text layer
+PAGES = ['one', '', 'three', '', 'five', 'six']
+
+
+def _page_range(file_path, start, stop):
+    return PAGES[start:stop]
+
+
+def _ocr(file_path, page_index, dpi, poppler_path, tesseract_cmd):
+    return f'ocr {page_index + 1} at {dpi}'
+
+
+class ExtractPdfTextTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(pdf_extraction, '_page_count', return_value=len(PAGES)))
+        self.ranges = self.enterContext(mock.patch.object(pdf_extraction, 'extract_page_range',
+                                                          side_effect=_page_range))
+        self.ocr = self.enterContext(mock.patch.object(pdf_extraction, 'ocr_page', side_effect=_ocr))
+        self.executor = self.enterContext(ThreadPoolExecutor(max_workers=3))
+
+    def test_pages_are_split_across_workers_and_only_scans_are_ocrd(self):
+        submit = self.enterContext(mock.patch.object(self.executor, 'submit', wraps=self.executor.submit))
+        timings = {}
+        text = pdf_extraction.extract_pdf_text('cv.pdf', quality='fast', executor=self.executor, workers=3,
+                                               timings=timings)
+        self.assertEqual(text.splitlines(), ['one', 'ocr 2 at 150', 'three', 'ocr 4 at 150', 'five', 'six'])
+        self.assertEqual([c.args[1:] for c in self.ranges.call_args_list], [(0, 2), (2, 4), (4, 6)])
+        self.assertEqual([c.args[1] for c in self.ocr.call_args_list], [1, 3])
+        self.assertEqual(submit.call_count, 5)  # three text-layer chunks, two OCR pages
+        self.assertEqual(set(timings), {'text_layer', 'ocr'})
+
+    def test_short_documents_stay_in_process(self):
+        submit = self.enterContext(mock.patch.object(self.executor, 'submit'))
+        text = pdf_extraction.extract_pdf_text('cv.pdf', executor=self.executor, workers=3,
+                                               min_parallel_pages=10)
+        submit.assert_not_called()
+        self.ranges.assert_called_once_with('cv.pdf', 0, len(PAGES))
+        self.assertIn('ocr 2 at 300', text)
+
+    def test_ocr_can_be_disabled(self):
+        text = pdf_extraction.extract_pdf_text('cv.pdf', ocr=False)
+        self.ocr.assert_not_called()
+        self.assertEqual(text.splitlines(), ['one', 'three', 'five', 'six'])
@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase, override_settings
+
+from .. import prompts
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def test_sections_are_cut_to_their_budget(self):
+        resume = ' '.join(f'skill{i}' for i in range(2000))
+        job = ' '.join(f'requirement{i}' for i in range(2000))
+        prompt = prompts.feedback_prompt(resume, {'word_count': 2000}, job_text=job)
+        limits = prompts.DEFAULT_BUDGETS
+        self.assertLessEqual(prompt.section_tokens['resume'], limits['resume'] + 1)
+        self.assertLessEqual(prompt.section_tokens['job_description'], limits['job_description'] + 1)
+        self.assertEqual(prompt.tokens, prompts.estimate_tokens(prompt.text))
+        self.assertLess(prompt.tokens, sum(limits.values()) + 100)
+        self.assertIn('Also comment briefly on job match.', prompt.text)
+
+    @override_settings(PROMPT_TOKEN_BUDGETS={'resume': 10})
+    def test_settings_override_budgets(self):
+        prompt = prompts.structured_prompt('word ' * 500, 'Engineer')
+        self.assertLessEqual(prompt.section_tokens['resume'], 11)
+        self.assertEqual(prompt.section_tokens['target_role'], prompts.estimate_tokens('Engineer'))
+
+    def test_boilerplate_and_repeated_headers_are_dropped(self):
+        text = "Jane Doe\nPage 1 of 2\nPython   developer\nJane Doe\n3\nReferences available upon request."
+        self.assertEqual(prompts.clean(text), "Jane Doe\nPython developer")
+
+    def test_prepared_job_summary_is_sent_as_is_and_empty_sections_are_left_out(self):
+        prompt = prompts.feedback_prompt('Python developer', {}, job_summary='Backend role')
+        self.assertIn('JOB DESCRIPTION:\nBackend role', prompt.text)
+        self.assertNotIn('ANALYSIS', prompt.text)
+
+    def test_truncation_stops_at_a_word_boundary(self):
+        self.assertEqual(prompts.truncate_to_tokens('alpha beta gamma', 4), 'alpha beta …')
+        self.assertEqual(prompts.truncate_to_tokens('alpha', 0), '')
@@ -0,0 +1,44 @@
+import sqlite3
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import result_cache
+from ..models import AnalysisCacheEntry
+
+
+class ResultCacheTests(TestCase):
+    def test_key_ignores_case_and_whitespace_of_job_and_role(self):
+        key = result_cache.make_key('abc', 'Python  developer\n', 'Backend')
+        self.assertEqual(key, result_cache.make_key('abc', ' python developer', ' backend '))
+        self.assertNotEqual(key, result_cache.make_key('abc', 'python developer', 'frontend'))
+        self.assertNotEqual(key, result_cache.make_key('abd', 'python developer', 'backend'))
+
+    @override_settings(ANALYSIS_CACHE_MAX_ENTRIES=2)
+    def test_evicts_least_recently_used(self):
+        result_cache.store('a', {'feedback': 'a'})
+        result_cache.store('b', {'feedback': 'b'})
+        self.assertEqual(result_cache.lookup('a'), {'feedback': 'a'})
+        result_cache.store('c', {'feedback': 'c'})
+        self.assertEqual(set(AnalysisCacheEntry.objects.values_list('key', flat=True)), {'a', 'c'})
+
+    @override_settings(ANALYSIS_CACHE_TTL_SECONDS=60)
+    def test_expired_entries_are_not_served(self):
+        result_cache.store('old', {'feedback': 'x'})
+        AnalysisCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        self.assertIsNone(result_cache.lookup('old'))
+        self.assertFalse(AnalysisCacheEntry.objects.exists())
+
+    @override_settings(ANALYSIS_CACHE_MAX_ENTRIES=10)
+    def test_eviction_stays_under_sqlite_parameter_limit(self):
+        AnalysisCacheEntry.objects.bulk_create(
+            AnalysisCacheEntry(key=f'k{i}', result={}, size=2) for i in range(1200))
+        connection.ensure_connection()
+        previous = connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        try:
+            self.assertEqual(result_cache.evict(), 1190)
+        finally:
+            connection.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, previous)
+        self.assertEqual(AnalysisCacheEntry.objects.count(), 10)
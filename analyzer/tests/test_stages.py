@@ -0,0 +1,57 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from ..stages import INLINE, THREAD, Stage, run_stages, stage_timeout
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+class StageTimeoutTests(SimpleTestCase):
+    @override_settings(ANALYSIS_STAGE_TIMEOUTS={'grammar': 5})
+    def test_defaults_fill_in_missing_stages(self):
+        self.assertEqual(stage_timeout('grammar'), 5)
+        self.assertEqual(stage_timeout('structured'), 25.0)
+
+
+class RunStagesTests(SimpleTestCase):
+    def test_thread_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        started = time.perf_counter()
+        results, _ = run_stages([
+            Stage('a', lambda: barrier.wait() >= 0, kind=THREAD, timeout=5),
+            Stage('b', lambda: barrier.wait() >= 0, kind=THREAD, timeout=5),
+        ])
+        # Each stage waits for the other, so this only finishes if they overlap.
+        self.assertEqual(results, {'a': True, 'b': True})
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_slow_and_failing_stages_fall_back(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        started = time.perf_counter()
+        results, seconds = run_stages([
+            Stage('slow', release.wait, 10, kind=THREAD, timeout=0.2, default={'score': 0}),
+            Stage('broken', _fail, kind=THREAD, default=list),
+            Stage('cheap', len, 'abc', kind=INLINE),
+        ])
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertEqual(results['slow'], {'score': 0, 'error': 'timed out after 0.2s'})
+        self.assertEqual(results['broken'], [])
+        self.assertEqual(results['cheap'], 3)
+        self.assertEqual(set(seconds), {'slow', 'broken', 'cheap'})
+
+    def test_timeout_counts_from_submission(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        started = time.perf_counter()
+        results, _ = run_stages([
+            Stage('first', release.wait, 10, kind=THREAD, timeout=0.3, default='late'),
+            Stage('second', release.wait, 10, kind=THREAD, timeout=0.3, default='late'),
+        ])
+        self.assertEqual(results, {'first': 'late', 'second': 'late'})
+        # Both deadlines run from submission, not one after the other.
+        self.assertLess(time.perf_counter() - started, 0.55)
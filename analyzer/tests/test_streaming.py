@@ -0,0 +1,62 @@
+import json
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..benchmark import stubbed_services
+from ..models import ResumeSubmission
+from . import RESUME
+
+
+def _events(response):
+    body = b''.join(response.streaming_content).decode()
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class StreamingSwitchTests(TestCase):
+    def test_off_by_default(self):
+        self.assertNotContains(self.client.get(reverse('upload_resume')), 'data-stream-url')
+        self.assertEqual(self.client.post(reverse('upload_resume_stream')).status_code, 404)
+
+    @override_settings(ANALYSIS_STREAMING_ENABLED=True)
+    def test_page_streams_when_enabled(self):
+        self.assertContains(self.client.get(reverse('upload_resume')),
+                            f'data-stream-url="{reverse("upload_resume_stream")}"')
+
+
+@override_settings(ANALYSIS_STREAMING_ENABLED=True)
+class StreamedAnalysisTests(TransactionTestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.enterContext(stubbed_services())
+
+    def _stream(self):
+        response = self.client.post(reverse('upload_resume_stream'), {
+            'resume_file': SimpleUploadedFile('cv.txt', RESUME.encode(), 'text/plain'),
+            'job_description': 'Python developer',
+        })
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return _events(response)
+
+    def test_events_arrive_in_order_and_the_result_is_stored(self):
+        events = self._stream()
+        names = [name for name, _ in events]
+        self.assertEqual((names[0], names[1], names[-1]), ('submission', 'analysis', 'done'))
+        self.assertIn('feedback', names)
+        self.assertLess(names.index('analysis'), names.index('feedback'))
+        feedback = ''.join(data['text'] for name, data in events if name == 'feedback')
+        submission = ResumeSubmission.objects.get(pk=events[0][1]['submission_id'])
+        self.assertEqual(submission.feedback, feedback)
+        self.assertFalse(events[-1][1]['cached'])
+
+    def test_a_repeat_is_served_from_the_cache(self):
+        self._stream()
+        events = self._stream()
+        self.assertEqual([name for name, _ in events], ['submission', 'analysis', 'feedback', 'done'])
+        self.assertTrue(events[-1][1]['cached'])
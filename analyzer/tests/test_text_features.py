@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+
+from .. import document, text_features
+from . import RESUME
+
+
+class PhraseMatcherTests(SimpleTestCase):
+    def test_multi_token_and_overlapping_phrases(self):
+        matcher = text_features.PhraseMatcher([('ml', 'machine learning'), ('learn', 'learning'), ('ci', 'ci-cd')])
+        tokens = text_features.tokenize("Machine learning and CI-CD pipelines")
+        self.assertEqual(sorted(matcher.scan(tokens)), ['ci', 'learn', 'ml'])
+
+    def test_keywords_match_whole_tokens_only(self):
+        features = text_features.extract("JavaScript developer with capital markets experience",
+                                         keywords=['java', 'api', 'javascript'])
+        self.assertEqual(features.matched_keywords, ['javascript'])
+        self.assertAlmostEqual(features.keyword_coverage_percent, 100 / 3)
+
+    def test_extract_counts_verbs_sections_and_job_keywords(self):
+        features = text_features.extract(document.parse(RESUME), "Python and Django developer, Kubernetes")
+        self.assertEqual(features.action_verbs, 4)  # built, optimized, led, reduced
+        self.assertNotIn('skills', features.missing_sections)
+        self.assertIn('Projects', features.missing_sections)
+        self.assertEqual(features.matched_keywords, ['and', 'django', 'python'])
+        self.assertEqual(features.job_keyword_count, 5)  # python, and, django, developer, kubernetes
+        self.assertEqual(features.keyword_coverage_percent, 60.0)
+
+    def test_phone_prefix_inside_a_number(self):
+        for contact in ("+919876543210", "+91 98765 43210", "Phone: +91-98765-43210"):
+            self.assertNotIn('+91', text_features.extract(f"Jane Doe\n{contact}\nSUMMARY").missing_sections)
+        self.assertIn('+91', text_features.extract("Jane Doe\n9876543210").missing_sections)
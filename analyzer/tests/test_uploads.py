@@ -0,0 +1,39 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.test import SimpleTestCase
+
+from ..forms import ResumeUploadForm
+from ..uploads import ResumeUploadHandler
+
+
+class ResumeUploadHandlerTests(SimpleTestCase):
+    def _upload(self, name, chunks, max_bytes=1024):
+        handler = ResumeUploadHandler(max_bytes=max_bytes)
+        handler.new_file('resume_file', name, 'application/octet-stream', None)
+        start = 0
+        for chunk in chunks:
+            handler.receive_data_chunk(chunk, start)
+            start += len(chunk)
+        return handler, handler.file_complete(start)
+
+    def test_accepts_and_hashes_matching_content(self):
+        _, uploaded = self._upload('cv.pdf', [b'%PDF-1.7 ', b'rest'])
+        self.addCleanup(uploaded.close)
+        self.assertEqual(len(uploaded.sha256), 64)
+
+    def test_rejects_content_that_does_not_match_the_extension(self):
+        with self.assertRaises(StopUpload):
+            self._upload('cv.pdf', [b'PK\x03\x04 not a pdf'])
+
+    def test_rejects_oversized_uploads_while_streaming(self):
+        handler = ResumeUploadHandler(max_bytes=10)
+        handler.new_file('resume_file', 'cv.txt', 'text/plain', None)
+        handler.receive_data_chunk(b'12345678', 0)
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(b'12345678', 8)
+        self.assertIn('limit', handler.error)
+
+    def test_rejects_legacy_doc_files(self):
+        with self.assertRaises(StopUpload):
+            self._upload('cv.doc', [b'\xd0\xcf\x11\xe0 word 97'])
+        self.assertFalse(ResumeUploadForm(files={'resume_file': SimpleUploadedFile('cv.doc', b'x')}).is_valid())
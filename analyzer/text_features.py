@@ -0,0 +1,160 @@
+"""Single-pass lexical features: action verbs, section headings and job keywords.
+
+The resume is tokenized once, by document.parse; every phrase we look for
+(action verbs, required sections, the job description's keywords) is
+compiled into one Aho–Corasick automaton over tokens, so a single scan of
+the token list finds all of them, multi-token phrases (``ci-cd``,
+``machine learning``) included. Automata are cached per keyword set, so
+ranking many resumes against one job description compiles it once.
+
+Matching is on whole tokens: ``java`` no longer matches inside
+``javascript`` and ``api`` no longer matches inside ``capital``.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import document
+
+ACTION_VERBS = {
+    "achieved","improved","managed","led","created","designed","implemented","reduced","increased",
+    "developed","engineered","launched","optimized","automated","orchestrated","resolved","boosted",
+    "coordinated","spearheaded","delivered","built","founded","mentored","trained","negotiated"
+}
+REQUIRED_SECTIONS = ["+91","summary", "skills", "experience", "Projects", "education", "LinkedIn"]
+# Entries that are not words (a phone prefix) are found as a prefix of a
+# token, since ``+919876543210`` tokenizes as one token.
+_PREFIX_SECTIONS = {s: re.compile(r'(?<![a-z0-9+#])' + re.escape(s.lower()))
+                    for s in REQUIRED_SECTIONS if not s[0].isalnum()}
+
+_JOB_KEYWORD = re.compile(r'\b[A-Za-z0-9\+\#\-\_]+\b')
+
+VERB, SECTION, KEYWORD = 'verb', 'section', 'keyword'
+
+
+tokenize = document.tokenize
+
+
+class PhraseMatcher:
+    """Aho–Corasick automaton over token sequences.
+
+    Built from ``(label, phrase)`` pairs; ``scan(tokens)`` yields the label of
+    every phrase occurrence, overlapping ones included.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[Hashable, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Hashable, ...]] = [()]
+        for label, phrase in phrases:
+            state = 0
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][token] = nxt
+                state = nxt
+            self._out[state] += (label,)
+        self._link()
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def scan(self, tokens: Sequence[str]) -> Iterator[Hashable]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                yield from out[state]
+
+
+def job_keywords(job_text: Optional[str]) -> List[str]:
+    return list({w.lower() for w in _JOB_KEYWORD.findall(job_text or "") if len(w) > 2})
+
+
+@lru_cache(maxsize=128)
+def _compile(keywords: Tuple[str, ...]) -> PhraseMatcher:
+    phrases = [((VERB, verb), verb) for verb in ACTION_VERBS]
+    phrases += [((SECTION, section), section) for section in REQUIRED_SECTIONS if section not in _PREFIX_SECTIONS]
+    phrases += [((KEYWORD, keyword), keyword) for keyword in keywords]
+    return PhraseMatcher(phrases)
+
+
+@lru_cache(maxsize=128)
+def _job_keywords_cached(job_text: str) -> Tuple[str, ...]:
+    return tuple(sorted(job_keywords(job_text)))
+
+
+@dataclass
+class TextFeatures:
+    word_count: int
+    action_verbs: int
+    missing_sections: List[str]
+    job_keyword_count: int = 0
+    matched_keywords: List[str] = field(default_factory=list)
+
+    @property
+    def keyword_coverage_percent(self) -> float:
+        if not self.job_keyword_count:
+            return 0.0
+        return len(self.matched_keywords) / self.job_keyword_count * 100
+
+    def analysis(self) -> dict:
+        """The lexical fields of text_classification's analysis dict."""
+        return {
+            "word_count": self.word_count,
+            "action_verbs": self.action_verbs,
+            "missing_sections": self.missing_sections,
+        }
+
+
+def extract(text: str, job_text: Optional[str] = None, keywords: Optional[Sequence[str]] = None) -> TextFeatures:
+    """All lexical metrics of ``text`` (a ParsedDocument, or a string to parse) in one scan.
+
+    Job keywords come from ``job_text`` or, if given, ``keywords`` (as
+    returned by ``job_keywords``).
+    """
+    if keywords is None:
+        keywords = _job_keywords_cached(job_text or '')
+    else:
+        keywords = tuple(sorted(set(keywords)))
+    doc = document.of(text)
+    verbs = 0
+    sections, matched = set(), set()
+    for kind, label in _compile(keywords).scan(doc.tokens):
+        if kind == VERB:
+            verbs += 1
+        elif kind == SECTION:
+            sections.add(label)
+        else:
+            matched.add(label)
+    sections.update(s for s, pattern in _PREFIX_SECTIONS.items() if pattern.search(doc.lowered))
+    return TextFeatures(
+        word_count=doc.word_count,
+        action_verbs=verbs,
+        missing_sections=[s for s in REQUIRED_SECTIONS if s not in sections],
+        job_keyword_count=len(keywords),
+        matched_keywords=sorted(matched),
+    )
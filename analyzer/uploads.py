@@ -0,0 +1,89 @@
+"""Upload handling for resume files.
+
+``ResumeUploadHandler`` streams every upload straight to a temporary file
+(never buffering it in memory) and, chunk by chunk as it arrives:
+
+- hashes it, so the result cache can be consulted without re-reading it;
+- rejects extensions text_classification.extract_text cannot read, and
+  checks the first bytes against the file extension;
+- enforces ``RESUME_UPLOAD_MAX_BYTES``.
+
+A rejected upload stops being written immediately and its temporary file is
+deleted. Because the result is a temporary file, ``FileSystemStorage`` moves it
+into place on save instead of copying it.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+# Extensions extract_text can read; legacy .doc is not one of them.
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+UNSUPPORTED_MESSAGE = "Unsupported file type. Use PDF, DOCX or TXT."
+
+# Leading bytes expected for each accepted extension.
+MAGIC_BYTES = {
+    '.pdf': (b'%PDF',),
+    '.docx': (b'PK\x03\x04',),
+}
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, 'RESUME_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def too_large_message(limit: int) -> str:
+    return f"File is larger than the {filesizeformat(limit)} limit."
+
+
+def supported_extension(file_name: str) -> bool:
+    return os.path.splitext(file_name or '')[1].lower() in SUPPORTED_EXTENSIONS
+
+
+def content_matches_extension(file_name: str, head: bytes) -> bool:
+    ext = os.path.splitext(file_name or '')[1].lower()
+    if ext == '.txt':
+        return b'\x00' not in head
+    magic = MAGIC_BYTES.get(ext)
+    if magic is None:
+        return True  # unknown extensions are left to form validation
+    return head.startswith(magic)
+
+
+class ResumeUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or max_upload_bytes()
+        self.error = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._digest = hashlib.sha256()
+        self._received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._received == 0 and not supported_extension(self.file_name):
+            self._reject(UNSUPPORTED_MESSAGE)
+        if self._received == 0 and not content_matches_extension(self.file_name, raw_data[:1024]):
+            self._reject("File contents do not match its extension.")
+        self._received += len(raw_data)
+        if self._received > self.max_bytes:
+            self._reject(too_large_message(self.max_bytes))
+        self._digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self._digest.hexdigest()
+        return uploaded
+
+    def _reject(self, message):
+        self.error = message
+        self.file.close()  # NamedTemporaryFile: closing deletes it
+        # Keep reading (and discarding) the body so the client gets our response;
+        # the view already refused bodies whose Content-Length is over the limit.
+        raise StopUpload(connection_reset=False)
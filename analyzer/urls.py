@@ -11,8 +11,16 @@ urlpatterns = [
     # Resume analysis routes
     path('analyze/', views.analyze_view, name='analyze'),
     path('upload_resume/', views.upload_resume_view, name='upload_resume'),
+    path('upload_resume/stream/', views.upload_resume_stream_view, name='upload_resume_stream'),
+    path('analyze_async/', views.upload_resume_async_view, name='upload_resume_async'),
+    path('jobs/<int:job_id>/', views.analysis_job_status_view, name='analysis_job_status'),
+    path('batch_rank/', views.batch_rank_view, name='batch_rank'),
+    path('batch_rank/<int:job_id>/', views.batch_rank_status_view, name='batch_rank_status'),
+    path('search_resumes/', views.search_resumes_view, name='search_resumes'),
     path('history/', views.history_view, name='history'),
+    path('history/<int:submission_id>/', views.submission_result_view, name='submission_result'),
     path('profile/', views.profile_view, name='profile'),
+    path('metrics', views.metrics_view, name='metrics'),
     
     # OAuth routes
     path('auth/google/login/', views.google_login, name='google_login'),
@@ -1,19 +1,26 @@
-from django.shortcuts import render, redirect, HttpResponse
-from django.http import JsonResponse
+from django.shortcuts import render, redirect, HttpResponse, get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse
 from django.conf import settings
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport.requests import Request as GoogleRequest
-from django.core.files.storage import default_storage
+from django.http import Http404
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.db.models import Q
+from asgiref.sync import sync_to_async
+from datetime import datetime, timedelta, timezone as dt_timezone
+import hmac
+import json
 import logging
+import os
 
-from .forms import LoginForm, SignupForm, ResumeSubmissionForm, ResumeUploadForm
-from .models import ResumeSubmission
-from .text_classification import analyze_resume  # ML model function
+from . import metrics
+from .forms import LoginForm, SignupForm, ResumeSubmissionForm, ResumeUploadForm, BatchRankForm, ResumeSearchForm
+from .jobs import enqueue_analysis, enqueue_batch_rank
+from .models import AnalysisJob, BatchRankJob, ResumeSubmission
+from .uploads import ResumeUploadHandler, max_upload_bytes, too_large_message
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -34,7 +41,7 @@ def dashboard_view(request):
 
 @login_required
 def analyze_view(request):
-    """Store resume submissions without calling ML API directly"""
+    """Store resume submissions and queue them for analysis"""
     result = None
     if request.method == 'POST':
         form = ResumeSubmissionForm(request.POST, request.FILES)
@@ -43,19 +50,79 @@ def analyze_view(request):
             if request.user.is_authenticated:
                 submission.user = request.user
             submission.save()
+            if submission.resume_file:
+                # Results are written back to the submission and shown in history.
+                enqueue_analysis(submission)
 
             result = {'message': 'Resume submitted successfully.'}
         else:
-            return render(request, 'analyzer.html', {'form': form})
+            return _render_analyzer(request, {'form': form})
     else:
         form = ResumeSubmissionForm()
 
-    return render(request, 'analyzer.html', {'form': form, 'result': result})
+    return _render_analyzer(request, {'form': form, 'result': result})
+
+
+HISTORY_FIELDS = ('id', 'created_at', 'resume_file', 'target_role', 'score', 'skills', 'recommendations',
+                  'analyzed_at')
+
+
+def _history_cursor(submission):
+    return f"{int(submission.created_at.timestamp() * 1_000_000)}-{submission.id}"
+
+
+def _parse_history_cursor(cursor):
+    try:
+        micros, pk = (int(part) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return datetime(1970, 1, 1, tzinfo=dt_timezone.utc) + timedelta(microseconds=micros), pk
 
 
 @login_required
 def history_view(request):
-    return render(request, 'history.html')
+    """The user's analyzed submissions, newest first, read straight from the database.
+
+    Pages are keyset-paginated on (created_at, id) via ``?before=<cursor>``,
+    which stays an index range scan however deep the user pages.
+    """
+    page_size = getattr(settings, 'HISTORY_PAGE_SIZE', 20)
+    submissions = (ResumeSubmission.objects
+                   .filter(user=request.user)
+                   .only(*HISTORY_FIELDS)
+                   .order_by('-created_at', '-id'))
+    cursor = _parse_history_cursor(request.GET.get('before'))
+    if cursor is not None:
+        created_at, pk = cursor
+        submissions = submissions.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    page = list(submissions[:page_size + 1])
+    next_cursor = _history_cursor(page[page_size - 1]) if len(page) > page_size else None
+    history_items = [
+        {
+            'filename': os.path.basename(submission.resume_file.name) if submission.resume_file else submission.target_role,
+            'date': submission.created_at,
+            'score': submission.score if submission.analyzed_at else 'Pending',
+            'skills': submission.skills or [],
+            'recommendations': submission.recommendations or [],
+            'download_url': submission.resume_file.url if submission.resume_file else '',
+            'analysis_url': reverse('submission_result', args=[submission.id]),
+        }
+        for submission in page[:page_size]
+    ]
+    return render(request, 'history.html', {'history_items': history_items, 'next_cursor': next_cursor})
+
+
+@login_required
+def submission_result_view(request, submission_id):
+    """The stored analysis of one of the user's submissions; never re-runs it."""
+    submission = get_object_or_404(ResumeSubmission, pk=submission_id, user=request.user)
+    return JsonResponse({
+        'submission_id': submission.id,
+        'analyzed_at': submission.analyzed_at,
+        **_result_payload(submission),
+        'metrics': submission.metrics,
+        'timings': submission.timings,
+    })
 
 
 @login_required
@@ -116,6 +183,9 @@ def signup_view(request):
 
 
 def google_login(request):
+    # google-auth and oauthlib take ~0.2s to import; only the login flow needs them.
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_secrets_file(
         client_secrets_file=settings.GOOGLE_CLIENT_SECRET_FILE,
         scopes=settings.GOOGLE_OAUTH_SCOPES,
@@ -133,6 +203,10 @@ def google_callback(request):
         request.session.pop('oauth_state', None)
         return HttpResponse("Invalid state token.", status=400)
 
+    from google.auth.transport.requests import Request as GoogleRequest
+    from google.oauth2 import id_token
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_secrets_file(
         client_secrets_file=settings.GOOGLE_CLIENT_SECRET_FILE,
         scopes=settings.GOOGLE_OAUTH_SCOPES,
@@ -161,31 +235,351 @@ def google_callback(request):
     return redirect('dashboard')
 
 
+def _result_payload(submission):
+    return {
+        'feedback': submission.feedback,
+        'score': submission.score,
+        'skills': submission.skills or [],
+        'recommendations': submission.recommendations or [],
+    }
+
+
+def _job_payload(job):
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('analysis_job_status', args=[job.id]),
+    }
+    if job.status == AnalysisJob.STATUS_DONE:
+        payload.update(_result_payload(job.submission))
+        payload['feedback'] = (job.result or {}).get('feedback')
+    elif job.status == AnalysisJob.STATUS_FAILED:
+        payload['error'] = job.error or 'Analysis failed.'
+    return payload
+
+
+def _create_submission(request, form):
+    uploaded_file = form.cleaned_data['resume_file']
+    try:
+        return ResumeSubmission.objects.create(
+            user=request.user if request.user.is_authenticated else None,
+            resume_file=uploaded_file,
+            resume_sha256=getattr(uploaded_file, 'sha256', ''),
+            job_description=form.cleaned_data.get('job_description') or '',
+            job_posting=form.cleaned_data.get('job_posting'),
+            target_role=form.cleaned_data.get('target_role') or '',
+        )
+    finally:
+        # The temp file has normally been moved into storage already;
+        # this removes it if saving failed part way.
+        uploaded_file.close()
+
+
+@csrf_exempt
 def upload_resume_view(request):
-    feedback = None
+    """Queue an uploaded resume for analysis; the result is fetched from
+    analysis_job_status_view once a worker has processed it.
+
+    The upload handler has to be swapped before anything reads request.POST,
+    which CsrfViewMiddleware would do; hence csrf_exempt here and csrf_protect
+    on the inner view.
+    """
+    handler = None
     if request.method == 'POST':
-        form = ResumeUploadForm(request.POST, request.FILES)
-        if form.is_valid():
-            uploaded_file = form.cleaned_data.get('resume_file')
-            job_desc = form.cleaned_data.get('job_description', '')
+        # Refuse oversized bodies before reading any of them.
+        limit = max_upload_bytes()
+        if int(request.META.get('CONTENT_LENGTH') or 0) > limit + 64 * 1024:
+            message = too_large_message(limit)
+            if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                return JsonResponse({"error": message}, status=413)
+            return HttpResponse(message, status=413)
+        handler = ResumeUploadHandler(request)
+        request.upload_handlers = [handler]
+    return _upload_resume(request, handler)
 
-            file_name = default_storage.save(uploaded_file.name, uploaded_file)
-            file_path = default_storage.path(file_name)
 
-            try:
-                feedback = analyze_resume(file_path, job_desc)  # API key is handled inside ML function
-            except Exception as e:
-                feedback = f"Error during analysis: {e}"
-            finally:
-                if default_storage.exists(file_name):
-                    default_storage.delete(file_name)
+@csrf_protect
+def _upload_resume(request, handler):
+    job = None
+    if request.method == 'POST':
+        form = ResumeUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            submission = _create_submission(request, form)
+            job = enqueue_analysis(submission)
+            # Anonymous uploads are tied to the session so only the uploader can poll them.
+            request.session['analysis_jobs'] = request.session.get('analysis_jobs', [])[-49:] + [job.id]
 
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                return JsonResponse({'feedback': feedback})
+                return JsonResponse(_job_payload(job), status=200 if job.is_finished else 202)
         else:
+            error = handler.error if handler is not None and handler.error else "Invalid form data."
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                return JsonResponse({"error": "Invalid form data."}, status=400)
+                return JsonResponse({"error": error}, status=400)
     else:
         form = ResumeUploadForm()
 
-    return render(request, 'analyzer.html', {'form': form, 'feedback': feedback})
+    feedback = (job.result or {}).get('feedback') if job is not None else None
+    return _render_analyzer(request, {'form': form, 'feedback': feedback, 'job': job})
+
+
+def _render_analyzer(request, context):
+    # The page only streams (upload_resume_stream_view) where that is enabled.
+    if _streaming_enabled():
+        context['stream_url'] = reverse('upload_resume_stream')
+    return render(request, 'analyzer.html', context)
+
+
+def _streaming_enabled():
+    return getattr(settings, 'ANALYSIS_STREAMING_ENABLED', False)
+
+
+@csrf_exempt
+def upload_resume_stream_view(request):
+    """Analyze an uploaded resume and stream the result as server-sent events.
+
+    The deterministic analysis is sent as soon as the text is extracted and
+    the Gemini feedback follows chunk by chunk (see
+    text_classification.analyze_resume_events), instead of the client waiting
+    for the whole result. Same upload handling as upload_resume_view.
+
+    Unlike upload_resume_view this analyzes inside the request, holding a
+    worker for its whole length, so it is off (404) unless
+    ``ANALYSIS_STREAMING_ENABLED`` is set, e.g. for ASGI deployments.
+    """
+    if not _streaming_enabled():
+        raise Http404
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    limit = max_upload_bytes()
+    if int(request.META.get('CONTENT_LENGTH') or 0) > limit + 64 * 1024:
+        return JsonResponse({'error': too_large_message(limit)}, status=413)
+    handler = ResumeUploadHandler(request)
+    request.upload_handlers = [handler]
+    return _upload_resume_stream(request, handler)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@csrf_protect
+def _upload_resume_stream(request, handler):
+    form = ResumeUploadForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'error': handler.error or 'Invalid form data.'}, status=400)
+    submission = _create_submission(request, form)
+
+    from .text_classification import analyze_resume_events
+
+    def events():
+        # Sent before any work so the response starts immediately.
+        yield _sse('submission', {'submission_id': submission.pk})
+        for event, data in analyze_resume_events(
+            submission.resume_file.path,
+            submission.job_description,
+            submission.pk,
+            file_hash=submission.resume_sha256 or None,
+            target_role=submission.target_role,
+            job_posting=submission.job_posting,
+        ):
+            if event == 'done':
+                submission.store_analysis(data)
+                data = {'cached': data['cached'], **_result_payload(submission)}
+            yield _sse(event, data)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx buffering the stream
+    return response
+
+
+@csrf_exempt
+async def upload_resume_async_view(request):
+    """Analyze an uploaded resume within the request, for ASGI deployments.
+
+    Unlike upload_resume_view nothing is queued: the LanguageTool and Gemini
+    calls are awaited, so one worker serves many uploads at once, while text
+    extraction and embedding run on the stage thread pool.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    limit = max_upload_bytes()
+    if int(request.META.get('CONTENT_LENGTH') or 0) > limit + 64 * 1024:
+        return JsonResponse({'error': too_large_message(limit)}, status=413)
+    handler = ResumeUploadHandler(request)
+    request.upload_handlers = [handler]
+    # Reading the body streams the file to disk, and validating job_posting
+    # queries the database: both block, so neither runs on the event loop.
+    form = await sync_to_async(_parse_upload)(request, handler)
+    if isinstance(form, HttpResponse):
+        return form
+    return await _upload_resume_async(request, form)
+
+
+def _parse_upload(request, handler):
+    """The validated upload form, or the CSRF/validation error response.
+
+    csrf_protect cannot be used on the async view: it reads request.POST,
+    and so the whole upload, from the event loop.
+    """
+    request.POST  # parse the body (through ``handler``) before the CSRF check reads it
+    csrf = CsrfViewMiddleware(lambda request: None)
+    rejected = csrf.process_request(request) or csrf.process_view(request, None, (), {})
+    if rejected is not None:
+        return rejected
+    form = ResumeUploadForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'error': handler.error or 'Invalid form data.'}, status=400)
+    return form
+
+
+async def _upload_resume_async(request, form):
+
+    from .text_classification import analyze_resume_result_async
+
+    user = await request.auser()
+    uploaded_file = form.cleaned_data['resume_file']
+    try:
+        submission = await ResumeSubmission.objects.acreate(
+            user=user if user.is_authenticated else None,
+            resume_file=uploaded_file,
+            resume_sha256=getattr(uploaded_file, 'sha256', ''),
+            job_description=form.cleaned_data.get('job_description') or '',
+            job_posting=form.cleaned_data.get('job_posting'),
+            target_role=form.cleaned_data.get('target_role') or '',
+        )
+    finally:
+        uploaded_file.close()
+
+    result = await analyze_resume_result_async(
+        submission.resume_file.path,
+        submission.job_description,
+        submission.pk,
+        file_hash=submission.resume_sha256 or None,
+        target_role=submission.target_role,
+        job_posting=submission.job_posting,
+    )
+    await sync_to_async(submission.store_analysis)(result)
+    return JsonResponse({'submission_id': submission.pk, **_result_payload(submission)})
+
+
+def _metrics_allowed(request):
+    if request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_BEARER_TOKEN', None)
+    auth = request.headers.get('Authorization', '')
+    if token and auth.startswith('Bearer ') and hmac.compare_digest(auth[len('Bearer '):], token):
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+
+
+def metrics_view(request):
+    """Prometheus text exposition of analysis timings, fallbacks and cache hit rate."""
+    if not _metrics_allowed(request):
+        raise Http404()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def analysis_job_status_view(request, job_id):
+    """Polling endpoint for a queued analysis."""
+    job = get_object_or_404(AnalysisJob.objects.select_related('submission'), pk=job_id)
+    owner_id = job.submission.user_id
+    if owner_id is not None:
+        allowed = request.user.is_authenticated and request.user.id == owner_id
+    else:
+        allowed = job.id in request.session.get('analysis_jobs', [])
+    if not allowed:
+        raise Http404("No such analysis job.")
+    return JsonResponse(_job_payload(job))
+
+
+@login_required
+def batch_rank_view(request):
+    """Queue a ranking of uploaded resumes and/or stored submissions against one job description.
+
+    Extraction and OCR of up to ``BATCH_RANK_MAX_RESUMES`` files run on the
+    analysis workers; the response carries a ``status_url`` to poll.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    form = BatchRankForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Invalid form data.', 'details': form.errors}, status=400)
+
+    submission_ids = form.cleaned_data['submission_ids']
+    uploads = request.FILES.getlist('resume_files')
+    max_resumes = getattr(settings, 'BATCH_RANK_MAX_RESUMES', 1000)
+    if not submission_ids and not uploads:
+        return JsonResponse({'error': 'Provide resume_files or submission_ids.'}, status=400)
+    if len(submission_ids) + len(uploads) > max_resumes:
+        return JsonResponse({'error': f'At most {max_resumes} resumes per batch.'}, status=400)
+
+    visible = ResumeSubmission.objects.all()
+    if not request.user.is_staff:
+        visible = visible.filter(user=request.user)
+    # Sliced to stay under SQLite's host-parameter limit
+    allowed = {pk for start in range(0, len(submission_ids), 900)
+               for pk in visible.filter(pk__in=submission_ids[start:start + 900]).values_list('pk', flat=True)}
+
+    job = enqueue_batch_rank(request.user, form.cleaned_data['job_description'],
+                             [pk for pk in submission_ids if pk in allowed], uploads,
+                             top=form.cleaned_data.get('top'), job_posting=form.cleaned_data.get('job_posting'))
+    return JsonResponse(_batch_payload(job), status=200 if job.is_finished else 202)
+
+
+def _batch_payload(job):
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('batch_rank_status', args=[job.id]),
+    }
+    if job.status == BatchRankJob.STATUS_DONE:
+        payload.update(job.result or {})
+    elif job.status == BatchRankJob.STATUS_FAILED:
+        payload['error'] = job.error or 'Ranking failed.'
+    return payload
+
+
+@login_required
+def batch_rank_status_view(request, job_id):
+    """Polling endpoint for a queued batch ranking; the ranking itself once done."""
+    job = get_object_or_404(BatchRankJob, pk=job_id, user=request.user)
+    return JsonResponse(_batch_payload(job))
+
+
+@login_required
+def search_resumes_view(request):
+    """Find stored submissions most similar to a job description (staff search everyone's)."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    form = ResumeSearchForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Invalid form data.', 'details': form.errors}, status=400)
+
+    from .embedding_store import search
+    from .job_postings import vector as posting_vector
+
+    posting = form.cleaned_data.get('job_posting')
+    try:
+        matches = search(
+            form.cleaned_data['job_description'],
+            vector=posting_vector(posting) if posting is not None else None,
+            top_k=form.cleaned_data.get('top_k') or 10,
+            user_id=None if request.user.is_staff else request.user.id,
+        )
+    except RuntimeError as e:
+        return JsonResponse({'error': str(e)}, status=503)
+
+    submissions = ResumeSubmission.objects.in_bulk([m['submission_id'] for m in matches])
+    results = []
+    for match in matches:
+        submission = submissions.get(match['submission_id'])
+        if submission is None:
+            continue
+        results.append({
+            **match,
+            'target_role': submission.target_role,
+            'resume_file': submission.resume_file.name if submission.resume_file else None,
+            'created_at': submission.created_at.isoformat(),
+        })
+    return JsonResponse({'results': results})
@@ -33,12 +33,80 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     const csrftoken = getCookie('csrftoken');
 
+    // --- Poll a queued analysis job until a worker has finished it ---
+    async function waitForJob(data) {
+        while (data.status === 'pending' || data.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, 1500));
+            const res = await fetch(data.status_url, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            data = await res.json();
+        }
+        return data;
+    }
+
     // --- Function to convert **text** to bold ---
     function parseBoldMarkdown(text) {
         // Replace **bold** with <strong>bold</strong>
         return text.replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>').replace(/\n/g, '<br>');
     }
 
+    // --- Stream the analysis as server-sent events, rendering as it arrives ---
+    async function streamAnalysis(url, formData) {
+        const res = await fetch(url, {
+            method: 'POST',
+            body: formData,
+            headers: { 'X-CSRFToken': csrftoken }
+        });
+        const contentType = res.headers.get('content-type') || '';
+        if (!contentType.includes('text/event-stream')) {
+            const data = await res.json();
+            resultCard.innerHTML = `<p style="color:red;">${data.error || 'Analysis failed.'}</p>`;
+            return;
+        }
+
+        resultCard.innerHTML = `
+            <h4>Overview</h4>
+            <div id="analysis-summary" class="recommendations"><div class="spinner"></div></div>
+            <h4>Recommendations</h4>
+            <div id="feedback-stream" class="recommendations"></div>
+        `;
+        const summary = document.getElementById('analysis-summary');
+        const feedbackBox = document.getElementById('feedback-stream');
+        let feedbackText = '';
+
+        const handlers = {
+            analysis(data) {
+                if (data.word_count === undefined) return;
+                const missing = (data.missing_sections || []).join(', ') || 'none';
+                summary.innerHTML = `Words: ${data.word_count} &middot; Action verbs: ${data.action_verbs} &middot; Missing sections: ${missing}`;
+            },
+            feedback(data) {
+                feedbackText += data.text;
+                feedbackBox.innerHTML = parseBoldMarkdown(feedbackText);
+            },
+            error(data) {
+                resultCard.innerHTML = `<p style="color:red;">${data.error}</p>`;
+            }
+        };
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            let sep;
+            while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                const event = (block.match(/^event: (.*)$/m) || [])[1];
+                const data = (block.match(/^data: (.*)$/m) || [])[1];
+                if (event && data && handlers[event]) handlers[event](JSON.parse(data));
+            }
+        }
+    }
+
     // --- Handle form submit ---
     if (form) {
         form.addEventListener('submit', async (e) => {
@@ -74,6 +142,11 @@ document.addEventListener('DOMContentLoaded', () => {
             `;
 
             try {
+                if (form.dataset.streamUrl && window.TextDecoderStream) {
+                    await streamAnalysis(form.dataset.streamUrl, formData);
+                    return;
+                }
+
                 const res = await fetch(form.action, {
                     method: 'POST',
                     body: formData,
@@ -93,7 +166,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 // --- Display feedback ---
                 if (typeof data === 'object') {
-                    const feedbackText = data.feedback || data.recommendations || '';
+                    data = await waitForJob(data);
+                    const feedbackText = data.feedback || data.recommendations || data.error || '';
                     resultCard.innerHTML = `
                         <h4>Recommendations</h4>
                         <div class="recommendations">${parseBoldMarkdown(feedbackText)}</div>